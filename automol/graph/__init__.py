@@ -13,6 +13,8 @@ from ._core import from_dictionaries
 from ._core import from_atoms_and_bonds
 from ._core import add_atoms
 from ._core import add_bonds
+from ._array import to_graph as from_arrays
+from ._builder import GraphBuilder
 # # value getters
 from ._core import atoms
 from ._core import bonds
@@ -23,6 +25,7 @@ from ._core import atom_implicit_hydrogen_valences
 from ._core import atom_stereo_parities
 from ._core import bond_orders
 from ._core import bond_stereo_parities
+from ._array import from_graph as arrays
 # # value setters
 from ._core import relabel
 from ._core import set_atom_implicit_hydrogen_valences
@@ -38,12 +41,17 @@ from ._core import without_stereo_parities
 from ._graph import atom_neighbor_keys
 from ._graph import atom_bond_keys
 from ._graph import atom_neighborhoods
+from ._graph import atom_rings_bond_keys
 # # bond properties
 from ._graph import bond_neighbor_keys
 from ._graph import bond_neighborhoods
+from ._graph import bond_rings_bond_keys
 # # other properties
 from ._graph import branch
 from ._graph import branch_bond_keys
+from ._graph import branches
+from ._graph import branches_atom_keys
+from ._graph import branches_bond_keys
 from ._graph import rings
 from ._graph import rings_bond_keys
 from ._graph import subgraph
@@ -67,12 +75,34 @@ from ._expl import backbone_isomorphic
 from ._expl import backbone_isomorphism
 from ._expl import backbone_unique
 
+# canonical labeling library
+# # atom properties
+from ._canon import atom_canonical_numbers
+from ._canon import atom_symmetry_ranks
+# # other properties
+from ._canon import canonical_certificate
+from ._canon import canonical_hash
+from ._canon import atom_symmetry_classes
+from ._canon import automorphism_generators
+# # transformations
+from ._canon import canonical
+# # comparisons
+from ._canon import isomorphic
+
 # inchi conversion library
 from ._inchi import atom_inchi_numbers
 from ._inchi import inchi
 from ._inchi import stereo_inchi_from_coordinates
+from ._inchi import register_hardcoded_inchi
+from ._inchi import inchi_caching
+from ._inchi import enable_inchi_cache
+from ._inchi import disable_inchi_cache
+from ._inchi import flush_inchi_cache
+from ._inchi import clear_inchi_cache
+from ._inchi import inchi_cache_info
 
 # resonance library
+from ._resset import ResonanceSet
 # # atom properties
 from ._res import atom_bond_valences
 from ._res import atom_radical_valences
@@ -81,26 +111,45 @@ from ._res import resonance_dominant_bond_orders
 # # other properties
 from ._res import maximum_spin_multiplicity
 from ._res import possible_spin_multiplicities
+from ._res import resonance_count
 # # transformations
 from ._res import resonances
 from ._res import subresonances
+from ._res import iter_resonances
+from ._res import iter_subresonances
+from ._res import resonance_set
+from ._res import subresonance_set
 from ._res import dominant_resonances
 from ._res import dominant_resonance
+from ._res import iter_dominant_resonances
 
 # stereo library
+from ._stereo import StereomerSet
 # # properties
 from ._stereo import stereo_inchi
+from ._stereo import stereo_inchis
 from ._stereo import is_chiral
 from ._stereo import atom_stereo_keys
 from ._stereo import bond_stereo_keys
 from ._stereo import stereogenic_atom_keys
 from ._stereo import stereogenic_bond_keys
+from ._stereo import stereomer_count
 # # transformations
 from ._stereo import reflection
 from ._stereo import stereomers
+from ._stereo import iter_stereomers
 from ._stereo import substereomers
+from ._stereo import stereomer_set
+from ._stereo import substereomer_set
 from ._stereo import enantiomerically_unique
 
+# memoization of derived properties
+from ._memo import memoization
+from ._memo import enable_memoization
+from ._memo import disable_memoization
+from ._memo import clear_memo
+from ._memo import memo_info
+
 # submodules
 from . import _dict as dict_
 
@@ -113,6 +162,8 @@ __all__ = [
     'from_atoms_and_bonds',
     'add_atoms',
     'add_bonds',
+    'from_arrays',
+    'GraphBuilder',
     # # value getters
     'atoms',
     'bonds',
@@ -123,6 +174,7 @@ __all__ = [
     'atom_stereo_parities',
     'bond_orders',
     'bond_stereo_parities',
+    'arrays',
     # # value setters
     'set_atom_implicit_hydrogen_valences',
     'set_atom_stereo_parities',
@@ -137,12 +189,17 @@ __all__ = [
     'atom_neighbor_keys',
     'atom_bond_keys',
     'atom_neighborhoods',
+    'atom_rings_bond_keys',
     # # bond properties
     'bond_neighbor_keys',
     'bond_neighborhoods',
+    'bond_rings_bond_keys',
     # # other properties
     'branch',
     'branch_bond_keys',
+    'branches',
+    'branches_atom_keys',
+    'branches_bond_keys',
     'rings',
     'rings_bond_keys',
     'subgraph',
@@ -167,12 +224,34 @@ __all__ = [
     'backbone_isomorphism',
     'backbone_unique',
 
+    # canonical labeling library
+    # # atom properties
+    'atom_canonical_numbers',
+    'atom_symmetry_ranks',
+    # # other properties
+    'canonical_certificate',
+    'canonical_hash',
+    'atom_symmetry_classes',
+    'automorphism_generators',
+    # # transformations
+    'canonical',
+    # # comparisons
+    'isomorphic',
+
     # inchi conversion library
     'atom_inchi_numbers',
     'inchi',
     'stereo_inchi_from_coordinates',
+    'register_hardcoded_inchi',
+    'inchi_caching',
+    'enable_inchi_cache',
+    'disable_inchi_cache',
+    'flush_inchi_cache',
+    'clear_inchi_cache',
+    'inchi_cache_info',
 
     # resonance library
+    'ResonanceSet',
     # # atom properties
     'atom_bond_valences',
     'atom_radical_valences',
@@ -181,26 +260,45 @@ __all__ = [
     # # other properties
     'maximum_spin_multiplicity',
     'possible_spin_multiplicities',
+    'resonance_count',
     # # transformations
     'resonances',
     'subresonances',
+    'iter_resonances',
+    'iter_subresonances',
+    'resonance_set',
+    'subresonance_set',
     'dominant_resonances',
     'dominant_resonance',
+    'iter_dominant_resonances',
 
     # stereo library
+    'StereomerSet',
     # # properties
     'stereo_inchi',
+    'stereo_inchis',
     'is_chiral',
     'atom_stereo_keys',
     'bond_stereo_keys',
     'stereogenic_atom_keys',
     'stereogenic_bond_keys',
+    'stereomer_count',
     # # transformations
     'reflection',
     'stereomers',
+    'iter_stereomers',
     'substereomers',
+    'stereomer_set',
+    'substereomer_set',
     'enantiomerically_unique',
 
+    # memoization of derived properties
+    'memoization',
+    'enable_memoization',
+    'disable_memoization',
+    'clear_memo',
+    'memo_info',
+
     # submodules
     'dict_',
 ]
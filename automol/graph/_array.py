@@ -0,0 +1,245 @@
+""" compact array-backed graph representation
+
+agr = (atm_keys, atm_sym_idxs, atm_imp_hyd_vlcs, atm_ste_pars,
+       bnd_atm_idxs, bnd_ords, bnd_ste_pars,
+       adj_ptrs, adj_atm_idxs, adj_bnd_idxs)
+
+Atoms are stored as parallel arrays in sorted key order, with symbols given by
+their index in `automol.atom.SYMBOLS`. Bonds are stored as an (nbnds, 2) array
+of atom positions, sorted like `frozen` sorts them, with parallel order and
+parity arrays. The adjacency is in compressed sparse row (CSR) form: the
+neighbors of the atom at position `i` are at positions
+`adj_atm_idxs[adj_ptrs[i]:adj_ptrs[i+1]]`, connected to it by the bonds at
+positions `adj_bnd_idxs[adj_ptrs[i]:adj_ptrs[i+1]]`.
+
+Stereo parities are encoded as int8 values: -1 (None), 0 (False), 1 (True).
+
+The arrays are read-only, since they are cached and shared between calls.
+"""
+import numpy
+from .. import atom as _atom
+from ._core import from_atoms_and_bonds as _from_atoms_and_bonds
+from ._core import atoms as _atoms
+from ._core import atom_key_positions as _atom_key_positions
+from ._core import bonds as _bonds
+from ._memo import index_cached as _index_cached
+
+ATM_KEYS_POS = 0
+ATM_SYM_IDXS_POS = 1
+ATM_IMP_HYD_VLCS_POS = 2
+ATM_STE_PARS_POS = 3
+
+BND_ATM_IDXS_POS = 4
+BND_ORDS_POS = 5
+BND_STE_PARS_POS = 6
+
+ADJ_PTRS_POS = 7
+ADJ_ATM_IDXS_POS = 8
+ADJ_BND_IDXS_POS = 9
+
+_SYM_IDX_DCT = dict(map(reversed, enumerate(_atom.SYMBOLS)))
+_TOT_VLCS = numpy.array(list(map(_atom.valence, _atom.SYMBOLS)))
+_PAR_CODE_DCT = {None: -1, False: 0, True: 1}
+_PAR_VALS = (False, True, None)     # indexed by code, so that -1 gives None
+
+
+# constructors
+@_index_cached
+def from_graph(xgr):
+    """ compact array representation of a molecular graph
+    """
+    atm_keys, atm_idx_dct = _atom_key_positions(xgr)
+    atm_arrs = _atom_arrays(_atoms(xgr), atm_keys)
+    bnd_arrs = _bond_arrays(_bonds(xgr), atm_idx_dct)
+    adj_arrs = _adjacency_arrays(bnd_arrs[0], len(atm_keys))
+
+    agr = atm_arrs + bnd_arrs + adj_arrs
+    for arr in agr:
+        arr.flags.writeable = False
+    return agr
+
+
+def _atom_arrays(atm_dct, atm_keys):
+    """ atom keys, symbol indices, implicit hydrogen valences and stereo
+    parities, in sorted key order
+    """
+    atm_vals = [atm_dct[atm_key] for atm_key in atm_keys]
+    return (numpy.array(atm_keys, dtype=numpy.intp),
+            numpy.array([_SYM_IDX_DCT[sym] for sym, _, _ in atm_vals],
+                        dtype=numpy.int8),
+            numpy.array([vlc for _, vlc, _ in atm_vals], dtype=numpy.int8),
+            numpy.array([_PAR_CODE_DCT[par] for _, _, par in atm_vals],
+                        dtype=numpy.int8))
+
+
+def _bond_arrays(bnd_dct, atm_idx_dct):
+    """ atom positions, orders and stereo parities of the bonds, in sorted
+    order
+    """
+    bnd_keys = sorted(bnd_dct.keys(), key=sorted)
+    bnd_atm_idxs = [sorted(map(atm_idx_dct.__getitem__, bnd_key))
+                    for bnd_key in bnd_keys]
+    bnd_vals = [bnd_dct[bnd_key] for bnd_key in bnd_keys]
+    return (numpy.array(bnd_atm_idxs, dtype=numpy.intp).reshape(-1, 2),
+            numpy.array([ord_ for ord_, _ in bnd_vals], dtype=numpy.int8),
+            numpy.array([_PAR_CODE_DCT[par] for _, par in bnd_vals],
+                        dtype=numpy.int8))
+
+
+def _adjacency_arrays(bnd_atm_idxs, natms):
+    """ the adjacency, in CSR form, as row pointers along with the neighbor
+    and bond positions
+    """
+    nbnds = len(bnd_atm_idxs)
+
+    # each bond appears twice in the adjacency, once from either end
+    adj_srcs = numpy.concatenate([bnd_atm_idxs[:, 0], bnd_atm_idxs[:, 1]])
+    adj_dsts = numpy.concatenate([bnd_atm_idxs[:, 1], bnd_atm_idxs[:, 0]])
+    adj_bnds = numpy.tile(numpy.arange(nbnds, dtype=numpy.intp), 2)
+    srt_idxs = numpy.argsort(adj_srcs, kind='stable')
+    adj_ptrs = numpy.zeros(natms + 1, dtype=numpy.intp)
+    numpy.cumsum(numpy.bincount(adj_srcs, minlength=natms),
+                 out=adj_ptrs[1:])
+    return (adj_ptrs, adj_dsts[srt_idxs], adj_bnds[srt_idxs])
+
+
+def to_graph(agr):
+    """ molecular graph from its compact array representation
+    """
+    atm_keys = agr[ATM_KEYS_POS].tolist()
+    atm_syms = [_atom.SYMBOLS[idx] for idx in agr[ATM_SYM_IDXS_POS].tolist()]
+    atm_imp_hyd_vlcs = agr[ATM_IMP_HYD_VLCS_POS].tolist()
+    atm_ste_pars = [_PAR_VALS[code] for code in agr[ATM_STE_PARS_POS].tolist()]
+
+    bnd_keys = bond_keys(agr)
+    bnd_ords = agr[BND_ORDS_POS].tolist()
+    bnd_ste_pars = [_PAR_VALS[code] for code in agr[BND_STE_PARS_POS].tolist()]
+
+    atm_dct = dict(zip(atm_keys,
+                       zip(atm_syms, atm_imp_hyd_vlcs, atm_ste_pars)))
+    bnd_dct = dict(zip(bnd_keys, zip(bnd_ords, bnd_ste_pars)))
+    return _from_atoms_and_bonds(atm_dct, bnd_dct)
+
+
+# value getters
+def atom_keys(agr):
+    """ atom keys, in array order
+    """
+    return tuple(agr[ATM_KEYS_POS].tolist())
+
+
+def bond_keys(agr):
+    """ bond keys, in array order
+    """
+    atm_keys = agr[ATM_KEYS_POS].tolist()
+    return tuple(frozenset((atm_keys[idx1], atm_keys[idx2]))
+                 for idx1, idx2 in agr[BND_ATM_IDXS_POS].tolist())
+
+
+# graph theory kernels
+def atom_neighbor_keys(agr):
+    """ keys of neighboring atoms, by atom
+    """
+    atm_keys = agr[ATM_KEYS_POS].tolist()
+    ngb_keys = [atm_keys[idx] for idx in agr[ADJ_ATM_IDXS_POS].tolist()]
+    return dict(zip(atm_keys, map(frozenset, _csr_split(agr, ngb_keys))))
+
+
+def atom_bond_keys(agr):
+    """ bond keys, by atom
+    """
+    atm_keys = agr[ATM_KEYS_POS].tolist()
+    bnd_keys = bond_keys(agr)
+    adj_bnd_keys = [bnd_keys[idx] for idx in agr[ADJ_BND_IDXS_POS].tolist()]
+    return dict(zip(atm_keys, map(frozenset, _csr_split(agr, adj_bnd_keys))))
+
+
+def _csr_split(agr, adj_vals):
+    """ split a list of per-adjacency values into per-atom slices
+    """
+    adj_ptrs = agr[ADJ_PTRS_POS].tolist()
+    return (adj_vals[start:end]
+            for start, end in zip(adj_ptrs[:-1], adj_ptrs[1:]))
+
+
+# resonance kernels
+def atom_bond_valence_array(agr):
+    """ bond valences, as an array in atom order
+    """
+    natms = len(agr[ATM_KEYS_POS])
+    bnd_atm_idxs = agr[BND_ATM_IDXS_POS]
+    bnd_ords = agr[BND_ORDS_POS].astype(int)
+    atm_exp_bnd_vlcs = (
+        numpy.bincount(bnd_atm_idxs[:, 0], weights=bnd_ords,
+                       minlength=natms) +
+        numpy.bincount(bnd_atm_idxs[:, 1], weights=bnd_ords,
+                       minlength=natms))
+    atm_bnd_vlcs = (atm_exp_bnd_vlcs.astype(int) +
+                    agr[ATM_IMP_HYD_VLCS_POS].astype(int))
+    return atm_bnd_vlcs
+
+
+def atom_radical_valence_array(agr):
+    """ radical valences, as an array in atom order
+    """
+    atm_tot_vlcs = _TOT_VLCS[agr[ATM_SYM_IDXS_POS]]
+    return atm_tot_vlcs - atom_bond_valence_array(agr)
+
+
+def atom_bond_valences(agr):
+    """ bond valences, by atom
+    """
+    return dict(zip(agr[ATM_KEYS_POS].tolist(),
+                    atom_bond_valence_array(agr).tolist()))
+
+
+def atom_radical_valences(agr):
+    """ radical valences, by atom
+    """
+    return dict(zip(agr[ATM_KEYS_POS].tolist(),
+                    atom_radical_valence_array(agr).tolist()))
+
+
+# connectivity kernels
+def explicit_hydrogen_keys(agr):
+    """ explicit hydrogen keys (H types: explicit, implicit, backbone)
+    """
+    atm_keys = agr[ATM_KEYS_POS]
+    is_hyd = agr[ATM_SYM_IDXS_POS] == _SYM_IDX_DCT['H']
+
+    # an H is backbone if all of its neighbors are H atoms with larger keys
+    adj_srcs, adj_dsts = _adjacency_pairs(agr)
+    adj_is_bbn = is_hyd[adj_dsts] & (atm_keys[adj_srcs] < atm_keys[adj_dsts])
+    nonbbn_cnts = numpy.bincount(adj_srcs[~adj_is_bbn],
+                                 minlength=len(atm_keys))
+    is_exp_hyd = is_hyd & (nonbbn_cnts > 0)
+    return frozenset(atm_keys[is_exp_hyd].tolist())
+
+
+def atom_explicit_hydrogen_keys(agr):
+    """ explicit hydrogen keys, by atom
+    """
+    atm_keys = agr[ATM_KEYS_POS]
+    is_hyd = agr[ATM_SYM_IDXS_POS] == _SYM_IDX_DCT['H']
+
+    # within an atom's neighborhood, an H neighbor is explicit unless the atom
+    # is itself an H with a larger key (making the neighbor the backbone H)
+    adj_srcs, adj_dsts = _adjacency_pairs(agr)
+    adj_is_exp_hyd = is_hyd[adj_dsts] & ~(
+        is_hyd[adj_srcs] & (atm_keys[adj_dsts] < atm_keys[adj_srcs]))
+    atm_keys = atm_keys.tolist()
+    adj_exp_hyd_keys = [atm_keys[idx] if is_exp_hyd else None
+                        for idx, is_exp_hyd
+                        in zip(adj_dsts.tolist(), adj_is_exp_hyd.tolist())]
+    return {atm_key: frozenset(keys) - {None}
+            for atm_key, keys
+            in zip(atm_keys, _csr_split(agr, adj_exp_hyd_keys))}
+
+
+def _adjacency_pairs(agr):
+    """ source and destination atom positions for each adjacency entry
+    """
+    adj_ptrs = agr[ADJ_PTRS_POS]
+    adj_srcs = numpy.repeat(numpy.arange(len(adj_ptrs) - 1),
+                            numpy.diff(adj_ptrs))
+    return adj_srcs, agr[ADJ_ATM_IDXS_POS]
@@ -0,0 +1,146 @@
+""" mutable molecular graph builder
+
+Graphs are immutable, so every transformation copies the whole graph. The
+builder collects many changes in place and freezes them into the standard
+graph tuple in a single pass at the end.
+"""
+from itertools import chain as _chain
+from .. import atom as _atom
+from ._core import from_atoms_and_bonds as _from_atoms_and_bonds
+from ._core import atoms as _atoms
+from ._core import bonds as _bonds
+from ._core import ATM_IMP_HYD_VLC_POS
+from ._core import ATM_STE_PAR_POS
+from ._core import BND_ORD_POS
+from ._core import BND_STE_PAR_POS
+
+
+class GraphBuilder():
+    """ mutable molecular graph, changed in place and frozen at the end
+    """
+
+    def __init__(self, xgr=None):
+        """ start from a copy of `xgr`, or from an empty graph
+        """
+        atm_dct = {} if xgr is None else _atoms(xgr)
+        bnd_dct = {} if xgr is None else _bonds(xgr)
+        self._atm_dct = {key: list(vals) for key, vals in atm_dct.items()}
+        self._bnd_dct = {key: list(vals) for key, vals in bnd_dct.items()}
+
+    def atom_keys(self):
+        """ the current atom keys
+        """
+        return frozenset(self._atm_dct.keys())
+
+    def bond_keys(self):
+        """ the current bond keys
+        """
+        return frozenset(self._bnd_dct.keys())
+
+    def next_atom_key(self):
+        """ the smallest key larger than all current atom keys
+        """
+        return max(self._atm_dct.keys(), default=-1) + 1
+
+    # additions
+    def add_atoms(self, sym_dct, imp_hyd_vlc_dct=None, ste_par_dct=None):
+        """ add atoms
+        """
+        imp_hyd_vlc_dct = {} if imp_hyd_vlc_dct is None else imp_hyd_vlc_dct
+        ste_par_dct = {} if ste_par_dct is None else ste_par_dct
+
+        assert not any(key in self._atm_dct for key in sym_dct)
+        assert all(key in sym_dct for key in imp_hyd_vlc_dct)
+        assert all(key in sym_dct for key in ste_par_dct)
+
+        for key, sym in sym_dct.items():
+            sym = _atom.standard_case(sym)
+            assert sym in _atom.SYMBOLS
+            self._atm_dct[key] = [sym, int(imp_hyd_vlc_dct.get(key, 0)),
+                                  ste_par_dct.get(key, None)]
+        return self
+
+    def add_bonds(self, keys, ord_dct=None, ste_par_dct=None):
+        """ add bonds
+        """
+        keys = list(map(frozenset, keys))
+        ord_dct = {} if ord_dct is None else ord_dct
+        ste_par_dct = {} if ste_par_dct is None else ste_par_dct
+
+        assert all(len(key) == 2 for key in keys)
+        assert all(atm_key in self._atm_dct for atm_key in _chain(*keys))
+        assert not any(key in self._bnd_dct for key in keys)
+        assert len(set(keys)) == len(keys)
+        assert set(ord_dct.keys()) <= set(keys)
+        assert set(ste_par_dct.keys()) <= set(keys)
+
+        for key in keys:
+            self._bnd_dct[key] = [int(ord_dct.get(key, 1)),
+                                  ste_par_dct.get(key, None)]
+        return self
+
+    def add_explicit_hydrogens(self, atm_exp_hyd_vlc_dct):
+        """ add explicit hydrogens by atom, numbering them after the others
+        """
+        assert all(key in self._atm_dct for key in atm_exp_hyd_vlc_dct)
+        next_atm_key = self.next_atom_key()
+        hyd_bnd_keys = []
+        for atm_key, atm_exp_hyd_vlc in atm_exp_hyd_vlc_dct.items():
+            for hyd_key in range(next_atm_key, next_atm_key + atm_exp_hyd_vlc):
+                self._atm_dct[hyd_key] = ['H', 0, None]
+                hyd_bnd_keys.append(frozenset({atm_key, hyd_key}))
+            next_atm_key += atm_exp_hyd_vlc
+        self.add_bonds(hyd_bnd_keys)
+        return self
+
+    # removals
+    def delete_atoms(self, atm_keys):
+        """ delete atoms, along with their bonds
+        """
+        atm_keys = set(atm_keys)
+        assert all(key in self._atm_dct for key in atm_keys)
+        for atm_key in atm_keys:
+            del self._atm_dct[atm_key]
+        self._bnd_dct = {key: vals for key, vals in self._bnd_dct.items()
+                         if not key & atm_keys}
+        return self
+
+    # value setters
+    def set_atom_implicit_hydrogen_valences(self, atm_imp_hyd_vlc_dct):
+        """ set atom implicit hydrogen valences
+        """
+        _set_by_position(self._atm_dct, atm_imp_hyd_vlc_dct,
+                         ATM_IMP_HYD_VLC_POS)
+        return self
+
+    def set_atom_stereo_parities(self, atm_par_dct):
+        """ set atom parities
+        """
+        _set_by_position(self._atm_dct, atm_par_dct, ATM_STE_PAR_POS)
+        return self
+
+    def set_bond_orders(self, bnd_ord_dct):
+        """ set bond orders
+        """
+        _set_by_position(self._bnd_dct, bnd_ord_dct, BND_ORD_POS)
+        return self
+
+    def set_bond_stereo_parities(self, bnd_par_dct):
+        """ set bond parities
+        """
+        _set_by_position(self._bnd_dct, bnd_par_dct, BND_STE_PAR_POS)
+        return self
+
+    # conversion
+    def freeze(self):
+        """ the molecular graph, as an immutable graph tuple
+        """
+        atm_dct = {key: tuple(vals) for key, vals in self._atm_dct.items()}
+        bnd_dct = {key: tuple(vals) for key, vals in self._bnd_dct.items()}
+        return _from_atoms_and_bonds(atm_dct, bnd_dct)
+
+
+def _set_by_position(mdct, dct, pos):
+    assert all(key in mdct for key in dct)
+    for key, val in dct.items():
+        mdct[key][pos] = val
@@ -0,0 +1,412 @@
+""" canonical labeling library
+
+Atoms are labeled canonically by color refinement (the Morgan algorithm
+generalized to atom and bond values), followed by a search over
+individualizations of the remaining ties. The canonical labeling is the one
+giving the smallest certificate, which is the graph written out in canonical
+order. Two graphs are isomorphic, with the same atom and bond values, if and
+only if they have the same certificate. Automorphisms found at equivalent
+leaves prune the search, as in McKay's nauty.
+
+Stereo parities are treated as atom and bond values, like everywhere else in
+the graph module.
+"""
+import hashlib
+from ._core import atoms as _atoms
+from ._core import atom_key_positions as _atom_key_positions
+from ._core import bonds as _bonds
+from ._core import relabel as _relabel
+from ._core import without_stereo_parities as _without_stereo_parities
+from ._memo import index_cached as _index_cached
+from ._memo import memoized as _memoized
+
+_PAR_CODE_DCT = {None: -1, False: 0, True: 1}
+
+
+# atom properties
+@_memoized
+def atom_canonical_numbers(xgr):
+    """ canonical numbers of the atoms, by atom key
+    """
+    atm_can_nums, _, _ = _canonical_labeling(xgr)
+    return dict(atm_can_nums)
+
+
+@_memoized
+def atom_symmetry_ranks(xgr, stereo=False):
+    """ symmetry ranks of the atoms, by atom key
+
+    (the position of each atom's class in `atom_symmetry_classes`)
+    """
+    sym_clss = atom_symmetry_classes(xgr, stereo=stereo)
+    return {atm_key: rank for rank, sym_cls in enumerate(sym_clss)
+            for atm_key in sym_cls}
+
+
+# other properties
+def canonical_certificate(xgr):
+    """ a complete, sortable description of the graph up to isomorphism
+
+    Two graphs have the same certificate if and only if they are isomorphic.
+    """
+    _, cert, _ = _canonical_labeling(xgr)
+    return cert
+
+
+@_memoized
+def canonical_hash(xgr):
+    """ a stable hash of the graph up to isomorphism, as a hex string
+
+    The hash is a SHA-256 digest of the certificate, so it is the same across
+    processes and sessions.
+    """
+    atm_vals, bnd_vals = canonical_certificate(xgr)
+    cert_str = '|'.join([
+        ';'.join(','.join(map(str, vals)) for vals in atm_vals),
+        ';'.join(','.join(map(str, vals)) for vals in bnd_vals)])
+    return hashlib.sha256(cert_str.encode('ascii')).hexdigest()
+
+
+@_memoized
+def atom_symmetry_classes(xgr, stereo=False):
+    """ classes of symmetrically equivalent atoms, in order of rank
+
+    Two atoms are equivalent if an automorphism of the graph takes one to the
+    other. Stereo parities are ignored unless `stereo` is set, in which case
+    atoms must also match in parity. The order of the classes does not depend
+    on the atom keys.
+    """
+    xgr = xgr if stereo else _without_stereo_parities(xgr)
+    atm_keys, _, _, _ = graph_index(xgr)
+    clrs = equitable_colors(xgr)
+    atm_can_nums, _, orb_reps = _canonical_labeling(xgr)
+
+    cls_idxs_dct = {}
+    for idx, orb_rep in enumerate(orb_reps):
+        cls_idxs_dct.setdefault(orb_rep, []).append(idx)
+
+    # classes only share a color when refinement can't tell them apart, so the
+    # canonical numbers break the ties
+    def _sort_value(cls_idxs):
+        return (clrs[cls_idxs[0]],
+                min(atm_can_nums[atm_keys[idx]] for idx in cls_idxs))
+
+    cls_idxs_lst = sorted(cls_idxs_dct.values(), key=_sort_value)
+    return tuple(frozenset(map(atm_keys.__getitem__, cls_idxs))
+                 for cls_idxs in cls_idxs_lst)
+
+
+def neighbor_symmetry_ranks(xgr, atm_key):
+    """ symmetry ranks of the neighbors of `atm_key`, with `atm_key` held fixed
+
+    Two neighbors get the same rank if and only if an automorphism fixing
+    `atm_key` swaps them. The ranks are only meant to be compared with each
+    other.
+    """
+    atm_keys, _, _, atm_ngbs = graph_index(xgr)
+    clrs = equitable_colors(xgr)
+    cen_idx = atm_keys.index(atm_key)
+    ngb_idxs = [idx for idx, _ in atm_ngbs[cen_idx]]
+
+    # neighbors that differ in the whole graph also differ about `atm_key`, so
+    # the center only needs to be set apart if some of them are tied, and the
+    # automorphisms fixing it only need to be found if that leaves ties
+    if _has_ties(clrs, ngb_idxs):
+        clrs = _refine(_individualized(clrs, cen_idx), atm_ngbs)
+        if _has_ties(clrs, ngb_idxs):
+            _, _, gens = _colored_tree_search(xgr, clrs)
+            return {atm_keys[idx]: min(_orbit(idx, gens)) for idx in ngb_idxs}
+
+    return {atm_keys[idx]: clrs[idx] for idx in ngb_idxs}
+
+
+@_memoized
+def automorphism_generators(xgr):
+    """ a generating set for the automorphisms of the graph, as atom key maps
+
+    (these are the automorphisms found by the canonical labeling search,
+    along with swaps of twin atoms -- same values and same neighbors)
+    """
+    atm_keys, _, _, _ = graph_index(xgr)
+    _, _, gens = _tree_search(xgr)
+    return tuple({atm_keys[idx1]: atm_keys[idx2]
+                  for idx1, idx2 in enumerate(gen)} for gen in gens)
+
+
+# transformations
+def canonical(xgr):
+    """ the graph, relabeled with canonical atom keys
+    """
+    return _relabel(xgr, atom_canonical_numbers(xgr))
+
+
+# comparisons
+def isomorphic(xgr1, xgr2):
+    """ are these graphs isomorphic, with the same atom and bond values?
+    """
+    return canonical_certificate(xgr1) == canonical_certificate(xgr2)
+
+
+# indexing (shared with `_iso`)
+@_index_cached
+def graph_index(xgr):
+    """ atom keys, atom values, and bonds and neighbors by atom position
+    """
+    atm_dct = _atoms(xgr)
+    bnd_dct = _bonds(xgr)
+
+    atm_keys, atm_idx_dct = _atom_key_positions(xgr)
+    natms = len(atm_keys)
+
+    atm_vals = [_atom_values(atm_dct[atm_key]) for atm_key in atm_keys]
+    bnd_vals = []
+    atm_ngbs = [[] for _ in range(natms)]
+    for bnd_key, vals in bnd_dct.items():
+        idx1, idx2 = map(atm_idx_dct.__getitem__, bnd_key)
+        vals = _bond_values(vals)
+        bnd_vals.append((idx1, idx2, vals))
+        atm_ngbs[idx1].append((idx2, vals))
+        atm_ngbs[idx2].append((idx1, vals))
+
+    return atm_keys, atm_vals, bnd_vals, atm_ngbs
+
+
+@_index_cached
+def equitable_colors(xgr):
+    """ colors by atom position, refined until they are equitable
+    """
+    _, atm_vals, _, atm_ngbs = graph_index(xgr)
+
+    # the initial colors include the degree, so the first pass is cheap
+    clrs = _ranks([vals + (len(ngbs),) for vals, ngbs
+                   in zip(atm_vals, atm_ngbs)])
+    return _refine(clrs, atm_ngbs)
+
+
+@_index_cached
+def _canonical_labeling(xgr):
+    """ canonical numbers by atom key, along with the certificate and a
+    representative position for each atom's automorphism orbit
+    """
+    atm_keys, _, _, _ = graph_index(xgr)
+    cert, pos, gens = _tree_search(xgr)
+    atm_can_nums = dict(zip(atm_keys, pos))
+    orb_reps = _orbit_representatives(len(atm_keys), gens)
+    return atm_can_nums, cert, orb_reps
+
+
+@_index_cached
+def _tree_search(xgr):
+    """ the best leaf of the individualization-refinement tree, along with a
+    generating set for the automorphism group
+    """
+    return _colored_tree_search(xgr, equitable_colors(xgr))
+
+
+def _colored_tree_search(xgr, clrs):
+    """ the best leaf of the individualization-refinement tree below a
+    coloring, along with a generating set for the automorphisms preserving it
+
+    The best leaf is given by its certificate and the position of each atom in
+    it. Two leaves with the same certificate differ by an automorphism, so each
+    one found prunes the search: children in the orbit of an earlier sibling
+    are skipped, and a leaf matching the first or best one sends the search
+    back up to where their paths split.
+    """
+    _, atm_vals, bnd_vals, atm_ngbs = graph_index(xgr)
+    gens = [gen for gen in _twin_swaps(atm_vals, atm_ngbs)
+            if all(clrs[gen[idx]] == clrs[idx] for idx in range(len(gen)))]
+    srch = {'graph': (atm_vals, bnd_vals, atm_ngbs),
+            'gens': gens,
+            'first': None,
+            'best': None}
+    _search(clrs, [], srch)
+    cert, pos, _, _ = srch.pop('best')
+    return cert, pos, tuple(srch['gens'])
+
+
+def _search(clrs, path, srch):
+    """ search the tree below a node, returning the depth to go on from
+
+    (`path` holds the atoms individualized to reach the node)
+    """
+    _, _, atm_ngbs = srch['graph']
+    clrs = _refine(clrs, atm_ngbs)
+    if len(set(clrs)) == len(clrs):
+        return _visit_leaf(_leaf_order(clrs), path, srch)
+
+    done_idxs = []
+    for idx in _first_tied_cell(clrs):
+        # only automorphisms fixing the path map this node's children onto
+        # each other
+        stab_gens = [gen for gen in srch['gens']
+                     if all(gen[path_idx] == path_idx for path_idx in path)]
+        if _orbit(idx, stab_gens).isdisjoint(done_idxs):
+            depth = _search(_individualized(clrs, idx), path + [idx], srch)
+            if depth < len(path):
+                return depth
+            done_idxs.append(idx)
+
+    return len(path)
+
+
+def _visit_leaf(order, path, srch):
+    """ compare a leaf to the first and best ones, returning the depth to go on
+    from
+    """
+    atm_vals, bnd_vals, _ = srch['graph']
+    cert, pos = _certificate(order, atm_vals, bnd_vals)
+    if srch['first'] is None:
+        srch['first'] = srch['best'] = (cert, pos, order, path)
+        return len(path)
+
+    for ref_cert, _, ref_order, ref_path in (srch['first'], srch['best']):
+        if cert == ref_cert:
+            srch['gens'].append(_order_map(ref_order, order))
+            return _common_prefix_length(path, ref_path)
+
+    if cert < srch['best'][0]:
+        srch['best'] = (cert, pos, order, path)
+    return len(path)
+
+
+def _certificate(order, atm_vals, bnd_vals):
+    """ the certificate for an atom order, along with the position of each
+    atom in it
+    """
+    pos = [None] * len(order)
+    for num, idx in enumerate(order):
+        pos[idx] = num
+    cert = (tuple(atm_vals[idx] for idx in order),
+            tuple(sorted((min(pos[idx1], pos[idx2]),
+                          max(pos[idx1], pos[idx2])) + vals
+                         for idx1, idx2, vals in bnd_vals)))
+    return cert, pos
+
+
+def _orbit_representatives(natms, gens):
+    """ a representative position for each atom's orbit under these
+    permutations
+    """
+    orb_reps = [None] * natms
+    for idx in range(natms):
+        if orb_reps[idx] is None:
+            for orb_idx in _orbit(idx, gens):
+                orb_reps[orb_idx] = idx
+    return orb_reps
+
+
+def _twin_swaps(atm_vals, atm_ngbs):
+    """ swaps of twin atoms, with the same values and the same neighbors
+    """
+    natms = len(atm_vals)
+    gens = []
+    twin_rep_dct = {}
+    for idx, (vals, ngbs) in enumerate(zip(atm_vals, atm_ngbs)):
+        rep_idx = twin_rep_dct.setdefault((vals, frozenset(ngbs)), idx)
+        if rep_idx != idx:
+            gen = list(range(natms))
+            gen[idx], gen[rep_idx] = rep_idx, idx
+            gens.append(gen)
+    return gens
+
+
+def _atom_values(vals):
+    sym, imp_hyd_vlc, par = vals
+    return (sym, int(imp_hyd_vlc), _PAR_CODE_DCT[par])
+
+
+def _bond_values(vals):
+    ord_, par = vals
+    return (int(ord_), _PAR_CODE_DCT[par])
+
+
+def _ranks(vals_lst):
+    """ dense ranks of a list of sortable values
+    """
+    rank_dct = {vals: rank for rank, vals in enumerate(sorted(set(vals_lst)))}
+    return [rank_dct[vals] for vals in vals_lst]
+
+
+def _refine(clrs, atm_ngbs):
+    """ refine the coloring until it is equitable
+
+    New colors sort by the old ones first, so that refinement never reorders
+    existing cells and the result is canonical.
+    """
+    ncells = len(set(clrs))
+    while True:
+        sigs = [(clr, tuple(sorted((vals, clrs[ngb_idx])
+                                   for ngb_idx, vals in ngbs)))
+                for clr, ngbs in zip(clrs, atm_ngbs)]
+        new_clrs = _ranks(sigs)
+        new_ncells = len(set(new_clrs))
+        if new_ncells == ncells:
+            return clrs
+        clrs, ncells = new_clrs, new_ncells
+
+
+def _leaf_order(clrs):
+    """ the atom order at a leaf, where every atom has its own color
+    """
+    order = [None] * len(clrs)
+    for idx, clr in enumerate(clrs):
+        order[clr] = idx
+    return order
+
+
+def _order_map(order1, order2):
+    """ the permutation taking each atom in one order to its place in another
+    """
+    perm = [None] * len(order1)
+    for idx1, idx2 in zip(order1, order2):
+        perm[idx1] = idx2
+    return perm
+
+
+def _common_prefix_length(path1, path2):
+    """ the number of leading atoms two paths share
+    """
+    depth = 0
+    for idx1, idx2 in zip(path1, path2):
+        if idx1 != idx2:
+            break
+        depth += 1
+    return depth
+
+
+def _first_tied_cell(clrs):
+    """ positions of the atoms in the first cell with ties
+    """
+    natms = len(clrs)
+    cell_sizes = [0] * natms
+    for clr in clrs:
+        cell_sizes[clr] += 1
+    cell_clr = min(clr for clr in clrs if cell_sizes[clr] > 1)
+    return [idx for idx, clr in enumerate(clrs) if clr == cell_clr]
+
+
+def _has_ties(clrs, idxs):
+    """ do any of these atoms share a color?
+    """
+    return len(set(map(clrs.__getitem__, idxs))) < len(idxs)
+
+
+def _individualized(clrs, ind_idx):
+    """ colors with one atom set apart from the rest of its cell
+    """
+    return _ranks([(clr, idx != ind_idx) for idx, clr in enumerate(clrs)])
+
+
+def _orbit(idx, gens):
+    """ the orbit of an atom under the group generated by these permutations
+    """
+    orb_idxs = {idx}
+    stack = [idx]
+    while stack:
+        idx = stack.pop()
+        for gen in gens:
+            if gen[idx] not in orb_idxs:
+                orb_idxs.add(gen[idx])
+                stack.append(gen[idx])
+    return orb_idxs
@@ -34,6 +34,7 @@ def from_dictionaries(atm_sym_dct, bnd_keys, atm_imp_hyd_vlc_dct=None,
     """ molecular graph from dictionaries over atom and bond keys
     """
     atm_keys = sorted(atm_sym_dct.keys())
+    atm_idx_dct = dict(map(reversed, enumerate(atm_keys)))
 
     def _values(dct, keys, fill_val=None):
         dct = dict() if dct is None else dct
@@ -41,7 +42,8 @@ def from_dictionaries(atm_sym_dct, bnd_keys, atm_imp_hyd_vlc_dct=None,
 
     xgr = _from_data(
         atom_symbols=_values(atm_sym_dct, atm_keys),
-        bond_keys=[set(map(atm_keys.index, bnd_key)) for bnd_key in bnd_keys],
+        bond_keys=[set(map(atm_idx_dct.__getitem__, bnd_key))
+                   for bnd_key in bnd_keys],
         atom_implicit_hydrogen_valences=_values(
             atm_imp_hyd_vlc_dct, atm_keys, fill_val=0),
         atom_stereo_parities=_values(atm_ste_par_dct, atm_keys, fill_val=None),
@@ -151,6 +153,13 @@ def bond_keys(xgr):
     return frozenset(bonds(xgr).keys())
 
 
+def atom_key_positions(xgr):
+    """ atom keys in sorted order, along with the position of each one
+    """
+    atm_keys = sorted(atom_keys(xgr))
+    return atm_keys, dict(map(reversed, enumerate(atm_keys)))
+
+
 def atom_symbols(xgr):
     """ atom symbols, as a dictionary
     """
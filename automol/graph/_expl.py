@@ -1,48 +1,42 @@
 """ backbone and explicit hydrogen library
 """
 from itertools import chain as _chain
-from future.moves.itertools import filterfalse as _filterfalse
 import numpy
-from ._networkx import from_graph as _nxg_from_graph
-from ._networkx import isomorphism as _nxg_isomorphism
-from ._math import unique as _unique
+from ._math import unique_by_value as _unique_by_value
 from ._dict import by_key as _by_key
 from ._dict import values_by_key as _values_by_key
-from ._dict import keys_by_value as _keys_by_value
 from ._dict import transform_values as _transform_values
-from ._dict import transform_items_to_values as _transform_items_to_values
-from ._core import add_atoms as _add_atoms
-from ._core import add_bonds as _add_bonds
 from ._core import atom_keys as _atom_keys
-from ._core import atom_symbols as _atom_symbols
 from ._core import (atom_implicit_hydrogen_valences as
                     _atom_implicit_hydrogen_valences)
-from ._core import (set_atom_implicit_hydrogen_valences as
-                    _set_atom_implicit_hydrogen_valences)
-from ._graph import atom_neighbor_keys as _atom_neighbor_keys
-from ._graph import atom_neighborhoods as _atom_neighborhoods
-from ._graph import delete_atoms as _delete_atoms
+from ._array import from_graph as _arrays
+from ._array import explicit_hydrogen_keys as _arr_explicit_hydrogen_keys
+from ._array import (atom_explicit_hydrogen_keys as
+                     _arr_atom_explicit_hydrogen_keys)
+from ._builder import GraphBuilder as _GraphBuilder
+from ._canon import canonical_certificate as _canonical_certificate
+from ._iso import isomorphism as _isomorphism
+from ._memo import index_cached as _index_cached
+from ._memo import memoized as _memoized
 
 
 # atom properties
+@_memoized
 def atom_explicit_hydrogen_valences(xgr):
     """ explicit hydrogen valences, by atom
     """
     return _transform_values(atom_explicit_hydrogen_keys(xgr), len)
 
 
+@_memoized
 def atom_explicit_hydrogen_keys(xgr):
     """ explicit hydrogen valences, by atom
     """
-    def _explicit_hydrogen_keys(atm_key, atm_nbh):
-        return frozenset(explicit_hydrogen_keys(atm_nbh) - {atm_key})
-
-    atm_exp_hyd_keys_dct = _transform_items_to_values(_atom_neighborhoods(xgr),
-                                                      _explicit_hydrogen_keys)
-    return atm_exp_hyd_keys_dct
+    return _arr_atom_explicit_hydrogen_keys(_arrays(xgr))
 
 
 # other properties
+@_memoized
 def backbone_keys(xgr):
     """ backbone atom keys
     """
@@ -50,18 +44,11 @@ def backbone_keys(xgr):
     return bbn_keys
 
 
+@_memoized
 def explicit_hydrogen_keys(xgr):
     """ explicit hydrogen keys (H types: explicit, implicit, backbone)
     """
-    hyd_keys = _keys_by_value(_atom_symbols(xgr), lambda x: x == 'H')
-    atm_ngb_keys_dct = _atom_neighbor_keys(xgr)
-
-    def _is_backbone(hyd_key):
-        return all(ngb_key in hyd_keys and hyd_key < ngb_key
-                   for ngb_key in atm_ngb_keys_dct[hyd_key])
-
-    exp_hyd_keys = frozenset(_filterfalse(_is_backbone, hyd_keys))
-    return exp_hyd_keys
+    return _arr_explicit_hydrogen_keys(_arrays(xgr))
 
 
 # transformations
@@ -69,18 +56,12 @@ def add_explicit_hydrogens(xgr, atm_exp_hyd_vlc_dct):
     """ add explicit hydrogens by atom
     """
     assert set(atm_exp_hyd_vlc_dct.keys()) <= _atom_keys(xgr)
-    for atm_key, atm_exp_hyd_vlc in atm_exp_hyd_vlc_dct.items():
-        next_atm_key = max(_atom_keys(xgr)) + 1
-        atm_exp_hyd_keys = set(range(next_atm_key,
-                                     next_atm_key + atm_exp_hyd_vlc))
-        atm_exp_hyd_bnd_keys = {frozenset({atm_key, atm_exp_hyd_key})
-                                for atm_exp_hyd_key in atm_exp_hyd_keys}
-        atm_exp_hyd_sym_dct = _by_key({}, atm_exp_hyd_keys, fill_val='H')
-        xgr = _add_atoms(xgr, atm_exp_hyd_sym_dct)
-        xgr = _add_bonds(xgr, atm_exp_hyd_bnd_keys)
-    return xgr
+    bld = _GraphBuilder(xgr)
+    bld.add_explicit_hydrogens(atm_exp_hyd_vlc_dct)
+    return bld.freeze()
 
 
+@_memoized
 def implicit(xgr, atm_keys=None):
     """ make the hydrogens at these atoms implicit
     """
@@ -96,12 +77,14 @@ def implicit(xgr, atm_keys=None):
 
     exp_hyd_keys = tuple(_chain(*atm_exp_hyd_keys))
 
-    xgr = _set_atom_implicit_hydrogen_valences(
-        xgr, dict(zip(atm_keys, atm_tot_hyd_vlcs)))
-    xgr = _delete_atoms(xgr, exp_hyd_keys)
-    return xgr
+    bld = _GraphBuilder(xgr)
+    bld.set_atom_implicit_hydrogen_valences(
+        dict(zip(atm_keys, atm_tot_hyd_vlcs)))
+    bld.delete_atoms(exp_hyd_keys)
+    return bld.freeze()
 
 
+@_memoized
 def explicit(xgr, atm_keys=None):
     """ make the hydrogens at these atoms explicit
     """
@@ -110,18 +93,18 @@ def explicit(xgr, atm_keys=None):
     atm_imp_hyd_vlcs = _values_by_key(
         _atom_implicit_hydrogen_valences(xgr), atm_keys)
 
-    xgr = _set_atom_implicit_hydrogen_valences(
-        xgr, _by_key({}, atm_keys, fill_val=0))
-    xgr = add_explicit_hydrogens(
-        xgr, dict(zip(atm_keys, atm_imp_hyd_vlcs)))
-    return xgr
+    bld = _GraphBuilder(xgr)
+    bld.set_atom_implicit_hydrogen_valences(
+        _by_key({}, atm_keys, fill_val=0))
+    bld.add_explicit_hydrogens(dict(zip(atm_keys, atm_imp_hyd_vlcs)))
+    return bld.freeze()
 
 
 # comparisons
 def backbone_isomorphic(xgr1, xgr2):
     """ are these molecular graphs backbone isomorphic?
     """
-    return backbone_isomorphism(xgr1, xgr2) is not None
+    return _backbone_certificate(xgr1) == _backbone_certificate(xgr2)
 
 
 def backbone_isomorphism(xgr1, xgr2):
@@ -132,14 +115,19 @@ def backbone_isomorphism(xgr1, xgr2):
     """
     xgr1 = implicit(xgr1)
     xgr2 = implicit(xgr2)
-    nxg1 = _nxg_from_graph(xgr1)
-    nxg2 = _nxg_from_graph(xgr2)
-    iso_dct = _nxg_isomorphism(nxg1, nxg2)
+    iso_dct = _isomorphism(xgr1, xgr2)
     return iso_dct
 
 
+@_index_cached
+def _backbone_certificate(xgr):
+    """ canonical certificate of the implicit graph
+    """
+    return _canonical_certificate(implicit(xgr))
+
+
 def backbone_unique(xgrs):
     """ unique non-isomorphic graphs from a series
     """
-    xgrs = _unique(xgrs, equiv=backbone_isomorphic)
+    xgrs = _unique_by_value(xgrs, _backbone_certificate)
     return xgrs
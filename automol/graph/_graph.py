@@ -1,110 +1,170 @@
 """ graph theory library
 """
 from itertools import chain as _chain
-from ._networkx import from_graph as _nxg_from_graph
-from ._networkx import minimal_rings_atom_keys as _nxg_minimal_rings_atom_keys
 from ._dict import by_key as _by_key
-from ._dict import values_by_key as _values_by_key
-from ._dict import transform_values as _transform_values
-from ._dict import transform_items_to_values as _transform_items_to_values
 from ._core import from_atoms_and_bonds as _from_atoms_and_bonds
 from ._core import atoms as _atoms
 from ._core import bonds as _bonds
 from ._core import atom_keys as _atom_keys
 from ._core import bond_keys as _bond_keys
 from ._core import frozen as _frozen
+from ._array import from_graph as _arrays
+from ._array import atom_neighbor_keys as _arr_atom_neighbor_keys
+from ._array import atom_bond_keys as _arr_atom_bond_keys
+from ._array import atom_keys as _arr_atom_keys
+from ._array import bond_keys as _arr_bond_keys
+from ._ring import cyclomatic_number as _arr_cyclomatic_number
+from ._ring import minimum_cycle_basis as _arr_minimum_cycle_basis
+from ._memo import index_cached as _index_cached
+from ._memo import memoized as _memoized
 
 
 # atom properties
 def atom_neighbor_keys(xgr):
     """ keys of neighboring atoms, by atom
     """
-    def _neighbor_keys(atm_key, atm_nbh):
-        return frozenset(_atom_keys(atm_nbh) - {atm_key})
-
-    atm_ngb_keys_dct = _transform_items_to_values(atom_neighborhoods(xgr),
-                                                  _neighbor_keys)
-    return atm_ngb_keys_dct
+    atm_ngb_keys_dct, _ = _adjacency_index(xgr)
+    return dict(atm_ngb_keys_dct)
 
 
 def atom_bond_keys(xgr):
     """ bond keys, by atom
     """
-    return _transform_values(atom_neighborhoods(xgr), _bond_keys)
+    _, atm_bnd_keys_dct = _adjacency_index(xgr)
+    return dict(atm_bnd_keys_dct)
 
 
+@_memoized
 def atom_neighborhoods(xgr):
     """ neighborhood subgraphs, by atom
     """
-    bnd_keys = _bond_keys(xgr)
+    _, atm_bnd_keys_dct = _adjacency_index(xgr)
+    return {atm_key: _bond_induced_subgraph(xgr, atm_bnd_keys)
+            for atm_key, atm_bnd_keys in atm_bnd_keys_dct.items()}
 
-    def _neighborhood(atm_key):
-        nbh_bnd_keys = set(filter(lambda x: atm_key in x, bnd_keys))
-        return bond_induced_subgraph(xgr, nbh_bnd_keys)
 
-    atm_keys = list(_atom_keys(xgr))
-    atm_nbh_dct = dict(zip(atm_keys, map(_neighborhood, atm_keys)))
-    return atm_nbh_dct
+@_index_cached
+def _adjacency_index(xgr):
+    """ neighbor keys and bond keys, by atom
+
+    built once per graph in linear time, for reuse by the functions above
+    """
+    agr = _arrays(xgr)
+    return _arr_atom_neighbor_keys(agr), _arr_atom_bond_keys(agr)
+
+
+def atom_rings_bond_keys(xgr):
+    """ bond keys for each ring containing the atom, by atom
+    """
+    _, atm_rng_bnd_keys_dct, _ = _ring_index(xgr)
+    return dict(atm_rng_bnd_keys_dct)
 
 
 # bond properties
+@_memoized
 def bond_neighbor_keys(xgr):
     """ keys of neighboring bonds, by bond
     """
-    def _neighbor_keys(bnd_key, bnd_nbh):
-        return frozenset(_bond_keys(bnd_nbh) - {bnd_key})
+    _, atm_bnd_keys_dct = _adjacency_index(xgr)
 
-    bnd_ngb_keys_dct = _transform_items_to_values(bond_neighborhoods(xgr),
-                                                  _neighbor_keys)
-    return bnd_ngb_keys_dct
+    def _neighbor_keys(bnd_key):
+        atm1_key, atm2_key = bnd_key
+        return ((atm_bnd_keys_dct[atm1_key] | atm_bnd_keys_dct[atm2_key]) -
+                {bnd_key})
+
+    bnd_keys = _bond_keys(xgr)
+    return dict(zip(bnd_keys, map(_neighbor_keys, bnd_keys)))
 
 
+@_memoized
 def bond_neighborhoods(xgr):
     """ neighborhood subgraphs, by bond
     """
-    bnd_keys = list(_bond_keys(xgr))
+    bnd_ngb_keys_dct = bond_neighbor_keys(xgr)
+    return {bnd_key: _bond_induced_subgraph(xgr, bnd_ngb_keys | {bnd_key})
+            for bnd_key, bnd_ngb_keys in bnd_ngb_keys_dct.items()}
 
-    def _neighborhood(bnd_key):
-        nbh_bnd_keys = set(filter(lambda x: bnd_key & x, bnd_keys))
-        return bond_induced_subgraph(xgr, nbh_bnd_keys)
 
-    bnd_nbh_dct = dict(zip(bnd_keys, map(_neighborhood, bnd_keys)))
-    return bnd_nbh_dct
+def bond_rings_bond_keys(xgr):
+    """ bond keys for each ring containing the bond, by bond
+    """
+    _, _, bnd_rng_bnd_keys_dct = _ring_index(xgr)
+    return dict(bnd_rng_bnd_keys_dct)
 
 
 # other properties
+@_memoized
 def branch(xgr, atm_key, bnd_key):
     """ branch extending along `bnd_key` away from `atm_key`
     """
-    return bond_induced_subgraph(xgr, branch_bond_keys(xgr, atm_key, bnd_key))
+    return _bond_induced_subgraph(xgr, branch_bond_keys(xgr, atm_key, bnd_key))
 
 
+@_memoized
 def branch_bond_keys(xgr, atm_key, bnd_key):
     """ keys for branch extending along `bnd_key` away from `atm_key`
     """
     bnd_key = frozenset(bnd_key)
     assert atm_key in bnd_key
-    assert bnd_key in _bond_keys(xgr)
+    assert bnd_key in _bonds(xgr)
+    return branches_bond_keys(xgr, atm_key)[bnd_key]
 
-    atm_bnd_keys_dct = atom_bond_keys(xgr)
 
-    bnch_bnd_keys = {bnd_key}
-    seen_bnd_keys = set()
-    excl_bnd_keys = atm_bnd_keys_dct[atm_key] - {bnd_key}
+def branches(xgr, atm_key):
+    """ branches extending along each bond away from `atm_key`, by bond
+    """
+    return {bnd_key: _bond_induced_subgraph(xgr, bnch_bnd_keys)
+            for bnd_key, bnch_bnd_keys
+            in branches_bond_keys(xgr, atm_key).items()}
 
-    new_bnd_keys = {bnd_key}
 
-    bnd_ngb_keys_dct = bond_neighbor_keys(xgr)
-    while new_bnd_keys:
-        new_bnd_ngb_keys = set(
-            _chain(*_values_by_key(bnd_ngb_keys_dct, new_bnd_keys)))
-        bnch_bnd_keys.update(new_bnd_ngb_keys - excl_bnd_keys)
-        seen_bnd_keys.update(new_bnd_keys)
-        new_bnd_keys = bnch_bnd_keys - seen_bnd_keys
+def branches_atom_keys(xgr, atm_key):
+    """ atom keys for the branches extending away from `atm_key`, by bond
 
-    return frozenset(bnch_bnd_keys)
+    (each branch includes `atm_key` itself)
+    """
+    return {bnd_key: frozenset(_chain(*bnch_bnd_keys))
+            for bnd_key, bnch_bnd_keys
+            in branches_bond_keys(xgr, atm_key).items()}
 
 
+@_memoized
+def branches_bond_keys(xgr, atm_key):
+    """ bond keys for the branches extending away from `atm_key`, by bond
+
+    a single traversal finds the pieces left over when `atm_key` is removed;
+    the branch along a bond is that bond plus the piece on its far side (so
+    bonds in the same ring lead to the same piece)
+    """
+    atm_ngb_keys_dct, atm_bnd_keys_dct = _adjacency_index(xgr)
+    assert atm_key in atm_ngb_keys_dct
+
+    pce_bnd_keys_dct = {}
+    for ngb_key in atm_ngb_keys_dct[atm_key]:
+        if ngb_key not in pce_bnd_keys_dct:
+            # depth-first search over atoms, never passing through `atm_key`
+            pce_atm_keys = {ngb_key}
+            pce_bnd_keys = set()
+            stack = [ngb_key]
+            while stack:
+                key = stack.pop()
+                for bnd_key in atm_bnd_keys_dct[key]:
+                    if atm_key not in bnd_key:
+                        pce_bnd_keys.add(bnd_key)
+                        new_keys = bnd_key - pce_atm_keys
+                        pce_atm_keys.update(new_keys)
+                        stack.extend(new_keys)
+
+            pce_bnd_keys = frozenset(pce_bnd_keys)
+            pce_bnd_keys_dct.update(
+                dict.fromkeys(pce_atm_keys, pce_bnd_keys))
+
+    return {bnd_key: pce_bnd_keys_dct[next(iter(bnd_key - {atm_key}))]
+            | {bnd_key}
+            for bnd_key in atm_bnd_keys_dct[atm_key]}
+
+
+@_memoized
 def rings(xgr):
     """ rings in the graph (minimal basis)
     """
@@ -113,18 +173,41 @@ def rings(xgr):
     return tuple(sorted(xgrs, key=_frozen))
 
 
+@_memoized
 def rings_bond_keys(xgr):
     """ bond keys for each ring in the graph (minimal basis)
     """
-    bnd_keys = _bond_keys(xgr)
+    rng_bnd_keys_lst, _, _ = _ring_index(xgr)
+    return rng_bnd_keys_lst
 
-    def _ring_bond_keys(rng_atm_keys):
-        return frozenset(filter(lambda x: x <= rng_atm_keys, bnd_keys))
 
-    nxg = _nxg_from_graph(xgr)
-    rng_atm_keys_lst = _nxg_minimal_rings_atom_keys(nxg)
-    rng_bnd_keys_lst = frozenset(map(_ring_bond_keys, rng_atm_keys_lst))
-    return rng_bnd_keys_lst
+@_index_cached
+def _ring_index(xgr):
+    """ ring bond keys, along with the rings containing each atom and bond
+
+    built once per graph, for reuse by the functions above -- acyclic graphs
+    return right away
+    """
+    agr = _arrays(xgr)
+    atm_keys = _arr_atom_keys(agr)
+    bnd_keys = _arr_bond_keys(agr)
+    atm_rng_bnd_keys_dct = dict.fromkeys(atm_keys, frozenset())
+    bnd_rng_bnd_keys_dct = dict.fromkeys(bnd_keys, frozenset())
+
+    if not _arr_cyclomatic_number(agr):
+        return frozenset(), atm_rng_bnd_keys_dct, bnd_rng_bnd_keys_dct
+
+    rng_bnd_keys_lst = frozenset(
+        frozenset(map(bnd_keys.__getitem__, rng_bnd_idxs))
+        for rng_bnd_idxs in _arr_minimum_cycle_basis(agr))
+
+    for rng_bnd_keys in rng_bnd_keys_lst:
+        for atm_key in frozenset(_chain(*rng_bnd_keys)):
+            atm_rng_bnd_keys_dct[atm_key] |= {rng_bnd_keys}
+        for bnd_key in rng_bnd_keys:
+            bnd_rng_bnd_keys_dct[bnd_key] |= {rng_bnd_keys}
+
+    return rng_bnd_keys_lst, atm_rng_bnd_keys_dct, bnd_rng_bnd_keys_dct
 
 
 def subgraph(xgr, atm_keys):
@@ -141,13 +224,21 @@ def subgraph(xgr, atm_keys):
 def bond_induced_subgraph(xgr, bnd_keys):
     """ the subgraph induced by a subset of the bonds
     """
-    atm_keys = set(_chain(*bnd_keys))
     bnd_keys = set(bnd_keys)
-    assert atm_keys <= _atom_keys(xgr)
     assert bnd_keys <= _bond_keys(xgr)
-    atm_dct = _by_key(_atoms(xgr), atm_keys)
-    bnd_dct = _by_key(_bonds(xgr), bnd_keys)
-    return _from_atoms_and_bonds(atm_dct, bnd_dct)
+    return _bond_induced_subgraph(xgr, bnd_keys)
+
+
+def _bond_induced_subgraph(xgr, bnd_keys):
+    """ bond-induced subgraph, without checking the keys
+
+    (the cost scales with the size of the subgraph, not the graph)
+    """
+    atm_dct = _atoms(xgr)
+    bnd_dct = _bonds(xgr)
+    atm_keys = set(_chain(*bnd_keys))
+    return _from_atoms_and_bonds({key: atm_dct[key] for key in atm_keys},
+                                 {key: bnd_dct[key] for key in bnd_keys})
 
 
 # transformations
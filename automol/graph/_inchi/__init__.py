@@ -4,10 +4,28 @@ from ._inchi_ import atom_inchi_numbers
 from ._inchi_ import inchi
 # from ._inchi_ import atom_stereo_inchi_numbers_from_coordinates
 from ._inchi_ import stereo_inchi_from_coordinates
+from ._inchi_ import rdkit_molecule_with_atom_key_mapping
+from ._inchi_ import molfile_with_atom_key_mapping
+from ._hardcoded import register_hardcoded_inchi
+from ._cache import inchi_caching
+from ._cache import enable_inchi_cache
+from ._cache import disable_inchi_cache
+from ._cache import flush_inchi_cache
+from ._cache import clear_inchi_cache
+from ._cache import inchi_cache_info
 
 __all__ = [
     'atom_inchi_numbers',
     'inchi',
     # 'atom_stereo_inchi_numbers_from_coordinates',
     'stereo_inchi_from_coordinates',
+    'rdkit_molecule_with_atom_key_mapping',
+    'molfile_with_atom_key_mapping',
+    'register_hardcoded_inchi',
+    'inchi_caching',
+    'enable_inchi_cache',
+    'disable_inchi_cache',
+    'flush_inchi_cache',
+    'clear_inchi_cache',
+    'inchi_cache_info',
 ]
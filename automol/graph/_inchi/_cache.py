@@ -0,0 +1,191 @@
+""" caching of InChI conversions, keyed on canonical graph hashes
+
+Isomorphic graphs have the same InChI, so results are stored under the
+canonical hash of the graph (see `_canon`) and found again for any relabeling
+of it. Along with the InChI, the cache keeps the InChI number of each atom
+by canonical number, which is mapped back onto the caller's atom keys on a
+hit. There are two levels: an in-memory store that evicts the least recently
+used entries, and an optional SQLite file that persists across sessions.
+Writes to the file are committed in batches, and when it is flushed or closed.
+"""
+import atexit
+import collections
+import contextlib
+import json
+import sqlite3
+from collections import OrderedDict as _OrderedDict
+from .._memo import register_cache as _register_cache
+from .._memo import CacheInfo as _CacheInfo
+
+INCHI_CACHE_SIZE = 4096
+
+# the number of results written to the on-disk store between commits
+INCHI_CACHE_COMMIT_SIZE = 256
+
+# bump this if the canonical labeling changes, so that stale numberings on
+# disk are not used
+INCHI_CACHE_VERSION = 2
+
+InchiCacheInfo = collections.namedtuple(
+    'InchiCacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'path'])
+
+_CACHE = _OrderedDict()
+_CACHE_STATE = {'enabled': False, 'maxsize': INCHI_CACHE_SIZE, 'path': None,
+                'db': None, 'nwrites': 0, 'hits': 0, 'misses': 0}
+
+
+def enable_inchi_cache(maxsize=INCHI_CACHE_SIZE, path=None):
+    """ turn caching of InChI conversions on
+
+    at most `maxsize` results are kept in memory, evicting the least recently
+    used; if `path` is given, results are also stored in an SQLite file there
+    """
+    assert maxsize > 0
+    _close_db()
+    _CACHE_STATE.update({'enabled': True, 'maxsize': maxsize, 'path': path})
+    if path is not None:
+        db = sqlite3.connect(path)
+        db.execute('CREATE TABLE IF NOT EXISTS inchi_cache '
+                   '(key TEXT PRIMARY KEY, value TEXT)')
+        db.commit()
+        _CACHE_STATE['db'] = db
+    while len(_CACHE) > maxsize:
+        _CACHE.popitem(last=False)
+
+
+def disable_inchi_cache():
+    """ turn caching of InChI conversions off, and clear it from memory
+
+    (the on-disk store, if any, is committed and closed but kept)
+    """
+    _close_db()
+    _CACHE_STATE.update({'enabled': False, 'path': None})
+    clear_inchi_cache()
+
+
+def flush_inchi_cache():
+    """ commit the results written to the on-disk InChI cache, if any
+    """
+    db = _CACHE_STATE['db']
+    if db is not None and _CACHE_STATE['nwrites']:
+        db.commit()
+    _CACHE_STATE['nwrites'] = 0
+
+
+def clear_inchi_cache():
+    """ clear the in-memory InChI cache and reset the statistics
+    """
+    _CACHE.clear()
+    _CACHE_STATE.update({'hits': 0, 'misses': 0})
+
+
+def inchi_cache_info():
+    """ InChI cache statistics, as (hits, misses, maxsize, currsize, path)
+    """
+    return InchiCacheInfo(_CACHE_STATE['hits'], _CACHE_STATE['misses'],
+                          _CACHE_STATE['maxsize'], len(_CACHE),
+                          _CACHE_STATE['path'])
+
+
+def _memory_cache_info():
+    return _CacheInfo(*inchi_cache_info()[:4])
+
+
+# (only the in-memory cache is cleared along with the memo)
+_register_cache('inchi', _memory_cache_info, clear_inchi_cache)
+
+
+@contextlib.contextmanager
+def inchi_caching(maxsize=INCHI_CACHE_SIZE, path=None):
+    """ cache InChI conversions within a `with` block
+
+    the in-memory cache is cleared on the way out, and the previous settings
+    restored
+    """
+    prev_state = {key: _CACHE_STATE[key]
+                  for key in ('enabled', 'maxsize', 'path')}
+    enable_inchi_cache(maxsize=maxsize, path=path)
+    try:
+        yield
+    finally:
+        disable_inchi_cache()
+        if prev_state['enabled']:
+            enable_inchi_cache(maxsize=prev_state['maxsize'],
+                               path=prev_state['path'])
+
+
+def is_enabled():
+    """ is the InChI cache on?
+    """
+    return _CACHE_STATE['enabled']
+
+
+def lookup(kind, can_hash):
+    """ the cached value for this kind of conversion and canonical hash, or
+    None
+    """
+    key = _key(kind, can_hash)
+    if key in _CACHE:
+        _CACHE_STATE['hits'] += 1
+        _CACHE.move_to_end(key)
+        return _CACHE[key]
+
+    val = None
+    db = _CACHE_STATE['db']
+    if db is not None:
+        row = db.execute('SELECT value FROM inchi_cache WHERE key = ?',
+                         (key,)).fetchone()
+        if row is not None:
+            val = _from_json(row[0])
+            _store_in_memory(key, val)
+
+    _CACHE_STATE['hits' if val is not None else 'misses'] += 1
+    return val
+
+
+def store(kind, can_hash, val):
+    """ cache a value for this kind of conversion and canonical hash
+
+    (the value is an InChI string, optionally paired with a tuple of InChI
+    numbers by canonical number)
+    """
+    key = _key(kind, can_hash)
+    _store_in_memory(key, val)
+
+    db = _CACHE_STATE['db']
+    if db is not None:
+        db.execute('INSERT OR REPLACE INTO inchi_cache VALUES (?, ?)',
+                   (key, json.dumps(val)))
+        _CACHE_STATE['nwrites'] += 1
+        if _CACHE_STATE['nwrites'] >= INCHI_CACHE_COMMIT_SIZE:
+            flush_inchi_cache()
+
+
+def _key(kind, can_hash):
+    return '{}:{}:{}'.format(INCHI_CACHE_VERSION, kind, can_hash)
+
+
+def _store_in_memory(key, val):
+    _CACHE[key] = val
+    while len(_CACHE) > _CACHE_STATE['maxsize']:
+        _CACHE.popitem(last=False)
+
+
+def _from_json(val_str):
+    val = json.loads(val_str)
+    if isinstance(val, list):
+        ich, ich_nums = val
+        val = (ich, tuple(ich_nums))
+    return val
+
+
+def _close_db():
+    flush_inchi_cache()
+    db = _CACHE_STATE['db']
+    if db is not None:
+        db.close()
+    _CACHE_STATE['db'] = None
+
+
+# results still waiting to be committed are written out on exit
+atexit.register(_close_db)
@@ -0,0 +1,67 @@
+""" hardcoded InChIs, for species that the InChI library can't handle
+
+(such as atoms and diatomics with more than 2 unpaired electrons)
+
+The species are indexed by formula, so that a graph only gets compared with
+the ones it could match, and most graphs are turned away by a single lookup.
+"""
+from .._core import atom_symbols as _atom_symbols
+from .._core import (atom_implicit_hydrogen_valences as
+                     _atom_implicit_hydrogen_valences)
+from .._expl import backbone_isomorphic as _backbone_isomorphic
+from .._expl import backbone_isomorphism as _backbone_isomorphism
+
+_HARDCODED_DCT = {}
+
+
+def register_hardcoded_inchi(ich, xgr):
+    """ use this InChI string for graphs that are isomorphic to `xgr`
+
+    the atom keys of `xgr` are taken as the InChI numbers (species should be
+    registered before they are converted, since earlier results may be
+    cached)
+    """
+    _HARDCODED_DCT.setdefault(_formula_key(xgr), []).append((ich, xgr))
+
+
+def hardcoded_inchi(xgr):
+    """ the hardcoded InChI string and backbone InChI numbers for this graph
+
+    (both are None if the species isn't hardcoded)
+    """
+    ich = bbn_ich_num_dct = None
+    for ref_ich, ref_xgr in _HARDCODED_DCT.get(_formula_key(xgr), ()):
+        if _backbone_isomorphic(xgr, ref_xgr):
+            ich = ref_ich
+            bbn_ich_num_dct = _backbone_isomorphism(xgr, ref_xgr)
+            break
+
+    return ich, bbn_ich_num_dct
+
+
+def _formula_key(xgr):
+    """ the formula, as sorted (symbol, count) pairs
+
+    (hydrogens are counted whether they are explicit or implicit)
+    """
+    fml_dct = {}
+    for sym in _atom_symbols(xgr).values():
+        fml_dct[sym] = fml_dct.get(sym, 0) + 1
+    nhyd = sum(_atom_implicit_hydrogen_valences(xgr).values())
+    if nhyd:
+        fml_dct['H'] = fml_dct.get('H', 0) + nhyd
+    return tuple(sorted(fml_dct.items()))
+
+
+register_hardcoded_inchi(
+    'InChI=1S/C', ({0: ('C', 0, None)}, {}))
+register_hardcoded_inchi(
+    'InChI=1S/N', ({0: ('N', 0, None)}, {}))
+register_hardcoded_inchi(
+    'InChI=1S/CH/h1H', ({0: ('C', 1, None)}, {}))
+register_hardcoded_inchi(
+    'InChI=1S/CF/c1-2', ({0: ('C', 0, None), 1: ('F', 0, None)},
+                         {frozenset({0, 1}): (1, None)}))
+register_hardcoded_inchi(
+    'InChI=1S/CCl/c1-2', ({0: ('C', 0, None), 1: ('Cl', 0, None)},
+                          {frozenset({0, 1}): (1, None)}))
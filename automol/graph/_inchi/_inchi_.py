@@ -3,60 +3,83 @@
 from itertools import chain as _chain
 from ._molfile import from_data as _mlf_from_data
 from ._inchi_aux import sorted_atom_keys as _ich_aux_sorted_atom_keys
+from ._rdkit import from_data as _rdm_from_data
 from ._rdkit import from_molfile as _rdm_from_molfile
 from ._rdkit import to_inchi_with_aux_info as _rdm_to_inchi_with_aux_info
+from ._hardcoded import hardcoded_inchi as _hardcoded_inchi
+from ._cache import is_enabled as _inchi_cache_is_enabled
+from ._cache import lookup as _inchi_cache_lookup
+from ._cache import store as _inchi_cache_store
 from .._core import atom_keys
 from .._core import bond_keys
 from .._core import atom_symbols
 from .._core import bond_orders
+from .._core import without_stereo_parities as _without_stereo_parities
 from .._expl import atom_explicit_hydrogen_keys
 from .._expl import backbone_keys
-from .._expl import backbone_isomorphic
-from .._expl import backbone_isomorphism
+from .._expl import implicit as _implicit
+from .._canon import atom_canonical_numbers as _atom_canonical_numbers
+from .._canon import canonical_hash as _canonical_hash
 from .._res import atom_bond_valences
 from .._res import atom_radical_valences
 from .._res import dominant_resonance
 from .._dict import values_by_key as _values_by_key
 from .._dict import keys_sorted_by_value as _keys_sorted_by_value
+from .._memo import index_cached as _index_cached
+from .._memo import memoized as _memoized
 
 
+@_memoized
 def atom_inchi_numbers(xgr):
     """ InChI numbers, by atom
     """
-    _, atm_ich_num_dct = _with_atom_inchi_numbers(xgr)
+    _, atm_ich_num_dct = with_atom_inchi_numbers(xgr)
     return atm_ich_num_dct
 
 
+@_memoized
 def inchi(xgr):
     """ InChI string of this connectivity graph
     """
-    ich, _ = _with_atom_inchi_numbers(xgr)
+    ich, _ = with_atom_inchi_numbers(xgr)
     return ich
 
 
 # def atom_stereo_inchi_numbers_from_coordinates(xgr, atm_xyz_dct):
 #     """ stereo-specific InChI numbers, by atom
 #     """
-#     _, atm_ich_num_dct = _with_atom_inchi_numbers(xgr, atm_xyz_dct)
+#     _, atm_ich_num_dct = with_atom_inchi_numbers(xgr, atm_xyz_dct)
 #     return atm_ich_num_dct
 
 
 def stereo_inchi_from_coordinates(xgr, atm_xyz_dct):
     """ stereo-specific InChI of this connectivity graph from coordinates
     """
-    ich, _ = _with_atom_inchi_numbers(xgr, atm_xyz_dct)
+    ich, _ = with_atom_inchi_numbers(xgr, atm_xyz_dct)
     return ich
 
 
-def _with_atom_inchi_numbers(xgr, atm_xyz_dct=None):
+def with_atom_inchi_numbers(xgr, atm_xyz_dct=None):
     """ InChI string with numbering from a connectivity graph
 
     For stereo InChIs, pass cartesian coordinates and set the chirality flag.
     """
-    ich, bbn_ich_num_dct = _catch_hardcoded(xgr)
+    if atm_xyz_dct is None and _inchi_cache_is_enabled():
+        ich, bbn_ich_num_dct = _cached_with_backbone_inchi_numbers(xgr)
+    else:
+        ich, bbn_ich_num_dct = _with_backbone_inchi_numbers(xgr, atm_xyz_dct)
+
+    atm_ich_num_dct = fill_atom_inchi_numbers(xgr, bbn_ich_num_dct)
+    return ich, atm_ich_num_dct
+
+
+def _with_backbone_inchi_numbers(xgr, atm_xyz_dct=None):
+    """ InChI string with numbering of the backbone atoms
+    """
+    ich, bbn_ich_num_dct = _hardcoded_inchi(xgr)
     if ich is None:
-        mlf, mlf_atm_key_dct = _molfile_with_atom_key_mapping(xgr, atm_xyz_dct)
-        rdm = _rdm_from_molfile(mlf)
+        rdm, mlf_atm_key_dct = rdkit_molecule_with_atom_key_mapping(
+            xgr, atm_xyz_dct)
         ich, ich_aux = _rdm_to_inchi_with_aux_info(rdm)
 
         # determine the inchi numbering from the AuxInfo string
@@ -66,49 +89,93 @@ def _with_atom_inchi_numbers(xgr, atm_xyz_dct=None):
         assert set(ich_srt_bbn_keys) == set(backbone_keys(xgr))
         bbn_ich_num_dct = dict(map(reversed, enumerate(ich_srt_bbn_keys)))
 
-    atm_ich_num_dct = _fill_atom_inchi_numbers(xgr, bbn_ich_num_dct)
-    return ich, atm_ich_num_dct
+    return ich, bbn_ich_num_dct
 
 
-def _catch_hardcoded(xgr):
-    """ hardcoded molecules with more than 2 unpaired electrons
+def _cached_with_backbone_inchi_numbers(xgr):
+    """ InChI string with numbering of the backbone atoms, from the cache
+
+    (the numbering is cached by canonical number, so that it carries over to
+    any relabeling of the backbone)
     """
-    ich = bbn_ich_num_dct = None
-
-    graph_dct = {
-        'InChI=1S/C': ({0: ('C', 0, None)}, {}),
-        'InChI=1S/N': ({0: ('N', 0, None)}, {}),
-        'InChI=1S/CH/h1H': ({0: ('C', 1, None)}, {}),
-        'InChI=1S/CF/c1-2': ({0: ('C', 0, None), 1: ('F', 0, None)},
-                             {frozenset({0, 1}): (1, None)}),
-        'InChI=1S/CCl/c1-2': ({0: ('C', 0, None), 1: ('Cl', 0, None)},
-                              {frozenset({0, 1}): (1, None)}),
-    }
-    for ref_ich, ref_xgr in graph_dct.items():
-        if backbone_isomorphic(xgr, ref_xgr):
-            ich = ref_ich
-            bbn_ich_num_dct = backbone_isomorphism(xgr, ref_xgr)
+    can_hash, can_num_dct = backbone_canonical_numbering(xgr)
+    val = _inchi_cache_lookup('inchi', can_hash)
+    if val is None:
+        ich, bbn_ich_num_dct = _with_backbone_inchi_numbers(xgr)
+        ich_nums = [None] * len(can_num_dct)
+        for bbn_key, can_num in can_num_dct.items():
+            ich_nums[can_num] = bbn_ich_num_dct[bbn_key]
+        _inchi_cache_store('inchi', can_hash, (ich, tuple(ich_nums)))
+    else:
+        ich, ich_nums = val
+        bbn_ich_num_dct = {bbn_key: ich_nums[can_num]
+                           for bbn_key, can_num in can_num_dct.items()}
 
     return ich, bbn_ich_num_dct
 
 
-def _molfile_with_atom_key_mapping(xgr, atm_xyz_dct=None):
+@_index_cached
+def backbone_canonical_numbering(xgr):
+    """ canonical hash and canonical numbers of the backbone
+
+    (without coordinates, the InChI only depends on the backbone)
+    """
+    bbn_xgr = _without_stereo_parities(_implicit(xgr))
+    return _canonical_hash(bbn_xgr), _atom_canonical_numbers(bbn_xgr)
+
+
+def rdkit_molecule_with_atom_key_mapping(xgr, atm_xyz_dct=None):
+    """ rdkit molecule, with a mapping from its atom numbers to the keys
+
+    (the molecule is built directly, falling back on a MOLFile round trip if
+    rdkit rejects it)
+    """
+    atm_keys, bnd_keys, *atm_vals, bnd_ords, atm_xyzs = _molecule_data(
+        xgr, atm_xyz_dct)
+    try:
+        rdm, mlf_atm_key_dct = _rdm_from_data(
+            (atm_keys, *atm_vals), (bnd_keys, bnd_ords), atm_xyzs)
+    except ValueError:
+        mlf, mlf_atm_key_dct = molfile_with_atom_key_mapping(xgr, atm_xyz_dct)
+        rdm = _rdm_from_molfile(mlf)
+    return rdm, mlf_atm_key_dct
+
+
+def molfile_with_atom_key_mapping(xgr, atm_xyz_dct=None):
+    """ MOLFile string, with a mapping from its atom numbers to the keys
+    """
+    mlf, mlf_atm_key_dct = _mlf_from_data(*_molecule_data(xgr, atm_xyz_dct))
+    return mlf, mlf_atm_key_dct
+
+
+def _molecule_data(xgr, atm_xyz_dct=None):
+    """ atom and bond data of the dominant resonance, for building a molecule
+    """
+    atm_keys, *data = _connectivity_data(xgr)
+    atm_xyzs = (None if atm_xyz_dct is None else
+                _values_by_key(atm_xyz_dct, atm_keys))
+    return (atm_keys, *data, atm_xyzs)
+
+
+@_index_cached
+def _connectivity_data(xgr):
+    """ the molecule data that doesn't depend on coordinates
+
+    (cached, since stereo InChIs are generated from the same graph with
+    different coordinates)
+    """
     rgr = dominant_resonance(xgr)
     atm_keys = list(atom_keys(rgr))
     bnd_keys = list(bond_keys(rgr))
     atm_syms = _values_by_key(atom_symbols(rgr), atm_keys)
     atm_bnd_vlcs = _values_by_key(atom_bond_valences(rgr), atm_keys)
     atm_rad_vlcs = _values_by_key(atom_radical_valences(rgr), atm_keys)
-    atm_xyzs = (None if atm_xyz_dct is None else
-                _values_by_key(atm_xyz_dct, atm_keys))
     bnd_ords = _values_by_key(bond_orders(rgr), bnd_keys)
-    mlf, mlf_atm_key_dct = _mlf_from_data(atm_keys, bnd_keys, atm_syms,
-                                          atm_bnd_vlcs, atm_rad_vlcs, bnd_ords,
-                                          atm_xyzs=atm_xyzs)
-    return mlf, mlf_atm_key_dct
+    return (atm_keys, bnd_keys, atm_syms, atm_bnd_vlcs, atm_rad_vlcs,
+            bnd_ords)
 
 
-def _fill_atom_inchi_numbers(xgr, bbn_ich_num_dct):
+def fill_atom_inchi_numbers(xgr, bbn_ich_num_dct):
     """ atom inchi number dictionary from inchi-sorted backbone keys
     """
     atm_ich_num_dct = bbn_ich_num_dct.copy()
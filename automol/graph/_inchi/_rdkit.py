@@ -1,12 +1,102 @@
 """ rdkit interface
 """
+import numpy
 from rdkit import RDLogger
+from rdkit.Geometry import Point3D as _Point3D
 import rdkit.Chem as _rd_chem
 
 _LOGGER = RDLogger.logger()
 _LOGGER.setLevel(RDLogger.ERROR)
 
 
+_BND_TYPE_DCT = {1: _rd_chem.BondType.SINGLE,
+                 2: _rd_chem.BondType.DOUBLE,
+                 3: _rd_chem.BondType.TRIPLE}
+
+
+def from_data(atm_data, bnd_data, atm_xyzs=None):
+    """ rdkit molecule object from data, built directly
+
+    (`atm_data` holds the atom keys, symbols, bond valences, and radical
+    valences, and `bnd_data` the bond keys and orders; gives the same
+    molecule as reading in the MOLFile from `_molfile.from_data`, with atoms
+    in the same order, and returns the same mapping from MOLFile atom numbers
+    back to the original keys)
+    """
+    atm_keys = atm_data[0]
+
+    # without coordinates, double bonds are flagged as either cis or trans
+    rdm = _molecule(atm_data, bnd_data, stereo_any=atm_xyzs is None)
+    rdm = rdm.GetMol()
+    conf = _conformer(len(atm_keys), atm_xyzs)
+    rdm.AddConformer(conf, assignId=True)
+    _rd_chem.SanitizeMol(rdm)
+    if conf.Is3D():
+        _rd_chem.AssignStereochemistryFrom3D(rdm)
+    else:
+        _rd_chem.DetectBondStereochemistry(rdm)
+        _rd_chem.AssignStereochemistry(rdm, cleanIt=True, force=True)
+
+    key_map_inv = {idx + 1: key for idx, key in enumerate(atm_keys)}
+    return rdm, key_map_inv
+
+
+def _molecule(atm_data, bnd_data, stereo_any):
+    """ editable rdkit molecule, with the hydrogens counted on the atoms
+    """
+    atm_keys, atm_syms, atm_bnd_vlcs, atm_rad_vlcs = atm_data
+
+    # dummy atoms are read from a MOLFile with atomic number zero
+    rdm = _rd_chem.RWMol()
+    for sym, rad in zip(atm_syms, atm_rad_vlcs):
+        rda = _rd_chem.Atom(0 if sym == 'X' else sym)
+        rda.SetNoImplicit(True)
+        rda.SetNumRadicalElectrons(int(rad))
+        rdm.AddAtom(rda)
+
+    # whatever valence the bonds don't use goes to hydrogens
+    atm_ord_sums = _add_bonds(rdm, atm_keys, bnd_data, stereo_any)
+    for rda, vlc, ord_sum in zip(rdm.GetAtoms(), atm_bnd_vlcs, atm_ord_sums):
+        rda.SetNumExplicitHs(max(int(vlc) - ord_sum, 0))
+
+    return rdm
+
+
+def _add_bonds(rdm, atm_keys, bnd_data, stereo_any):
+    """ add the bonds to an rdkit molecule, returning the sum of the bond
+    orders at each atom
+    """
+    bnd_keys, bnd_ords = bnd_data
+    key_map = dict(zip(atm_keys, range(len(atm_keys))))
+
+    atm_ord_sums = [0] * len(atm_keys)
+    for key, ord_ in zip(bnd_keys, map(int, bnd_ords)):
+        idx1, idx2 = map(key_map.__getitem__, sorted(key))
+        rdm.AddBond(idx1, idx2, _BND_TYPE_DCT[ord_])
+        atm_ord_sums[idx1] += ord_
+        atm_ord_sums[idx2] += ord_
+        if stereo_any and ord_ == 2:
+            rdm.GetBondBetweenAtoms(idx1, idx2).SetStereo(
+                _rd_chem.BondStereo.STEREOANY)
+
+    return atm_ord_sums
+
+
+def _conformer(natms, atm_xyzs=None):
+    """ rdkit conformer, with the coordinates as a MOLFile would have them
+
+    (to three decimal places, or zero if there are none, and 3D if any of them
+    are out of the plane)
+    """
+    atm_xyzs = (numpy.zeros((natms, 3)) if atm_xyzs is None else
+                numpy.round(numpy.array(atm_xyzs, dtype=float), 3))
+    conf = _rd_chem.Conformer(natms)
+    conf.Set3D(bool(numpy.any(atm_xyzs[:, 2])) if natms else False)
+    for idx, (x, y, z) in enumerate(atm_xyzs.tolist()):
+        conf.SetAtomPosition(idx, _Point3D(x, y, z))
+    return conf
+
+
 def from_molfile(mfl):
     """ rdkit molecule object from a mol block string
     """
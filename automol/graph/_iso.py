@@ -0,0 +1,178 @@
+""" graph isomorphisms, as explicit atom mappings
+
+The matcher is a depth-first search in the style of VF2. Atoms are first
+partitioned by color refinement (see `_canon`), which starts from the atom
+values (element, hydrogen count, parity) and the degree, and ends up giving
+each atom a color that reflects its symmetry. The colors are assigned
+canonically, so an isomorphism can only take an atom to an atom of the same
+color: graphs whose cells do not line up are rejected without any search, and
+the search itself only tries candidates from the matching cell. Atoms are
+visited along the bonds, so that an atom's mapped neighbor pins its candidates
+down to the neighbors of that neighbor's image.
+"""
+from collections import Counter as _Counter
+from collections import deque as _deque
+from ._canon import graph_index as _graph_index
+from ._canon import equitable_colors as _equitable_colors
+
+
+def isomorphism(xgr1, xgr2):
+    """ an isomorphism taking `xgr1` onto `xgr2`, as an atom key map
+
+    (atom and bond values have to match; returns None if the graphs are not
+    isomorphic)
+    """
+    atm_keys1, atm_vals1, bnd_vals1, atm_ngbs1 = _graph_index(xgr1)
+    atm_keys2, atm_vals2, bnd_vals2, atm_ngbs2 = _graph_index(xgr2)
+    if (len(atm_keys1) != len(atm_keys2) or
+            len(bnd_vals1) != len(bnd_vals2)):
+        return None
+
+    clrs1 = _equitable_colors(xgr1)
+    clrs2 = _equitable_colors(xgr2)
+    if (_cell_signatures(clrs1, atm_vals1, atm_ngbs1) !=
+            _cell_signatures(clrs2, atm_vals2, atm_ngbs2)):
+        return None
+
+    iso_idxs = _match((clrs1, atm_vals1, atm_ngbs1),
+                      (clrs2, atm_vals2, atm_ngbs2))
+    if iso_idxs is None:
+        return None
+
+    return {atm_keys1[idx1]: atm_keys2[idx2]
+            for idx1, idx2 in enumerate(iso_idxs)}
+
+
+def _cell_signatures(clrs, atm_vals, atm_ngbs):
+    """ the multiset of atom colors, values, and neighbor colors
+
+    (equal for isomorphic graphs, and computed in linear time)
+    """
+    return _Counter(
+        (clr, vals, tuple(sorted((bnd_vals, clrs[ngb_idx])
+                                 for ngb_idx, bnd_vals in ngbs)))
+        for clr, vals, ngbs in zip(clrs, atm_vals, atm_ngbs))
+
+
+def _match(gdat1, gdat2):
+    """ the image of each atom position under an isomorphism, or None
+
+    (each graph is given by its colors, atom values, and neighbors by atom
+    position)
+    """
+    mch = _match_state(gdat1, gdat2)
+    iso_idxs = mch['iso_idxs']
+    is_used = mch['is_used']
+    clrs1, _, ngb_dcts1 = mch['graph1']
+    order, pars = _match_order(clrs1, ngb_dcts1)
+    if not order:
+        return []
+
+    # depth-first search, with a stack of candidate iterators
+    stack = [_candidates(order[0], pars[0], mch)]
+    while stack:
+        pos = len(stack) - 1
+        idx1 = order[pos]
+        if iso_idxs[idx1] is not None:
+            is_used[iso_idxs[idx1]] = False
+            iso_idxs[idx1] = None
+
+        idx2 = next(stack[-1], None)
+        if idx2 is None:
+            stack.pop()
+        else:
+            iso_idxs[idx1] = idx2
+            is_used[idx2] = True
+            if pos + 1 == len(order):
+                return iso_idxs
+            stack.append(_candidates(order[pos + 1], pars[pos + 1], mch))
+
+    return None
+
+
+def _match_state(gdat1, gdat2):
+    """ the state of the search: both graphs, with neighbors as dictionaries,
+    the cells of the second one, and the partial mapping
+    """
+    clrs1, atm_vals1, atm_ngbs1 = gdat1
+    clrs2, atm_vals2, atm_ngbs2 = gdat2
+    natms = len(clrs1)
+
+    cell_idxs_dct2 = {}
+    for idx2, clr in enumerate(clrs2):
+        cell_idxs_dct2.setdefault(clr, []).append(idx2)
+
+    return {'graph1': (clrs1, atm_vals1, list(map(dict, atm_ngbs1))),
+            'graph2': (clrs2, atm_vals2, list(map(dict, atm_ngbs2))),
+            'cell_idxs_dct2': cell_idxs_dct2,
+            'iso_idxs': [None] * natms,
+            'is_used': [False] * natms}
+
+
+def _candidates(idx1, par_idx1, mch):
+    """ the feasible images of an atom, as an iterator
+
+    (`par_idx1` is an already mapped neighbor of the atom, or None)
+    """
+    clrs1, _, _ = mch['graph1']
+    clrs2, _, ngb_dcts2 = mch['graph2']
+    if par_idx1 is None:
+        idx2s = mch['cell_idxs_dct2'].get(clrs1[idx1], ())
+    else:
+        idx2s = [idx2 for idx2 in ngb_dcts2[mch['iso_idxs'][par_idx1]]
+                 if clrs2[idx2] == clrs1[idx1]]
+    return iter([idx2 for idx2 in idx2s if _is_feasible(idx1, idx2, mch)])
+
+
+def _is_feasible(idx1, idx2, mch):
+    """ can this atom be mapped onto this one, given the mapping so far?
+    """
+    _, atm_vals1, ngb_dcts1 = mch['graph1']
+    _, atm_vals2, ngb_dcts2 = mch['graph2']
+    iso_idxs = mch['iso_idxs']
+    is_used = mch['is_used']
+    if is_used[idx2] or atm_vals1[idx1] != atm_vals2[idx2]:
+        return False
+
+    # the bonds to mapped neighbors have to be the same, and the images can't
+    # have any others
+    nmapped = 0
+    for ngb_idx1, bnd_vals in ngb_dcts1[idx1].items():
+        ngb_idx2 = iso_idxs[ngb_idx1]
+        if ngb_idx2 is not None:
+            nmapped += 1
+            if ngb_dcts2[idx2].get(ngb_idx2) != bnd_vals:
+                return False
+    return nmapped == sum(map(is_used.__getitem__, ngb_dcts2[idx2]))
+
+
+def _match_order(clrs, ngb_dcts):
+    """ an order for matching the atoms, along with an already visited
+    neighbor (or None) for each one
+
+    each connected component is visited breadth-first, starting from an atom
+    in its smallest cell, and rarer colors go first among neighbors
+    """
+    natms = len(clrs)
+    cell_size_dct = _Counter(clrs)
+
+    def _sort_key(idx):
+        return (cell_size_dct[clrs[idx]], clrs[idx], idx)
+
+    order = []
+    pars = []
+    is_seen = [False] * natms
+    for start_idx in sorted(range(natms), key=_sort_key):
+        if not is_seen[start_idx]:
+            is_seen[start_idx] = True
+            queue = _deque([(start_idx, None)])
+            while queue:
+                idx, par_idx = queue.popleft()
+                order.append(idx)
+                pars.append(par_idx)
+                for ngb_idx in sorted(ngb_dcts[idx], key=_sort_key):
+                    if not is_seen[ngb_idx]:
+                        is_seen[ngb_idx] = True
+                        queue.append((ngb_idx, idx))
+
+    return order, pars
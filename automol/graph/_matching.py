@@ -0,0 +1,157 @@
+""" maximum matchings, for finding pi bonds
+
+A b-matching on a pi system picks how many pi bonds each bond gets, with
+each atom used at most its radical valence times. It is reduced to an
+ordinary maximum matching on a gadget graph, which is found by Edmonds'
+blossom algorithm (the pi systems are small, but they may have odd rings).
+"""
+from collections import deque as _deque
+
+
+def maximum_b_matching(vtx_cap_dct, edg_cap_dct):
+    """ maximum b-matching, as a multiplicity for each edge
+
+    each vertex `v` can be matched at most `vtx_cap_dct[v]` times and each
+    edge `e` at most `edg_cap_dct[e]` times
+
+    each vertex gets one copy per unit of capacity, and each unit of edge
+    capacity becomes a pair of gadget nodes joined to each other and to the
+    copies of the edge's two ends -- the pair is matched internally if that
+    unit is unused and externally if it is used
+    """
+    nbr_idxs_lst, edg_units = _gadget_graph(vtx_cap_dct, edg_cap_dct)
+    mat_idxs = maximum_matching(nbr_idxs_lst)
+
+    edg_mult_dct = dict.fromkeys(edg_cap_dct.keys(), 0)
+    for edg_key, gdg_idx1, gdg_idx2 in edg_units:
+        if (mat_idxs[gdg_idx1] not in (-1, gdg_idx2) and
+                mat_idxs[gdg_idx2] not in (-1, gdg_idx1)):
+            edg_mult_dct[edg_key] += 1
+    return edg_mult_dct
+
+
+def _gadget_graph(vtx_cap_dct, edg_cap_dct):
+    """ the gadget graph for a b-matching, as neighbor lists, along with the
+    edge key and the pair of gadget nodes for each unit of edge capacity
+    """
+    vtx_idxs_dct = {}
+    nidxs = 0
+    for vtx, vtx_cap in vtx_cap_dct.items():
+        vtx_idxs_dct[vtx] = list(range(nidxs, nidxs + vtx_cap))
+        nidxs += vtx_cap
+
+    nbr_idxs_lst = [[] for _ in range(nidxs)]
+    edg_units = []
+    for edg_key, edg_cap in edg_cap_dct.items():
+        vtx1, vtx2 = edg_key
+        for _ in range(edg_cap):
+            gdg_idx1 = len(nbr_idxs_lst)
+            gdg_idx2 = gdg_idx1 + 1
+            nbr_idxs_lst.append(vtx_idxs_dct[vtx1] + [gdg_idx2])
+            nbr_idxs_lst.append(vtx_idxs_dct[vtx2] + [gdg_idx1])
+            for vtx_idx in vtx_idxs_dct[vtx1]:
+                nbr_idxs_lst[vtx_idx].append(gdg_idx1)
+            for vtx_idx in vtx_idxs_dct[vtx2]:
+                nbr_idxs_lst[vtx_idx].append(gdg_idx2)
+            edg_units.append((edg_key, gdg_idx1, gdg_idx2))
+
+    return nbr_idxs_lst, edg_units
+
+
+def maximum_matching(nbr_idxs_lst):
+    """ maximum matching of a graph given as neighbor lists, as the index each
+    vertex is matched to (or -1)
+
+    (Edmonds' blossom algorithm, starting from a greedy matching)
+    """
+    nidxs = len(nbr_idxs_lst)
+    mat_idxs = [-1] * nidxs
+    for idx, nbr_idxs in enumerate(nbr_idxs_lst):
+        if mat_idxs[idx] == -1:
+            for nbr_idx in nbr_idxs:
+                if mat_idxs[nbr_idx] == -1:
+                    mat_idxs[idx] = nbr_idx
+                    mat_idxs[nbr_idx] = idx
+                    break
+
+    for root_idx in range(nidxs):
+        if mat_idxs[root_idx] == -1:
+            par_idxs = _augmenting_path(nbr_idxs_lst, mat_idxs, root_idx)
+            if par_idxs is not None:
+                idx = par_idxs.pop()
+                while idx != -1:
+                    par_idx = par_idxs[idx]
+                    next_idx = mat_idxs[par_idx]
+                    mat_idxs[idx] = par_idx
+                    mat_idxs[par_idx] = idx
+                    idx = next_idx
+    return mat_idxs
+
+
+def _augmenting_path(nbr_idxs_lst, mat_idxs, root_idx):
+    """ search for an augmenting path from an unmatched vertex
+
+    returns the parent indices along the search tree, with the free vertex
+    at the end of the path appended, or None if there is no such path
+    """
+    nidxs = len(nbr_idxs_lst)
+    par_idxs = [-1] * nidxs
+    base_idxs = list(range(nidxs))
+    is_used = [False] * nidxs
+    is_used[root_idx] = True
+    queue = _deque([root_idx])
+
+    def _common_base(idx1, idx2):
+        is_on_path = [False] * nidxs
+        while True:
+            idx1 = base_idxs[idx1]
+            is_on_path[idx1] = True
+            if mat_idxs[idx1] == -1:
+                break
+            idx1 = par_idxs[mat_idxs[idx1]]
+        while True:
+            idx2 = base_idxs[idx2]
+            if is_on_path[idx2]:
+                return idx2
+            idx2 = par_idxs[mat_idxs[idx2]]
+
+    def _mark_blossom(idx, base_idx, child_idx, in_blossom):
+        while base_idxs[idx] != base_idx:
+            in_blossom[base_idxs[idx]] = True
+            in_blossom[base_idxs[mat_idxs[idx]]] = True
+            par_idxs[idx] = child_idx
+            child_idx = mat_idxs[idx]
+            idx = par_idxs[mat_idxs[idx]]
+
+    def _contract_blossom(idx1, idx2):
+        """ contract the odd cycle closed by this edge into its base
+        """
+        base_idx = _common_base(idx1, idx2)
+        in_blossom = [False] * nidxs
+        _mark_blossom(idx1, base_idx, idx2, in_blossom)
+        _mark_blossom(idx2, base_idx, idx1, in_blossom)
+        for idx in range(nidxs):
+            if in_blossom[base_idxs[idx]]:
+                base_idxs[idx] = base_idx
+                if not is_used[idx]:
+                    is_used[idx] = True
+                    queue.append(idx)
+
+    while queue:
+        idx = queue.popleft()
+        for nbr_idx in nbr_idxs_lst[idx]:
+            if (base_idxs[idx] == base_idxs[nbr_idx] or
+                    mat_idxs[idx] == nbr_idx):
+                continue
+
+            if nbr_idx == root_idx or (mat_idxs[nbr_idx] != -1 and
+                                       par_idxs[mat_idxs[nbr_idx]] != -1):
+                _contract_blossom(idx, nbr_idx)
+            elif par_idxs[nbr_idx] == -1:
+                par_idxs[nbr_idx] = idx
+                if mat_idxs[nbr_idx] == -1:
+                    return par_idxs + [nbr_idx]
+                is_used[mat_idxs[nbr_idx]] = True
+                queue.append(mat_idxs[nbr_idx])
+
+    return None
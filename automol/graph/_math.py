@@ -12,3 +12,20 @@ def unique(itms, equiv):
             uniq_itms.append(itm)
 
     return tuple(uniq_itms)
+
+
+def unique_by_value(itms, func):
+    """ unique items from a list, according to a hashable value `func(itm)`
+
+    equivalent to `unique` for `equiv = lambda x, y: func(x) == func(y)`, but
+    with one call to `func` per item instead of a comparison per pair
+    """
+    seen_vals = set()
+    uniq_itms = []
+    for itm in itms:
+        val = func(itm)
+        if val not in seen_vals:
+            seen_vals.add(val)
+            uniq_itms.append(itm)
+
+    return tuple(uniq_itms)
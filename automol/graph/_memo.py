@@ -0,0 +1,194 @@
+""" caching of data derived from molecular graphs
+"""
+import collections
+import contextlib
+import functools
+from collections import OrderedDict as _OrderedDict
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# the other caches of graph data, as (info function, clear function) by name
+_CACHES = _OrderedDict()
+
+
+def register_cache(name, info, clear):
+    """ have `memo_info` report another cache, and `clear_memo` clear it
+
+    `info` returns its statistics as (hits, misses, maxsize, currsize), and
+    `clear` empties it and resets them
+    """
+    _CACHES[name] = (info, clear)
+
+
+# always-on caching of the indices that graph functions share, keyed on the
+# graph contents
+INDEX_CACHE_SIZE = 64
+
+_INDEX_CACHE = _OrderedDict()
+_INDEX_STATE = {'hits': 0, 'misses': 0}
+
+
+def index_cached(func):
+    """ cache a one-argument graph function on the graph's contents
+
+    This is for the indices that other graph functions build on, so that a
+    graph is only indexed once however many of them are called on it. It is
+    keyed on the graph's fingerprint, so that graphs changed in place are
+    indexed again, and the cache is shared by all of these functions, so that
+    it holds at most `INDEX_CACHE_SIZE` results in all.
+    """
+
+    @functools.wraps(func)
+    def _cached_func(xgr):
+        key = (_cached_func, fingerprint(xgr))
+        try:
+            hash(key)
+        except TypeError:
+            return func(xgr)
+
+        if key in _INDEX_CACHE:
+            _INDEX_STATE['hits'] += 1
+            _INDEX_CACHE.move_to_end(key)
+            val = _INDEX_CACHE[key]
+        else:
+            _INDEX_STATE['misses'] += 1
+            val = func(xgr)
+            _INDEX_CACHE[key] = val
+            while len(_INDEX_CACHE) > INDEX_CACHE_SIZE:
+                _INDEX_CACHE.popitem(last=False)
+        return val
+
+    return _cached_func
+
+
+def index_info():
+    """ index cache statistics, as (hits, misses, maxsize, currsize)
+    """
+    return CacheInfo(_INDEX_STATE['hits'], _INDEX_STATE['misses'],
+                     INDEX_CACHE_SIZE, len(_INDEX_CACHE))
+
+
+def _clear_index_cache():
+    _INDEX_CACHE.clear()
+    _INDEX_STATE.update({'hits': 0, 'misses': 0})
+
+
+register_cache('index', index_info, _clear_index_cache)
+
+
+# opt-in memoization of derived graph properties, keyed on the graph contents
+MemoInfo = collections.namedtuple(
+    'MemoInfo', ['hits', 'misses', 'maxsize', 'currsize', 'caches'])
+
+MEMO_SIZE = 1024
+
+_MEMO_CACHE = _OrderedDict()
+_MEMO_STATE = {'enabled': False, 'maxsize': MEMO_SIZE, 'hits': 0, 'misses': 0}
+
+
+def memoized(func):
+    """ memoize a graph function, when memoization is enabled
+
+    The first argument is the graph, which is keyed on its fingerprint. Any
+    other arguments must be hashable, or the call is not memoized. Dictionary
+    results are copied on the way out, so that callers can change them.
+    """
+
+    @functools.wraps(func)
+    def _memoized_func(xgr, *args, **kwargs):
+        if not _MEMO_STATE['enabled']:
+            return func(xgr, *args, **kwargs)
+
+        key = (_memoized_func, fingerprint(xgr), args,
+               frozenset(kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return func(xgr, *args, **kwargs)
+
+        if key in _MEMO_CACHE:
+            _MEMO_STATE['hits'] += 1
+            _MEMO_CACHE.move_to_end(key)
+            val = _MEMO_CACHE[key]
+        else:
+            _MEMO_STATE['misses'] += 1
+            val = func(xgr, *args, **kwargs)
+            _MEMO_CACHE[key] = val
+            while len(_MEMO_CACHE) > _MEMO_STATE['maxsize']:
+                _MEMO_CACHE.popitem(last=False)
+
+        return dict(val) if isinstance(val, dict) else val
+
+    return _memoized_func
+
+
+def fingerprint(xgr):
+    """ hashable fingerprint of a graph's contents
+
+    equal graphs have equal fingerprints, whatever their dictionary order
+    """
+    atm_dct, bnd_dct = xgr
+    return (frozenset(atm_dct.items()), frozenset(bnd_dct.items()))
+
+
+def enable_memoization(maxsize=MEMO_SIZE):
+    """ turn memoization of derived graph properties on
+
+    at most `maxsize` results are kept, evicting the least recently used
+    """
+    assert maxsize > 0
+    _MEMO_STATE.update({'enabled': True, 'maxsize': maxsize})
+    while len(_MEMO_CACHE) > maxsize:
+        _MEMO_CACHE.popitem(last=False)
+
+
+def disable_memoization():
+    """ turn memoization of derived graph properties off, and clear it
+    """
+    _MEMO_STATE['enabled'] = False
+    _clear_memo_cache()
+
+
+def clear_memo():
+    """ clear memoized graph properties and reset the statistics
+
+    (this clears the always-on caches as well, such as the shared graph
+    indices, but not any InChI cache stored on disk)
+    """
+    _clear_memo_cache()
+    for _, clear in _CACHES.values():
+        clear()
+
+
+def memo_info():
+    """ memoization statistics, as (hits, misses, maxsize, currsize, caches)
+
+    `caches` gives the statistics of the always-on caches, by name
+    """
+    return MemoInfo(_MEMO_STATE['hits'], _MEMO_STATE['misses'],
+                    _MEMO_STATE['maxsize'], len(_MEMO_CACHE),
+                    {name: info() for name, (info, _) in _CACHES.items()})
+
+
+@contextlib.contextmanager
+def memoization(maxsize=MEMO_SIZE):
+    """ memoize derived graph properties within a `with` block
+
+    the memo is cleared on the way out, and the previous settings restored
+    """
+    prev_state = dict(_MEMO_STATE)
+    enable_memoization(maxsize=maxsize)
+    try:
+        yield
+    finally:
+        if not prev_state['enabled']:
+            _clear_memo_cache()
+        _MEMO_STATE.update(
+            {'enabled': prev_state['enabled'],
+             'maxsize': prev_state['maxsize']})
+
+
+def _clear_memo_cache():
+    _MEMO_CACHE.clear()
+    _MEMO_STATE.update({'hits': 0, 'misses': 0})
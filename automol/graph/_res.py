@@ -1,55 +1,42 @@
 """ specific resonance graph functions
 """
-from functools import partial as _partial
+from itertools import chain as _chain
 from itertools import product as _product
 import numpy
-from ..atom import valence as _atom_valence
 from ._dict import values_by_key as _values_by_key
-from ._dict import transform_values as _transform_values
-from ._core import frozen as _frozen
+from ._dict import filter_by_value as _filter_by_value
 from ._core import atom_keys as _atom_keys
 from ._core import bond_keys as _bond_keys
-from ._core import atom_symbols as _atom_symbols
 from ._core import bond_orders as _bond_orders
 from ._core import set_bond_orders as _set_bond_orders
-from ._core import (atom_implicit_hydrogen_valences as
-                    _atom_implicit_hydrogen_valences)
 from ._core import without_bond_orders as _without_bond_orders
-from ._graph import atom_bond_keys as _atom_bond_keys
-from ._graph import atom_neighborhoods as _atom_neighborhoods
+from ._matching import maximum_b_matching as _maximum_b_matching
+from ._array import from_graph as _arrays
+from ._array import bond_keys as _arr_bond_keys
+from ._array import BND_ORDS_POS
+from ._array import atom_bond_valences as _arr_atom_bond_valences
+from ._array import atom_radical_valences as _arr_atom_radical_valences
+from ._memo import memoized as _memoized
+from ._resset import ResonanceSet as _ResonanceSet
 
 
 # atom properties
+@_memoized
 def atom_bond_valences(rgr):
     """ bond valences, by atom
     """
-    atm_keys = list(_atom_keys(rgr))
-    atm_nbhs = _values_by_key(_atom_neighborhoods(rgr), atm_keys)
-    atm_exp_bnd_vlcs = [sum(_bond_orders(nbh).values()) for nbh in atm_nbhs]
-    atm_imp_hyd_vlcs = _values_by_key(
-        _atom_implicit_hydrogen_valences(rgr), atm_keys)
-    atm_bnd_vlcs = numpy.add(atm_exp_bnd_vlcs, atm_imp_hyd_vlcs)
-    atm_bnd_vlc_dct = dict(zip(atm_keys, atm_bnd_vlcs))
-    return atm_bnd_vlc_dct
+    return _arr_atom_bond_valences(_arrays(rgr))
 
 
+@_memoized
 def atom_radical_valences(rgr):
     """ radical valences, by atom
     """
-    atm_keys = list(_atom_keys(rgr))
-    atm_bnd_vlcs = _values_by_key(atom_bond_valences(rgr), atm_keys)
-    atm_tot_vlcs = _values_by_key(_atom_total_valences(rgr), atm_keys)
-    atm_rad_vlcs = numpy.subtract(atm_tot_vlcs, atm_bnd_vlcs)
-    return dict(zip(atm_keys, atm_rad_vlcs))
-
-
-def _atom_total_valences(xgr):
-    atm_sym_dct = _atom_symbols(xgr)
-    atm_tot_vlc_dct = _transform_values(atm_sym_dct, func=_atom_valence)
-    return atm_tot_vlc_dct
+    return _arr_atom_radical_valences(_arrays(rgr))
 
 
 # bond properties
+@_memoized
 def resonance_dominant_bond_orders(rgr):
     """ resonance-dominant bond orders, by bond
     """
@@ -62,6 +49,7 @@ def resonance_dominant_bond_orders(rgr):
 
 
 # other properties
+@_memoized
 def maximum_spin_multiplicity(rgr):
     """ the highest possible spin multiplicity for this molecular graph
     """
@@ -69,6 +57,7 @@ def maximum_spin_multiplicity(rgr):
     return sum(atm_rad_vlcs) + 1
 
 
+@_memoized
 def possible_spin_multiplicities(rgr):
     """ possible spin multiplicities for this molecular graph
     """
@@ -78,67 +67,201 @@ def possible_spin_multiplicities(rgr):
     return mults
 
 
+@_memoized
+def resonance_count(rgr):
+    """ the number of resonance graphs with this connectivity
+
+    (counted per pi system, without generating the graphs)
+    """
+    pi_syss = _pi_systems(_without_bond_orders(rgr))
+    if pi_syss is None:
+        return 0
+
+    count = 1
+    for pi_sys in pi_syss:
+        _, bnd_incs_itr = _pi_bond_increment_rows(*pi_sys)
+        count *= sum(1 for _ in bnd_incs_itr)
+    return count
+
+
 # transformations
+@_memoized
 def dominant_resonance(rgr):
     """ *a* dominant (minimum spin/maximum pi) resonance graph
+
+    (the first of the dominant resonances, found directly by completing
+    maximum matchings of pi bonds between radical sites)
     """
-    return next(iter(dominant_resonances(rgr)))
+    rgr = _without_bond_orders(rgr)
+    bnd_ord_inc_dct = _dominant_pi_bond_increments(rgr)
+    if bnd_ord_inc_dct is None:
+        raise ValueError("This graph has no valid resonances.")
+    return _add_pi_bonds(rgr, bnd_ord_inc_dct)
 
 
+@_memoized
 def dominant_resonances(rgr):
     """ all dominant (minimum spin/maximum pi) resonance graphs
     """
-    rgrs = resonances(rgr)
-    mult_min = min(map(maximum_spin_multiplicity, rgrs))
-    dom_rgrs = tuple(
-        rgr for rgr in rgrs if maximum_spin_multiplicity(rgr) == mult_min)
-    return dom_rgrs
+    if _pi_system(_without_bond_orders(rgr)) is None:
+        raise ValueError("This graph has no valid resonances.")
+    return tuple(iter_dominant_resonances(rgr))
+
+
+def iter_dominant_resonances(rgr):
+    """ iterate over the dominant resonance graphs, one at a time
+
+    (in the same order as `dominant_resonances`)
+    """
+    rgr = _without_bond_orders(rgr)
+    pi_sys = _pi_system(rgr)
+    if pi_sys is None:
+        return
 
+    bnd_keys, bnd_incs_itr = _dominant_pi_bond_increment_rows(*pi_sys)
+    for bnd_incs in bnd_incs_itr:
+        yield _add_pi_bonds(rgr, dict(zip(bnd_keys, bnd_incs)))
 
+
+@_memoized
 def resonances(rgr):
     """ all resonance graphs with this connectivity
     """
     return subresonances(_without_bond_orders(rgr))
 
 
+@_memoized
 def subresonances(rgr):
     """ this graph and its lower-spin (more pi-bonded) resonances
     """
-    def _inc_range(bnd_cap):
-        return tuple(range(0, bnd_cap+1))
+    return subresonance_set(rgr).graphs()
 
-    add_pi_bonds_ = _partial(_add_pi_bonds, rgr)
 
-    atm_keys = list(_atom_keys(rgr))
-    bnd_keys = list(_bond_keys(rgr))
-    atm_rad_vlcs = _values_by_key(atom_radical_valences(rgr), atm_keys)
-    atm_bnd_keys_lst = _values_by_key(_atom_bond_keys(rgr), atm_keys)
-    bnd_caps = _values_by_key(_bond_capacities(rgr), bnd_keys)
-    bnd_ord_dct = _bond_orders(rgr)
+@_memoized
+def resonance_set(rgr):
+    """ all resonance graphs with this connectivity, as a `ResonanceSet`
+    """
+    return subresonance_set(_without_bond_orders(rgr))
+
+
+@_memoized
+def subresonance_set(rgr):
+    """ this graph and its lower-spin resonances, as a `ResonanceSet`
+
+    the bond-order rows for each pi system are computed once and combined
+    as a product, without building any graphs
+    """
+    agr = _arrays(rgr)
+    bnd_keys = _arr_bond_keys(agr)
+    bnd_idx_dct = dict(map(reversed, enumerate(bnd_keys)))
+
+    pi_syss = _pi_systems(rgr)
+    if pi_syss is None:
+        return _ResonanceSet(rgr, numpy.zeros((0, len(bnd_keys)), dtype=int))
+
+    bnd_ords = numpy.array(agr[BND_ORDS_POS]).reshape(1, -1)
+    for pi_sys in pi_syss:
+        sys_bnd_keys, sys_bnd_incs_itr = _pi_bond_increment_rows(*pi_sys)
+        sys_bnd_idxs = list(map(bnd_idx_dct.__getitem__, sys_bnd_keys))
+        sys_bnd_incs = numpy.fromiter(
+            _chain.from_iterable(sys_bnd_incs_itr), dtype=numpy.int8)
+        sys_bnd_incs = sys_bnd_incs.reshape(-1, len(sys_bnd_keys))
+        nrows = len(bnd_ords)
+        bnd_ords = numpy.repeat(bnd_ords, len(sys_bnd_incs), axis=0)
+        bnd_ords[:, sys_bnd_idxs] += numpy.tile(sys_bnd_incs, (nrows, 1))
+
+    return _ResonanceSet(rgr, bnd_ords)
+
+
+def iter_resonances(rgr):
+    """ iterate over the resonance graphs with this connectivity, unsorted
+    """
+    return iter_subresonances(_without_bond_orders(rgr))
+
+
+def iter_subresonances(rgr):
+    """ iterate over this graph and its lower-spin resonances, unsorted
+
+    pi systems that don't share atoms are independent, so each one is
+    enumerated once and the resonances are generated lazily as the product
+    """
+    pi_syss = _pi_systems(rgr)
+    if pi_syss is None:
+        return
+
+    bnd_ord_inc_dcts_lst = [tuple(_pi_bond_increments(*pi_sys))
+                            for pi_sys in pi_syss]
+    for bnd_ord_inc_dcts in _product(*bnd_ord_inc_dcts_lst):
+        bnd_ord_inc_dct = {}
+        for sys_bnd_ord_inc_dct in bnd_ord_inc_dcts:
+            bnd_ord_inc_dct.update(sys_bnd_ord_inc_dct)
+        yield _add_pi_bonds(rgr, bnd_ord_inc_dct)
+
+
+def _pi_bond_increments(atm_rad_vlc_dct, bnd_max_inc_dct):
+    """ all valid ways of adding pi bonds to a pi system, as increments by bond
+    """
+    bnd_keys, bnd_incs_itr = _pi_bond_increment_rows(
+        atm_rad_vlc_dct, bnd_max_inc_dct)
+    return (dict(zip(bnd_keys, bnd_incs)) for bnd_incs in bnd_incs_itr)
+
 
-    def _is_valid(bnd_ord_inc_dct):
-        # check if radical decrements are more than radical valences
-        def __tally(atm_bnd_keys):
-            return sum(_values_by_key(bnd_ord_inc_dct, atm_bnd_keys))
-        atm_rad_vlc_decs = tuple(map(__tally, atm_bnd_keys_lst))
-        enough_elecs = numpy.all(
-            numpy.less_equal(atm_rad_vlc_decs, atm_rad_vlcs))
-        # check if all bond orders are less than 4 (should only affect C2)
-        bnd_inc_keys = bnd_ord_inc_dct.keys()
-        bnd_incs = _values_by_key(bnd_ord_inc_dct, bnd_inc_keys)
-        bnd_ords = _values_by_key(bnd_ord_dct, bnd_inc_keys)
-        new_bnd_ords = numpy.add(bnd_ords, bnd_incs)
-        not_too_many = numpy.all(numpy.less(new_bnd_ords, 4))
-        return enough_elecs and not_too_many
-
-    def _bond_value_dictionary(bnd_vals):
-        return dict(zip(bnd_keys, bnd_vals))
-
-    bnd_ord_incs_itr = _product(*map(_inc_range, bnd_caps))
-    bnd_ord_inc_dct_itr = map(_bond_value_dictionary, bnd_ord_incs_itr)
-    bnd_ord_inc_dct_itr = filter(_is_valid, bnd_ord_inc_dct_itr)
-    rgrs = tuple(sorted(map(add_pi_bonds_, bnd_ord_inc_dct_itr), key=_frozen))
-    return rgrs
+def _pi_bond_increment_rows(atm_rad_vlc_dct, bnd_max_inc_dct):
+    """ all valid ways of adding pi bonds to a pi system, as rows of
+    increments along with the bond keys for the columns
+
+    a backtracking search that assigns increments bond by bond, going through
+    the atoms in order, and never lets an atom use more than its radical
+    valence or a bond exceed its maximum increment -- so every branch reaches
+    a solution
+    """
+    atm_bnd_keys_dct = {}
+    for bnd_key in bnd_max_inc_dct.keys():
+        for atm_key in bnd_key:
+            atm_bnd_keys_dct.setdefault(atm_key, []).append(bnd_key)
+
+    bnd_keys = []
+    added_bnd_keys = set()
+    for atm_key in sorted(atm_bnd_keys_dct.keys()):
+        for bnd_key in sorted(atm_bnd_keys_dct[atm_key], key=sorted):
+            if bnd_key not in added_bnd_keys:
+                bnd_keys.append(bnd_key)
+                added_bnd_keys.add(bnd_key)
+
+    bnd_atm_keys_lst = [tuple(bnd_key) for bnd_key in bnd_keys]
+    bnd_max_incs = [bnd_max_inc_dct[bnd_key] for bnd_key in bnd_keys]
+    atm_rem_vlc_dct = {atm_key: atm_rad_vlc_dct[atm_key]
+                       for atm_key in atm_bnd_keys_dct}
+
+    def _backtrack():
+        nbnds = len(bnd_keys)
+        bnd_incs = [-1] * nbnds     # -1 marks a bond that isn't reached yet
+        idx = 0
+        while idx >= 0:
+            if idx == nbnds:
+                yield tuple(bnd_incs)
+                idx -= 1
+                continue
+
+            atm1_key, atm2_key = bnd_atm_keys_lst[idx]
+            inc = bnd_incs[idx]
+            if inc >= 0:
+                atm_rem_vlc_dct[atm1_key] += inc
+                atm_rem_vlc_dct[atm2_key] += inc
+
+            inc += 1
+            if inc <= min(atm_rem_vlc_dct[atm1_key],
+                          atm_rem_vlc_dct[atm2_key],
+                          bnd_max_incs[idx]):
+                bnd_incs[idx] = inc
+                atm_rem_vlc_dct[atm1_key] -= inc
+                atm_rem_vlc_dct[atm2_key] -= inc
+                idx += 1
+            else:
+                bnd_incs[idx] = -1
+                idx -= 1
+
+    return tuple(bnd_keys), _backtrack()
 
 
 def _bond_capacities(rgr):
@@ -155,6 +278,139 @@ def _bond_capacities(rgr):
     return bnd_cap_dct
 
 
+def _pi_system(rgr):
+    """ radical valences and maximum pi-bond increments of bonds that can take
+    them, or None if the graph has no valid resonances
+    """
+    atm_rad_vlc_dct = atom_radical_valences(rgr)
+    bnd_ord_dct = _bond_orders(rgr)
+    if (any(atm_rad_vlc < 0 for atm_rad_vlc in atm_rad_vlc_dct.values()) or
+            any(bnd_ord > 3 for bnd_ord in bnd_ord_dct.values())):
+        return None
+
+    bnd_cap_dct = _bond_capacities(rgr)
+    bnd_max_inc_dct = {bnd_key: min(bnd_cap, 3 - bnd_ord_dct[bnd_key])
+                       for bnd_key, bnd_cap in bnd_cap_dct.items()}
+    bnd_max_inc_dct = _filter_by_value(bnd_max_inc_dct, lambda x: x > 0)
+    return atm_rad_vlc_dct, bnd_max_inc_dct
+
+
+def _pi_systems(rgr):
+    """ the independent pi systems, as radical valences and maximum pi-bond
+    increments for each, or None if the graph has no valid resonances
+
+    (a pi system is a connected set of bonds that can take pi bonds)
+    """
+    pi_sys = _pi_system(rgr)
+    if pi_sys is None:
+        return None
+
+    atm_rad_vlc_dct, bnd_max_inc_dct = pi_sys
+    atm_bnd_keys_dct = {}
+    for bnd_key in bnd_max_inc_dct.keys():
+        for atm_key in bnd_key:
+            atm_bnd_keys_dct.setdefault(atm_key, []).append(bnd_key)
+
+    pi_syss = []
+    seen_atm_keys = set()
+    for start_key in sorted(atm_bnd_keys_dct.keys()):
+        if start_key not in seen_atm_keys:
+            seen_atm_keys.add(start_key)
+            sys_bnd_keys = set()
+            stack = [start_key]
+            while stack:
+                atm_key = stack.pop()
+                for bnd_key in atm_bnd_keys_dct[atm_key]:
+                    sys_bnd_keys.add(bnd_key)
+                    for ngb_key in bnd_key - seen_atm_keys:
+                        seen_atm_keys.add(ngb_key)
+                        stack.append(ngb_key)
+
+            sys_atm_keys = frozenset().union(*sys_bnd_keys)
+            pi_syss.append(
+                ({atm_key: atm_rad_vlc_dct[atm_key]
+                  for atm_key in sys_atm_keys},
+                 {bnd_key: bnd_max_inc_dct[bnd_key]
+                  for bnd_key in sys_bnd_keys}))
+
+    return tuple(pi_syss)
+
+
+def _dominant_pi_bond_increments(rgr):
+    """ pi-bond increments for the dominant resonance with the lowest bond
+    orders (in sorted bond order), or None if there are no valid resonances
+    """
+    pi_sys = _pi_system(rgr)
+    if pi_sys is None:
+        return None
+
+    bnd_keys, bnd_incs_itr = _dominant_pi_bond_increment_rows(*pi_sys)
+    return dict(zip(bnd_keys, next(bnd_incs_itr)))
+
+
+def _dominant_pi_bond_increment_rows(atm_rad_vlc_dct, bnd_max_inc_dct):
+    """ the dominant ways of adding pi bonds to a pi system, as rows of
+    increments in sorted order, along with the (sorted) bond keys for the
+    columns
+
+    a depth-first search in lexicographic order, in which each step is only
+    taken if it can be completed to a dominant resonance, so that every
+    branch reaches one -- a step is checked with a maximum b-matching on the
+    remaining bonds, unless the completion that led to the current branch
+    already takes it
+    """
+    bnd_keys = tuple(sorted(bnd_max_inc_dct.keys(), key=sorted))
+    nbnds = len(bnd_keys)
+
+    def _completion(bnd_incs):
+        """ the increments on the first bonds, completed with as many pi
+        bonds as possible on the rest, or None if an atom is overfilled
+        """
+        atm_rem_vlc_dct = dict(atm_rad_vlc_dct)
+        for bnd_key, bnd_inc in zip(bnd_keys, bnd_incs):
+            for atm_key in bnd_key:
+                atm_rem_vlc_dct[atm_key] -= bnd_inc
+        if any(atm_rem_vlc < 0 for atm_rem_vlc in atm_rem_vlc_dct.values()):
+            return None
+
+        rem_bnd_cap_dct = {
+            bnd_key: min(bnd_max_inc_dct[bnd_key],
+                         *map(atm_rem_vlc_dct.__getitem__, bnd_key))
+            for bnd_key in bnd_keys[len(bnd_incs):]}
+        rem_bnd_inc_dct = _maximum_b_matching(atm_rem_vlc_dct,
+                                              rem_bnd_cap_dct)
+        return bnd_incs + tuple(map(rem_bnd_inc_dct.__getitem__,
+                                    bnd_keys[len(bnd_incs):]))
+
+    def _dominant_rows():
+        dom_bnd_incs = _completion(())
+        tot_inc = sum(dom_bnd_incs)
+
+        # each branch is paired with a dominant resonance that completes it
+        stack = [((), dom_bnd_incs)]
+        while stack:
+            bnd_incs, dom_bnd_incs = stack.pop()
+            idx = len(bnd_incs)
+            if idx == nbnds:
+                yield bnd_incs
+                continue
+
+            next_branches = []
+            for bnd_inc in range(bnd_max_inc_dct[bnd_keys[idx]] + 1):
+                next_bnd_incs = bnd_incs + (bnd_inc,)
+                if bnd_inc == dom_bnd_incs[idx]:
+                    next_branches.append((next_bnd_incs, dom_bnd_incs))
+                else:
+                    next_dom_bnd_incs = _completion(next_bnd_incs)
+                    if (next_dom_bnd_incs is not None and
+                            sum(next_dom_bnd_incs) == tot_inc):
+                        next_branches.append(
+                            (next_bnd_incs, next_dom_bnd_incs))
+            stack.extend(reversed(next_branches))
+
+    return bnd_keys, _dominant_rows()
+
+
 def _add_pi_bonds(rgr, bnd_ord_inc_dct):
     """ add pi bonds to this graph
     """
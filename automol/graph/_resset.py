@@ -0,0 +1,112 @@
+""" compact set of resonance graphs
+
+Resonance graphs of one molecule differ only in their bond orders, so the set
+stores a single base graph along with an int8 matrix of bond orders, with one
+row per resonance and one column per bond. Columns are in array order (see
+`_array`), so sorting the rows lexicographically sorts the resonances the same
+way `frozen` does. Full graphs are only built on demand.
+"""
+import numpy
+from ._core import set_bond_orders as _set_bond_orders
+from ._array import from_graph as _arrays
+from ._array import bond_keys as _arr_bond_keys
+from ._array import atom_keys as _arr_atom_keys
+from ._array import atom_radical_valence_array as _atom_radical_valence_array
+from ._array import BND_ATM_IDXS_POS
+from ._array import BND_ORDS_POS
+
+
+class ResonanceSet():
+    """ resonance graphs, as bond-order rows over a shared base graph
+    """
+
+    def __init__(self, rgr, bnd_ords):
+        """ `bnd_ords` is a (resonances x bonds) array of bond orders, with
+        bonds in array order; the rows are sorted on construction
+        """
+        agr = _arrays(rgr)
+        nbnds = len(agr[BND_ORDS_POS])
+        bnd_ords = numpy.array(bnd_ords, dtype=numpy.int8).reshape(
+            len(bnd_ords), nbnds)
+
+        # lexsort takes the primary key last
+        srt_idxs = numpy.lexsort(bnd_ords.T[::-1]) if nbnds else slice(None)
+        bnd_ords = bnd_ords[srt_idxs]
+        bnd_ords.flags.writeable = False
+
+        self._rgr = rgr
+        self._agr = agr
+        self._bnd_ords = bnd_ords
+
+    def __len__(self):
+        return len(self._bnd_ords)
+
+    def __getitem__(self, idx):
+        """ the resonance graph at this position
+        """
+        bnd_ords = self._bnd_ords[idx].tolist()
+        return _set_bond_orders(
+            self._rgr, dict(zip(self.bond_keys(), bnd_ords)))
+
+    def __iter__(self):
+        return (self[idx] for idx in range(len(self)))
+
+    def graphs(self):
+        """ all of the resonance graphs, in sorted order
+        """
+        return tuple(self)
+
+    def base_graph(self):
+        """ the graph the resonances were built on
+        """
+        return self._rgr
+
+    def atom_keys(self):
+        """ atom keys, in column order for atom arrays
+        """
+        return _arr_atom_keys(self._agr)
+
+    def bond_keys(self):
+        """ bond keys, in column order for the bond-order matrix
+        """
+        return _arr_bond_keys(self._agr)
+
+    def bond_orders(self):
+        """ the (resonances x bonds) bond-order matrix
+        """
+        return self._bnd_ords
+
+    def atom_radical_valences(self):
+        """ the (resonances x atoms) matrix of radical valences
+        """
+        agr = self._agr
+        bnd_atm_idxs = agr[BND_ATM_IDXS_POS].tolist()
+
+        # every resonance differs from the base graph only in its bond orders
+        bnd_ord_diffs = (self._bnd_ords.astype(int) -
+                         agr[BND_ORDS_POS].astype(int))
+        atm_rad_vlcs = numpy.tile(_atom_radical_valence_array(agr),
+                                  (len(self), 1))
+        for bnd_idx, (atm1_idx, atm2_idx) in enumerate(bnd_atm_idxs):
+            atm_rad_vlcs[:, atm1_idx] -= bnd_ord_diffs[:, bnd_idx]
+            atm_rad_vlcs[:, atm2_idx] -= bnd_ord_diffs[:, bnd_idx]
+        return atm_rad_vlcs
+
+    def spin_multiplicities(self):
+        """ the maximum spin multiplicity of each resonance
+        """
+        agr = self._agr
+
+        # each added pi bond takes one radical valence from each of its atoms
+        rad_vlc = _atom_radical_valence_array(agr).sum()
+        bnd_ord_diffs = (self._bnd_ords.astype(int) -
+                         agr[BND_ORDS_POS].astype(int))
+        return rad_vlc - 2 * bnd_ord_diffs.sum(axis=1) + 1
+
+    def lowest_spin(self):
+        """ the subset of resonances with the lowest spin multiplicity
+        """
+        mults = self.spin_multiplicities()
+        idxs = (numpy.flatnonzero(mults == mults.min()) if len(mults) else
+                numpy.array([], dtype=int))
+        return ResonanceSet(self._rgr, self._bnd_ords[idxs])
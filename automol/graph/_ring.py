@@ -0,0 +1,143 @@
+""" ring perception kernels, on the compact array representation
+
+The rings are a minimum cycle basis (the smallest set of smallest rings),
+found with Horton's algorithm: every shortest path tree gives one candidate
+ring per non-tree bond, and the shortest candidates are added one at a time
+as long as they are independent of the ones before them. Rings are written
+as bitsets over bond positions, so that independence is checked by Gaussian
+elimination over GF(2) on plain integers.
+"""
+import collections
+from ._array import atom_keys as _atom_keys
+from ._array import BND_ATM_IDXS_POS
+
+
+def cyclomatic_number(agr):
+    """ the number of independent rings
+    """
+    natms = len(_atom_keys(agr))
+    bnd_atm_idxs = agr[BND_ATM_IDXS_POS].tolist()
+    nbnds = len(bnd_atm_idxs)
+
+    # union-find, to count the connected components
+    roots = list(range(natms))
+
+    def _root(idx):
+        while roots[idx] != idx:
+            roots[idx] = roots[roots[idx]]
+            idx = roots[idx]
+        return idx
+
+    ncomps = natms
+    for idx1, idx2 in bnd_atm_idxs:
+        root1, root2 = _root(idx1), _root(idx2)
+        if root1 != root2:
+            roots[root1] = root2
+            ncomps -= 1
+
+    return nbnds - natms + ncomps
+
+
+def minimum_cycle_basis(agr):
+    """ bond positions for each ring in a minimum cycle basis
+    """
+    nrngs = cyclomatic_number(agr)
+    if not nrngs:
+        return ()
+
+    natms = len(_atom_keys(agr))
+    bnd_atm_idxs = agr[BND_ATM_IDXS_POS].tolist()
+    atm_ngbs = _ring_core_neighbors(natms, bnd_atm_idxs)
+    core_atm_idxs = [idx for idx in range(natms) if atm_ngbs[idx]]
+
+    rng_cands = set()
+    for root_idx in core_atm_idxs:
+        rng_cands.update(_horton_candidates(root_idx, atm_ngbs))
+
+    # the shortest candidates that are independent of the ones before them
+    rng_bnd_masks = []
+    pvt_dct = {}
+    for _, rng_bnd_mask in sorted(rng_cands):
+        vec = rng_bnd_mask
+        while vec:
+            pvt = vec.bit_length() - 1
+            if pvt not in pvt_dct:
+                pvt_dct[pvt] = vec
+                rng_bnd_masks.append(rng_bnd_mask)
+                break
+            vec ^= pvt_dct[pvt]
+
+        if len(rng_bnd_masks) == nrngs:
+            break
+
+    return tuple(frozenset(_mask_positions(rng_bnd_mask))
+                 for rng_bnd_mask in rng_bnd_masks)
+
+
+def _ring_core_neighbors(natms, bnd_atm_idxs):
+    """ neighbors, with bond positions, by atom position, after repeatedly
+    removing atoms that have only one neighbor
+
+    (the atoms that are left are the only ones that can be in rings)
+    """
+    atm_ngbs = [{} for _ in range(natms)]
+    for bnd_idx, (idx1, idx2) in enumerate(bnd_atm_idxs):
+        atm_ngbs[idx1][idx2] = bnd_idx
+        atm_ngbs[idx2][idx1] = bnd_idx
+
+    stack = [idx for idx in range(natms) if len(atm_ngbs[idx]) == 1]
+    while stack:
+        idx = stack.pop()
+        for ngb_idx in list(atm_ngbs[idx]):
+            del atm_ngbs[ngb_idx][idx]
+            del atm_ngbs[idx][ngb_idx]
+            if len(atm_ngbs[ngb_idx]) == 1:
+                stack.append(ngb_idx)
+
+    return atm_ngbs
+
+
+def _horton_candidates(root_idx, atm_ngbs):
+    """ candidate rings through the root, as (size, bond bitset) pairs
+
+    each non-tree bond (x, y) of the root's shortest path tree closes the
+    ring root -> x -> y -> root, unless the paths to x and y overlap
+    """
+    dists = {root_idx: 0}
+    path_masks = {root_idx: 0}
+    brnchs = {root_idx: None}
+    tree_bnd_idxs = set()
+    queue = collections.deque([root_idx])
+    while queue:
+        idx = queue.popleft()
+        for ngb_idx, bnd_idx in sorted(atm_ngbs[idx].items()):
+            if ngb_idx not in dists:
+                dists[ngb_idx] = dists[idx] + 1
+                path_masks[ngb_idx] = path_masks[idx] | (1 << bnd_idx)
+                brnchs[ngb_idx] = ngb_idx if idx == root_idx else brnchs[idx]
+                tree_bnd_idxs.add(bnd_idx)
+                queue.append(ngb_idx)
+
+    cands = []
+    for idx, dist in dists.items():
+        for ngb_idx, bnd_idx in atm_ngbs[idx].items():
+            if (bnd_idx not in tree_bnd_idxs and idx < ngb_idx and
+                    brnchs[idx] != brnchs[ngb_idx]):
+                size = dist + dists[ngb_idx] + 1
+                mask = path_masks[idx] | path_masks[ngb_idx] | (1 << bnd_idx)
+                cands.append((size, mask))
+
+    return cands
+
+
+def _mask_positions(mask):
+    """ positions of the set bits in an integer bitset
+    """
+    poss = []
+    pos = 0
+    while mask:
+        if mask & 1:
+            poss.append(pos)
+        mask >>= 1
+        pos += 1
+    return poss
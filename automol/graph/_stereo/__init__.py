@@ -1,24 +1,33 @@
 """ specific stereo graph functions
 """
 
+from ._steset import StereomerSet
 # properties
 from ._inchi import stereo_inchi
+from ._inchi import stereo_inchis
 from ._stereo_ import is_chiral
 from ._stereo_ import atom_stereo_keys
 from ._stereo_ import bond_stereo_keys
 from ._stereo_ import stereogenic_atom_keys
 from ._stereo_ import stereogenic_bond_keys
+from ._stereo_ import stereomer_count
 # transformations
 from ._stereo_ import reflection
 from ._stereo_ import stereomers
+from ._stereo_ import iter_stereomers
 from ._stereo_ import substereomers
+from ._stereo_ import stereomer_set
+from ._stereo_ import substereomer_set
 # comparisons
 from ._stereo_ import enantiomerically_unique
 
 __all__ = [
+    'StereomerSet',
     # properties
-    'stereo_inchi', 'is_chiral', 'atom_stereo_keys', 'bond_stereo_keys',
-    'stereogenic_atom_keys', 'stereogenic_bond_keys',
+    'stereo_inchi', 'stereo_inchis', 'is_chiral', 'atom_stereo_keys',
+    'bond_stereo_keys', 'stereogenic_atom_keys', 'stereogenic_bond_keys',
+    'stereomer_count',
     # transformations
-    'reflection', 'stereomers', 'substereomers', 'enantiomerically_unique',
+    'reflection', 'stereomers', 'iter_stereomers', 'substereomers',
+    'stereomer_set', 'substereomer_set', 'enantiomerically_unique',
 ]
@@ -1,19 +1,197 @@
 """ stereo graph => InChI string conversion
+
+Stereo parities are defined relative to InChI numbers, so the stencil
+coordinates that a stereo InChI is generated from need a numbering first.
+This only depends on the connectivity, so once it is known, later stereomers
+of the same connectivity (or relabelings of it) go straight to their stereo
+InChI with a single call to the InChI library. The only thing the stencil
+depends on is the order of the neighbors around each stereo site, and since
+these neighbors are never symmetry-equivalent, their order is the same in the
+numbering that comes back with the stereo InChI. That is what gets stored for
+next time, and it is checked against the numbering used for the stencil on
+each call, generating the InChI again if they disagree.
 """
-from .._inchi import atom_inchi_numbers
-from .._inchi import stereo_inchi_from_coordinates
+import multiprocessing
+from collections import OrderedDict as _OrderedDict
+from .._inchi._inchi_ import with_atom_inchi_numbers as _with_atom_ich_nums
+from .._inchi._inchi_ import fill_atom_inchi_numbers as _fill_atom_ich_nums
+from .._inchi._inchi_ import backbone_canonical_numbering as _bbn_can_nums
+from .._core import frozen as _frozen
+from .._core import atom_stereo_parities as _atom_stereo_parities
+from .._core import bond_stereo_parities as _bond_stereo_parities
+from .._core import set_atom_stereo_parities as _set_atom_stereo_parities
+from .._core import set_bond_stereo_parities as _set_bond_stereo_parities
+from .._core import without_stereo_parities as _without_stereo_parities
+from .._graph import atom_neighbor_keys as _atom_neighbor_keys
+from ._stereo_ import atom_stereo_keys as _atom_stereo_keys
+from ._stereo_ import bond_stereo_keys as _bond_stereo_keys
 from ._stereo_ import _explicit_stereo
 from ._stereo_ import _is_incomplete_or_higher_order
 from ._intco import atom_stereo_coordinates as _atom_stereo_coordinates
+from .._inchi._cache import is_enabled as _inchi_cache_is_enabled
+from .._inchi._cache import lookup as _inchi_cache_lookup
+from .._inchi._cache import store as _inchi_cache_store
+from .._expl import implicit as _implicit
+from .._canon import canonical_hash as _canonical_hash
+from .._memo import memoized as _memoized
+from .._memo import register_cache as _register_cache
+from .._memo import CacheInfo as _CacheInfo
+
+STENCIL_NUMBERING_CACHE_SIZE = 1024
+
+# InChI numbers by canonical number, keyed by canonical hash of the backbone
+_STENCIL_NUMBERING_CACHE = _OrderedDict()
+_STENCIL_NUMBERING_STATE = {'hits': 0, 'misses': 0}
 
 
+@_memoized
 def stereo_inchi(sgr):
     """ InChI string of this stereo graph
     """
     assert not _is_incomplete_or_higher_order(sgr)
 
-    sgr = _explicit_stereo(sgr)
-    atm_ich_num_dct = atom_inchi_numbers(sgr)
-    atm_xyz_dct = _atom_stereo_coordinates(sgr, atm_ich_num_dct)
-    ich = stereo_inchi_from_coordinates(sgr, atm_xyz_dct)
+    if not _inchi_cache_is_enabled():
+        return _stereo_inchi(sgr)
+
+    can_hash = _canonical_hash(_implicit(sgr))
+    ich = _inchi_cache_lookup('stereo_inchi', can_hash)
+    if ich is None:
+        ich = _stereo_inchi(sgr)
+        _inchi_cache_store('stereo_inchi', can_hash, ich)
     return ich
+
+
+def stereo_inchis(sgrs, nprocs=1):
+    """ InChI strings of these stereo graphs
+
+    Stereo graphs with the same connectivity (such as the stereomers of one
+    graph) only differ in the stencil coordinates, so everything else is done
+    once for all of them. With `nprocs` > 1, the work is split over a pool of
+    processes.
+    """
+    sgrs = tuple(sgrs)
+    assert not any(map(_is_incomplete_or_higher_order, sgrs))
+
+    ichs = [None] * len(sgrs)
+    can_hashes = [None] * len(sgrs)
+    if _inchi_cache_is_enabled():
+        for idx, sgr in enumerate(sgrs):
+            can_hashes[idx] = _canonical_hash(_implicit(sgr))
+            ichs[idx] = _inchi_cache_lookup('stereo_inchi', can_hashes[idx])
+
+    # group the rest by connectivity, and split the groups over the processes
+    idxs_dct = {}
+    for idx, sgr in enumerate(sgrs):
+        if ichs[idx] is None:
+            key = _frozen(_without_stereo_parities(sgr))
+            idxs_dct.setdefault(key, []).append(idx)
+    idxs_lst = [idxs[start::nprocs] for idxs in idxs_dct.values()
+                for start in range(min(nprocs, len(idxs)))]
+    sgrs_lst = [tuple(map(sgrs.__getitem__, idxs)) for idxs in idxs_lst]
+
+    if nprocs > 1 and len(sgrs_lst) > 1:
+        with multiprocessing.Pool(min(nprocs, len(sgrs_lst))) as pool:
+            ichs_lst = pool.map(_shared_connectivity_stereo_inchis, sgrs_lst)
+    else:
+        ichs_lst = list(map(_shared_connectivity_stereo_inchis, sgrs_lst))
+
+    for idxs, ichs_ in zip(idxs_lst, ichs_lst):
+        for idx, ich in zip(idxs, ichs_):
+            ichs[idx] = ich
+            if can_hashes[idx] is not None:
+                _inchi_cache_store('stereo_inchi', can_hashes[idx], ich)
+
+    return tuple(ichs)
+
+
+def _stereo_inchi(sgr):
+    """ InChI string of this stereo graph, without looking it up
+    """
+    return _shared_connectivity_stereo_inchis((sgr,))[0]
+
+
+def _shared_connectivity_stereo_inchis(sgrs):
+    """ InChI strings of stereo graphs that share a connectivity, without
+    looking them up
+    """
+    assert sgrs
+
+    # the hydrogens made explicit depend on the stereo sites, which are the
+    # same for complete stereo graphs with the same connectivity
+    xgr = _without_stereo_parities(_explicit_stereo(sgrs[0]))
+    can_hash, can_num_dct = _bbn_can_nums(xgr)
+
+    ich_nums = _STENCIL_NUMBERING_CACHE.get(can_hash)
+    _STENCIL_NUMBERING_STATE['hits' if ich_nums is not None else 'misses'] += 1
+    if ich_nums is None:
+        _, atm_num_dct = _with_atom_ich_nums(xgr)
+    else:
+        atm_num_dct = _fill_atom_ich_nums(
+            xgr, {bbn_key: ich_nums[can_num]
+                  for bbn_key, can_num in can_num_dct.items()})
+
+    ichs = []
+    for sgr in sgrs:
+        atm_par_dct = _atom_stereo_parities(sgr)
+        bnd_par_dct = _bond_stereo_parities(sgr)
+        sgr = _set_atom_stereo_parities(xgr, atm_par_dct)
+        sgr = _set_bond_stereo_parities(sgr, bnd_par_dct)
+        atm_xyz_dct = _atom_stereo_coordinates(sgr, atm_num_dct)
+        ich, atm_ich_num_dct = _with_atom_ich_nums(xgr, atm_xyz_dct)
+
+        # a stored numbering is checked against the one the InChI comes with
+        if ich_nums is not None and (
+                _stereo_neighbor_orders(sgr, atm_num_dct) !=
+                _stereo_neighbor_orders(sgr, atm_ich_num_dct)):
+            atm_num_dct = atm_ich_num_dct
+            atm_xyz_dct = _atom_stereo_coordinates(sgr, atm_num_dct)
+            ich, _ = _with_atom_ich_nums(xgr, atm_xyz_dct)
+
+        ichs.append(ich)
+
+    _store_stencil_numbering(can_hash, can_num_dct, atm_ich_num_dct)
+    return tuple(ichs)
+
+
+def _store_stencil_numbering(can_hash, can_num_dct, atm_ich_num_dct):
+    """ keep the InChI numbers by canonical number, for the next stereomer of
+    this connectivity
+    """
+    ich_nums = [None] * len(can_num_dct)
+    for bbn_key, can_num in can_num_dct.items():
+        ich_nums[can_num] = atm_ich_num_dct[bbn_key]
+    _STENCIL_NUMBERING_CACHE[can_hash] = tuple(ich_nums)
+    _STENCIL_NUMBERING_CACHE.move_to_end(can_hash)
+    while len(_STENCIL_NUMBERING_CACHE) > STENCIL_NUMBERING_CACHE_SIZE:
+        _STENCIL_NUMBERING_CACHE.popitem(last=False)
+
+
+def _stencil_numbering_cache_info():
+    return _CacheInfo(_STENCIL_NUMBERING_STATE['hits'],
+                      _STENCIL_NUMBERING_STATE['misses'],
+                      STENCIL_NUMBERING_CACHE_SIZE,
+                      len(_STENCIL_NUMBERING_CACHE))
+
+
+def _clear_stencil_numbering_cache():
+    _STENCIL_NUMBERING_CACHE.clear()
+    _STENCIL_NUMBERING_STATE.update({'hits': 0, 'misses': 0})
+
+
+_register_cache('stencil_numbering', _stencil_numbering_cache_info,
+                _clear_stencil_numbering_cache)
+
+
+def _stereo_neighbor_orders(sgr, atm_num_dct):
+    """ the neighbors of each stereo site, in order of these numbers
+
+    (for bonds, the neighbors on either end)
+    """
+    atm_ngb_keys_dct = _atom_neighbor_keys(sgr)
+    ngb_keys_lst = [atm_ngb_keys_dct[atm_key]
+                    for atm_key in sorted(_atom_stereo_keys(sgr))]
+    for bnd_key in sorted(_bond_stereo_keys(sgr), key=sorted):
+        ngb_keys_lst.extend(atm_ngb_keys_dct[atm_key] - bnd_key
+                            for atm_key in sorted(bnd_key))
+    return [sorted(ngb_keys, key=atm_num_dct.__getitem__)
+            for ngb_keys in ngb_keys_lst]
@@ -1,11 +1,11 @@
 """ stereomer expansions
 """
+import time as _time
 from functools import partial as _partial
 from itertools import chain as _chain
+from itertools import islice as _islice
 from itertools import product as _product
-from itertools import starmap as _starmap
-from itertools import combinations as _combinations
-from .._math import unique as _unique
+from .._math import unique_by_value as _unique_by_value
 from .._dict import filter_by_value as _filter_by_value
 from .._dict import keys_by_value as _keys_by_value
 from .._dict import transform_values as _transform_values
@@ -18,17 +18,28 @@ from .._core import set_atom_stereo_parities as _set_atom_stereo_parities
 from .._core import set_bond_stereo_parities as _set_bond_stereo_parities
 from .._core import without_bond_orders as _without_bond_orders
 from .._core import without_stereo_parities as _without_stereo_parities
+from .._graph import atom_neighbor_keys as _atom_neighbor_keys
 from .._graph import atom_bond_keys as _atom_bond_keys
-from .._graph import rings_bond_keys as _rings_bond_keys
-from .._graph import branch as _branch
-from .._expl import backbone_isomorphic as _backbone_isomorphic
+from .._graph import atom_rings_bond_keys as _atom_rings_bond_keys
+from .._graph import bond_rings_bond_keys as _bond_rings_bond_keys
+from .._graph import branches_atom_keys as _branches_atom_keys
 from .._expl import explicit as _explicit
+from .._expl import implicit as _implicit
+from .._canon import canonical_certificate as _canonical_certificate
+from .._canon import neighbor_symmetry_ranks as _neighbor_symmetry_ranks
+from .._canon import automorphism_generators as _automorphism_generators
 from .._res import atom_bond_valences as _atom_bond_valences
+from .._res import atom_radical_valences as _atom_radical_valences
+from .._res import dominant_resonances as _dominant_resonances
 from .._res import (resonance_dominant_bond_orders as
                     _resonance_dominant_bond_orders)
+from .._memo import index_cached as _index_cached
+from .._memo import memoized as _memoized
+from ._steset import StereomerSet as _StereomerSet
 
 
 # properties
+@_memoized
 def is_chiral(sgr):
     """ is this stereo graph chiral?
 
@@ -40,11 +51,24 @@ def is_chiral(sgr):
     # ignore incomplete and higher-order stereo -- the first is undefined, the
     # second is hard
     if not _is_incomplete_or_higher_order(sgr):
-        _ans = not _backbone_isomorphic(sgr, reflection(sgr))
+        cert, refl_cert = _enantiomer_certificates(sgr)
+        _ans = cert != refl_cert
 
     return _ans
 
 
+@_index_cached
+def _enantiomer_certificates(sgr):
+    """ canonical certificates of the implicit graph and of its reflection
+
+    (cached on the graph, so that chirality checks and enantiomer comparisons
+    only label each graph once)
+    """
+    ixgr = _implicit(sgr)
+    return (_canonical_certificate(ixgr),
+            _canonical_certificate(reflection(ixgr)))
+
+
 def _is_incomplete_or_higher_order(sgr):
     return (atom_stereo_keys(sgr) !=
             stereogenic_atom_keys(_without_stereo_parities(sgr)))
@@ -66,48 +90,34 @@ def bond_stereo_keys(sgr):
     return bnd_ste_keys
 
 
+@_memoized
 def stereogenic_atom_keys(xgr):
     """ (unassigned) stereogenic atoms in this graph
     """
     xgr = _without_bond_orders(xgr)
-    tet_atm_keys = (
-        _keys_by_value(_atom_bond_valences(xgr), lambda x: x == 4) &
-        _keys_by_value(_atom_implicit_hydrogen_valences(xgr), lambda x: x < 2)
-    )
-    atm_keys = tet_atm_keys - atom_stereo_keys(xgr)
+    atm_keys = _candidate_atom_keys(xgr)
 
-    atm_bnd_keys_dct = _atom_bond_keys(xgr)
+    ixgr = _implicit(xgr)
 
     def _is_stereogenic(atm_key):
-        atm_bnd_keys = atm_bnd_keys_dct[atm_key]
-        bnchs = [_branch(xgr, atm_key, bnd_key) for bnd_key in atm_bnd_keys]
-        assert len(atm_bnd_keys) in (3, 4)
-        _ans = not any(
-            _starmap(_backbone_isomorphic, _combinations(bnchs, r=2)))
-        return _ans
+        ngb_rnks = list(_neighbor_ranks(ixgr, atm_key).values())
+        assert len(ngb_rnks) in (3, 4)
+        return len(set(ngb_rnks)) == len(ngb_rnks)
 
     ste_gen_atm_keys = frozenset(filter(_is_stereogenic, atm_keys))
     return ste_gen_atm_keys
 
 
+@_memoized
 def stereogenic_bond_keys(xgr):
     """ (unassigned) stereogenic bonds in this graph
     """
-    rng_bnd_keys_lst = _rings_bond_keys(xgr)
-    sm_rng_bnd_keys_lst = tuple(filter(lambda x: len(x) < 8, rng_bnd_keys_lst))
-
-    def _is_candidate(bnd_key):
-        return not any(bnd_key in rng_bnd_keys
-                       for rng_bnd_keys in sm_rng_bnd_keys_lst)
-
     xgr = _without_bond_orders(xgr)
-    dbl_bnd_keys = _keys_by_value(_resonance_dominant_bond_orders(xgr),
-                                  lambda x: 2 in x)
-    bnd_keys = dbl_bnd_keys - bond_stereo_keys(xgr)
-    bnd_keys = set(filter(_is_candidate, bnd_keys))
+    bnd_keys = _candidate_bond_keys(xgr)
     xgr = _explicit(xgr, set(_chain(*bnd_keys)))
 
     atm_bnd_keys_dct = _atom_bond_keys(xgr)
+    ixgr = _implicit(xgr)
 
     def _is_symmetric_on_bond(atm_key, bnd_key):
         atm_bnd_keys = atm_bnd_keys_dct[atm_key]
@@ -120,10 +130,11 @@ def stereogenic_bond_keys(xgr):
             _ans = False
         else:
             assert len(atm_bnd_keys) == 2
-            bnch1, bnch2 = (
-                _branch(xgr, atm_key, atm_bnd_key)
-                for atm_bnd_key in atm_bnd_keys)
-            _ans = _backbone_isomorphic(bnch1, bnch2)
+            ngb_rnk_dct = _neighbor_ranks(ixgr, atm_key)
+            ngb_rnk1, ngb_rnk2 = (
+                rnk for key, rnk in ngb_rnk_dct.items()
+                if key not in bnd_key)
+            _ans = ngb_rnk1 == ngb_rnk2
         return _ans
 
     def _is_stereogenic(bnd_key):
@@ -134,6 +145,152 @@ def stereogenic_bond_keys(xgr):
     return ste_gen_bnd_keys
 
 
+def _neighbor_ranks(ixgr, atm_key):
+    """ symmetry ranks of the neighbors of `atm_key` in an implicit graph,
+    with None for each hydrogen
+
+    (ranking the implicit graph means explicit and implicit hydrogens don't
+    tell branches apart, the same as comparing them by backbone isomorphism;
+    the hydrogens are keyed by position, as `(atm_key, idx)`)
+    """
+    ngb_rnk_dct = _neighbor_symmetry_ranks(ixgr, atm_key)
+    nhyd = _atom_implicit_hydrogen_valences(ixgr)[atm_key]
+    ngb_rnk_dct.update({(atm_key, idx): None for idx in range(nhyd)})
+    return ngb_rnk_dct
+
+
+def _candidate_atom_keys(xgr):
+    """ unassigned tetrahedral atoms, which could be stereogenic
+    """
+    xgr = _without_bond_orders(xgr)
+    tet_atm_keys = (
+        _keys_by_value(_atom_bond_valences(xgr), lambda x: x == 4) &
+        _keys_by_value(_atom_implicit_hydrogen_valences(xgr), lambda x: x < 2)
+    )
+    return tet_atm_keys - atom_stereo_keys(xgr)
+
+
+def _candidate_bond_keys(xgr):
+    """ unassigned double bonds outside of small rings, which could be
+    stereogenic
+    """
+    bnd_rng_bnd_keys_dct = _bond_rings_bond_keys(xgr)
+
+    def _is_candidate(bnd_key):
+        return not any(len(rng_bnd_keys) < 8
+                       for rng_bnd_keys in bnd_rng_bnd_keys_dct[bnd_key])
+
+    xgr = _without_bond_orders(xgr)
+    dbl_bnd_keys = _keys_by_value(_resonance_dominant_bond_orders(xgr),
+                                  lambda x: 2 in x)
+    bnd_keys = dbl_bnd_keys - bond_stereo_keys(xgr)
+    return set(filter(_is_candidate, bnd_keys))
+
+
+@_memoized
+def stereomer_count(xgr):
+    """ the number of stereomers that are unique by symmetry, ignoring this
+    graph's assignments, and whether that number is exact
+
+    (no stereomers are built -- the number is an upper bound if assigning
+    parities could make more sites stereogenic; it also counts each stereo
+    bond of the dominant resonances, so that it is only an upper bound on the
+    distinct stereo InChIs if a stereo bond is not double in all of them, or
+    ends on a radical site)
+    """
+    sgr = _without_stereo_parities(xgr)
+    ste_keys = (sorted(stereogenic_atom_keys(sgr)) +
+                sorted(stereogenic_bond_keys(sgr), key=sorted))
+
+    # Burnside's lemma: average the number of assignments left unchanged by
+    # each symmetry, which is two to the number of cycles it has on the sites
+    perms = (tuple(range(len(ste_keys))),) + _site_permutations(sgr, ste_keys)
+    count = sum(2 ** _cycle_count(perm) for perm in perms) // len(perms)
+
+    # each site that could become stereogenic at most doubles the number
+    nhigh = len(_higher_order_candidate_keys(sgr, ste_keys))
+    is_exact = not nhigh and not _resonance_dependent_bond_keys(sgr, ste_keys)
+    return count * 2 ** nhigh, is_exact
+
+
+def _resonance_dependent_bond_keys(sgr, ste_keys):
+    """ stereo bonds that depend on the resonance: ones that are only double
+    in some of the dominant resonances, or that end on a radical site in one
+    of them
+    """
+    bnd_keys = [key for key in ste_keys if isinstance(key, frozenset)]
+    if not bnd_keys:
+        return []
+
+    bnd_ords_dct = _resonance_dominant_bond_orders(sgr)
+    rad_atm_keys = set()
+    for rgr in _dominant_resonances(sgr):
+        rad_atm_keys |= _keys_by_value(_atom_radical_valences(rgr), bool)
+    return [bnd_key for bnd_key in bnd_keys
+            if bnd_ords_dct[bnd_key] != {2} or bnd_key & rad_atm_keys]
+
+
+def _higher_order_candidate_keys(sgr, ste_keys):
+    """ unassigned sites that could become stereogenic once other sites are
+    assigned
+
+    a site can only become stereogenic if it has symmetric neighbors with
+    stereo sites in their branches, since that is the only kind of tie that
+    assigning parities can break
+    """
+    atm_keys = _candidate_atom_keys(sgr) - set(ste_keys)
+    bnd_keys = _candidate_bond_keys(sgr) - set(ste_keys)
+    exp_sgr = _explicit(sgr, set(_chain(*bnd_keys)))
+    atm_ngb_keys_dct = _atom_neighbor_keys(sgr)
+    exp_atm_ngb_keys_dct = _atom_neighbor_keys(exp_sgr)
+
+    def _has_tied_stereo_branches(xgr, atm_key, ngb_keys, ste_atm_keys):
+        bnch_atm_keys_dct = _branches_atom_keys(xgr, atm_key)
+        if _atom_rings_bond_keys(xgr)[atm_key]:
+            # branches through a ring overlap, so assume they can be tied
+            tie_ngb_keys = ngb_keys if len(ngb_keys) > 1 else ()
+        else:
+            ngb_rnk_dct = _neighbor_symmetry_ranks(xgr, atm_key)
+            ngb_rnks = [ngb_rnk_dct[ngb_key] for ngb_key in ngb_keys]
+            tie_ngb_keys = [ngb_key for ngb_key in ngb_keys
+                            if ngb_rnks.count(ngb_rnk_dct[ngb_key]) > 1]
+        return any(bnch_atm_keys_dct[frozenset({atm_key, ngb_key})] - {atm_key}
+                   & ste_atm_keys for ngb_key in tie_ngb_keys)
+
+    def _atom_is_candidate(atm_key, ste_atm_keys):
+        ngb_keys = atm_ngb_keys_dct[atm_key]
+        return _has_tied_stereo_branches(sgr, atm_key, ngb_keys, ste_atm_keys)
+
+    def _bond_is_candidate(bnd_key, ste_atm_keys):
+        return any(_has_tied_stereo_branches(
+            exp_sgr, atm_key, exp_atm_ngb_keys_dct[atm_key] - bnd_key,
+            ste_atm_keys) for atm_key in bnd_key)
+
+    # sites that become stereogenic can make still more sites stereogenic
+    ste_atm_keys = _site_atom_keys(ste_keys)
+    high_keys = set()
+    while True:
+        new_keys = (
+            {key for key in atm_keys
+             if _atom_is_candidate(key, ste_atm_keys)} |
+            {key for key in bnd_keys
+             if _bond_is_candidate(key, ste_atm_keys)})
+        if new_keys <= high_keys:
+            break
+
+        high_keys |= new_keys
+        ste_atm_keys |= _site_atom_keys(new_keys)
+
+    return high_keys
+
+
+def _site_atom_keys(ste_keys):
+    """ the atoms making up a collection of atom and bond stereo sites
+    """
+    return set(_chain(*(key if isinstance(key, frozenset) else [key]
+                        for key in ste_keys)))
+
+
 # transformations
 def reflection(sgr):
     """ stereo graph reflection (inverts atom parities)
@@ -154,46 +311,159 @@ def _explicit_stereo(sgr):
     return _explicit(sgr, atm_keys=ste_atm_keys)
 
 
+@_memoized
 def stereomers(xgr):
     """ all stereomers, ignoring this graph's assignments
     """
-    bool_vals = (False, True)
+    return stereomer_set(xgr).graphs()
+
+
+@_memoized
+def stereomer_set(xgr):
+    """ all stereomers, ignoring this graph's assignments, as a `StereomerSet`
+
+    (the stereomers are expanded one at a time and only their parities are
+    kept)
+    """
+    sgr = _without_stereo_parities(xgr)
+    sgrs = _iter_stereomers(sgr, symmetric=False)
+    return _StereomerSet.from_graphs(sgr, sgrs)
+
+
+def iter_stereomers(xgr, max_count=None, time_budget=None):
+    """ iterate over the stereomers that are unique by symmetry, ignoring this
+    graph's assignments
+
+    (stops after `max_count` stereomers or `time_budget` seconds, if given)
+    """
+    deadline = None if time_budget is None else _time.time() + time_budget
+    sgr_itr = _iter_stereomers(_without_stereo_parities(xgr), symmetric=True,
+                               deadline=deadline)
+    return _islice(sgr_itr, max_count)
 
-    def _expand_atom_stereo(sgr):
-        atm_ste_keys = stereogenic_atom_keys(sgr)
-        nste_atms = len(atm_ste_keys)
-        sgrs = [_set_atom_stereo_parities(sgr, dict(zip(atm_ste_keys,
-                                                        atm_ste_par_vals)))
-                for atm_ste_par_vals in _product(bool_vals, repeat=nste_atms)]
-        return sgrs
 
-    def _expand_bond_stereo(sgr):
-        bnd_ste_keys = stereogenic_bond_keys(sgr)
-        nste_bnds = len(bnd_ste_keys)
-        sgrs = [_set_bond_stereo_parities(sgr, dict(zip(bnd_ste_keys,
-                                                        bnd_ste_par_vals)))
-                for bnd_ste_par_vals in _product(bool_vals, repeat=nste_bnds)]
-        return sgrs
+def _iter_stereomers(sgr, symmetric, deadline=None, fix_ste_par_dct=None):
+    """ expand the stereo sites of this graph, one level at a time
 
-    last_sgrs = []
-    sgrs = [_without_stereo_parities(xgr)]
+    assigning parities can make more sites stereogenic, so each expanded
+    graph is expanded again until there are no sites left; sites in
+    `fix_ste_par_dct` (keyed by atom or bond) get their parity from there
+    """
+    fix_ste_par_dct = {} if fix_ste_par_dct is None else fix_ste_par_dct
+    srch = (symmetric, deadline, fix_ste_par_dct)
+
+    atm_ste_keys = sorted(stereogenic_atom_keys(sgr))
+    for sgr1 in _expand_stereo(sgr, atm_ste_keys, _set_atom_stereo_parities,
+                               srch):
+        bnd_ste_keys = sorted(stereogenic_bond_keys(sgr1), key=sorted)
+        for sgr2 in _expand_stereo(sgr1, bnd_ste_keys,
+                                   _set_bond_stereo_parities, srch):
+            if atm_ste_keys or bnd_ste_keys:
+                yield from _iter_stereomers(sgr2, *srch)
+            else:
+                yield sgr2
+
+
+def _expand_stereo(sgr, ste_keys, set_ste_pars_, srch):
+    """ assign parities to a (sorted) list of stereo sites, in every possible
+    way
+
+    `srch` holds the settings of the whole search, as `symmetric`,
+    `deadline` and `fix_ste_par_dct` (see `_iter_stereomers`); if
+    `symmetric` is set, assignments that an automorphism of the graph takes
+    to an earlier one are skipped (this assumes no sites are fixed)
+    """
+    symmetric, deadline, fix_ste_par_dct = srch
+    fix_ste_keys = [key for key in ste_keys if key in fix_ste_par_dct]
+    fix_ste_pars = [fix_ste_par_dct[key] for key in fix_ste_keys]
+    ste_keys = [key for key in ste_keys if key not in fix_ste_par_dct]
+    perms = _site_permutations(sgr, ste_keys) if symmetric else ()
 
-    while sgrs != last_sgrs:
-        last_sgrs = sgrs
-        sgrs = list(_chain(*map(_expand_atom_stereo, sgrs)))
-        sgrs = list(_chain(*map(_expand_bond_stereo, sgrs)))
+    for ste_pars in _product((False, True), repeat=len(ste_keys)):
+        if deadline is not None and _time.time() >= deadline:
+            return
 
-    return tuple(sorted(sgrs, key=_frozen))
+        if not any(_permuted(ste_pars, perm) < ste_pars for perm in perms):
+            yield set_ste_pars_(
+                sgr, dict(zip(fix_ste_keys + ste_keys,
+                              fix_ste_pars + list(ste_pars))))
 
 
+def _site_permutations(sgr, ste_keys):
+    """ the permutations of a set of stereo sites by automorphisms of the
+    graph, as tuples of positions
+    """
+    ste_idx_dct = dict(map(reversed, enumerate(ste_keys)))
+
+    def _site_permutation(aut_dct):
+        def _image(key):
+            if isinstance(key, frozenset):
+                return frozenset(map(aut_dct.__getitem__, key))
+            return aut_dct[key]
+        return tuple(ste_idx_dct[_image(key)] for key in ste_keys)
+
+    gens = set(map(_site_permutation, _automorphism_generators(sgr)))
+
+    idt = tuple(range(len(ste_keys)))
+    perms = {idt}
+    stack = [idt]
+    while stack:
+        perm = stack.pop()
+        for gen in gens:
+            new_perm = tuple(gen[idx] for idx in perm)
+            if new_perm not in perms:
+                perms.add(new_perm)
+                stack.append(new_perm)
+
+    perms.discard(idt)
+    return tuple(perms)
+
+
+def _cycle_count(perm):
+    """ the number of cycles in a permutation of positions
+    """
+    seen_idxs = set()
+    ncycs = 0
+    for start_idx, idx in enumerate(perm):
+        if start_idx not in seen_idxs:
+            ncycs += 1
+            seen_idxs.add(start_idx)
+            while idx not in seen_idxs:
+                seen_idxs.add(idx)
+                idx = perm[idx]
+    return ncycs
+
+
+def _permuted(vals, perm):
+    """ move the value at each position `i` to position `perm[i]`
+    """
+    new_vals = [None] * len(vals)
+    for idx, val in zip(perm, vals):
+        new_vals[idx] = val
+    return tuple(new_vals)
+
+
+@_memoized
 def substereomers(xgr):
     """ all stereomers compatible with this graph's assignments
     """
+    return substereomer_set(xgr).graphs()
+
+
+@_memoized
+def substereomer_set(xgr):
+    """ all stereomers compatible with this graph's assignments, as a
+    `StereomerSet`
+
+    (the assigned sites are held fixed, so only the free ones are expanded)
+    """
     _assigned = _partial(_filter_by_value, func=lambda x: x is not None)
 
     known_atm_ste_par_dct = _assigned(_atom_stereo_parities(xgr))
     known_bnd_ste_par_dct = _assigned(_bond_stereo_parities(xgr))
 
+    # sites are fixed as they come up, but a known site might never become
+    # stereogenic, in which case the stereomer is not compatible after all
     def _is_compatible(sgr):
         atm_ste_par_dct = _assigned(_atom_stereo_parities(sgr))
         bnd_ste_par_dct = _assigned(_bond_stereo_parities(sgr))
@@ -203,20 +473,37 @@ def substereomers(xgr):
                               set(bnd_ste_par_dct.items()))
         return _compat_atm_assgns and _compat_bnd_assgns
 
-    sgrs = tuple(filter(_is_compatible, stereomers(xgr)))
-    return sgrs
+    fix_ste_par_dct = dict(known_atm_ste_par_dct)
+    fix_ste_par_dct.update(known_bnd_ste_par_dct)
+    sgr = _without_stereo_parities(xgr)
+    sgrs = _iter_stereomers(sgr, symmetric=False,
+                            fix_ste_par_dct=fix_ste_par_dct)
+    return _StereomerSet.from_graphs(sgr, filter(_is_compatible, sgrs))
 
 
 # comparisons
 def enantiomerically_unique(xgrs):
     """ unique non-isomorphic non-enantiomeric graphs from a series
     """
+    # the graphs are usually stereomers of a few backbones, so look up the
+    # stereogenic atoms once per backbone
+    ste_atm_keys_dct = {}
+
+    def _is_incomplete_or_higher_order_(sgr):
+        cgr = _without_stereo_parities(sgr)
+        frz_cgr = _frozen(cgr)
+        if frz_cgr not in ste_atm_keys_dct:
+            ste_atm_keys_dct[frz_cgr] = stereogenic_atom_keys(cgr)
+        return atom_stereo_keys(sgr) != ste_atm_keys_dct[frz_cgr]
+
+    # graphs and their mirror images share the smaller of their certificates
+    # (like `is_chiral`, this ignores partial and higher-order stereo)
+    def _enantiomeric_certificate(xgr):
+        if _is_incomplete_or_higher_order_(xgr):
+            cert = _canonical_certificate(_implicit(xgr))
+        else:
+            cert = min(_enantiomer_certificates(xgr))
+        return cert
 
-    def _isomorphic_or_enantiomeric(xgr1, xgr2):
-        _ans = _backbone_isomorphic(xgr1, xgr2)
-        if not _ans and is_chiral(xgr1):
-            _ans = _backbone_isomorphic(xgr1, reflection(xgr2))
-        return _ans
-
-    xgrs = _unique(xgrs, equiv=_isomorphic_or_enantiomeric)
+    xgrs = _unique_by_value(xgrs, _enantiomeric_certificate)
     return xgrs
@@ -0,0 +1,173 @@
+""" compact set of stereo graphs
+
+Stereomers of one molecule differ only in their stereo parities, so the set
+stores a single parity-free base graph along with two packed boolean matrices,
+with one row per stereomer and one column per stereo site: one says whether
+the site is assigned, the other gives its parity. Atom sites come first, in
+key order, followed by bond sites, so sorting the rows lexicographically (with
+unassigned < False < True) sorts the stereomers the same way `frozen` does.
+Full graphs are only built on demand.
+"""
+from functools import partial as _partial
+import numpy
+from .._dict import filter_by_value as _filter_by_value
+from .._core import atom_stereo_parities as _atom_stereo_parities
+from .._core import bond_stereo_parities as _bond_stereo_parities
+from .._core import without_stereo_parities as _without_stereo_parities
+from .._core import set_atom_stereo_parities as _set_atom_stereo_parities
+from .._core import set_bond_stereo_parities as _set_bond_stereo_parities
+
+
+class StereomerSet():
+    """ stereo graphs, as parity rows over a shared base graph
+    """
+
+    def __init__(self, sgr, atm_keys, bnd_keys, ste_pars):
+        """ `ste_pars` is a (stereomers x sites) array of parities, with sites
+        given by `atm_keys` followed by `bnd_keys` and None for sites that
+        are not assigned; the rows are sorted on construction
+        """
+        atm_keys = tuple(sorted(atm_keys))
+        bnd_keys = tuple(sorted(map(frozenset, bnd_keys), key=sorted))
+        nkeys = len(atm_keys) + len(bnd_keys)
+        ste_pars_ = numpy.empty((len(ste_pars), nkeys), dtype=object)
+        ste_pars_[...] = ste_pars
+        ste_pars = ste_pars_
+
+        # unassigned < False < True, as codes 0, 1, 2
+        ste_codes = numpy.zeros(ste_pars.shape, dtype=numpy.int8)
+        ste_codes[numpy.equal(ste_pars, False)] = 1
+        ste_codes[numpy.equal(ste_pars, True)] = 2
+
+        # lexsort takes the primary key last
+        srt_idxs = numpy.lexsort(ste_codes.T[::-1]) if nkeys else slice(None)
+        ste_codes = ste_codes[srt_idxs]
+
+        self._sgr = _without_stereo_parities(sgr)
+        self._atm_keys = atm_keys
+        self._bnd_keys = bnd_keys
+        self._asg_bits = numpy.packbits(ste_codes > 0, axis=1)
+        self._par_bits = numpy.packbits(ste_codes > 1, axis=1)
+
+    @classmethod
+    def from_graphs(cls, sgr, sgrs):
+        """ build the set from stereo graphs that share the base of `sgr`
+
+        (the graphs can come from an iterator, and are not kept)
+        """
+        _assigned = _partial(_filter_by_value, func=lambda x: x is not None)
+
+        atm_par_dcts = []
+        bnd_par_dcts = []
+        for sgr_ in sgrs:
+            atm_par_dcts.append(_assigned(_atom_stereo_parities(sgr_)))
+            bnd_par_dcts.append(_assigned(_bond_stereo_parities(sgr_)))
+
+        atm_keys = sorted(set().union(*atm_par_dcts))
+        bnd_keys = sorted(set().union(*bnd_par_dcts), key=sorted)
+        ste_pars = [[atm_par_dct.get(key) for key in atm_keys] +
+                    [bnd_par_dct.get(key) for key in bnd_keys]
+                    for atm_par_dct, bnd_par_dct
+                    in zip(atm_par_dcts, bnd_par_dcts)]
+        return cls(sgr, atm_keys, bnd_keys, ste_pars)
+
+    def __len__(self):
+        return len(self._asg_bits)
+
+    def __getitem__(self, idx):
+        """ the stereo graph at this position
+        """
+        asgs = self.assigned()[idx].tolist()
+        pars = self.parities()[idx].tolist()
+        natms = len(self._atm_keys)
+        atm_par_dct = {key: par for key, asg, par
+                       in zip(self._atm_keys, asgs[:natms], pars[:natms])
+                       if asg}
+        bnd_par_dct = {key: par for key, asg, par
+                       in zip(self._bnd_keys, asgs[natms:], pars[natms:])
+                       if asg}
+        sgr = _set_atom_stereo_parities(self._sgr, atm_par_dct)
+        sgr = _set_bond_stereo_parities(sgr, bnd_par_dct)
+        return sgr
+
+    def __iter__(self):
+        return (self[idx] for idx in range(len(self)))
+
+    def graphs(self):
+        """ all of the stereo graphs, in sorted order
+        """
+        return tuple(self)
+
+    def base_graph(self):
+        """ the parity-free graph the stereomers were built on
+        """
+        return self._sgr
+
+    def atom_keys(self):
+        """ atom stereo sites, in column order
+        """
+        return self._atm_keys
+
+    def bond_keys(self):
+        """ bond stereo sites, in column order (after the atom sites)
+        """
+        return self._bnd_keys
+
+    def keys(self):
+        """ all stereo sites, in column order
+        """
+        return self._atm_keys + self._bnd_keys
+
+    def assigned(self):
+        """ the (stereomers x sites) boolean matrix of assigned sites
+        """
+        return self._unpacked(self._asg_bits)
+
+    def parities(self):
+        """ the (stereomers x sites) boolean matrix of parities
+
+        (False where the site is not assigned)
+        """
+        return self._unpacked(self._par_bits)
+
+    def compatible(self, ste_par_dct):
+        """ the subset of stereomers with these parities, by atom or bond key
+        """
+        key_idx_dct = dict(map(reversed, enumerate(self.keys())))
+        asgs = self.assigned()
+        pars = self.parities()
+
+        keep = numpy.ones(len(self), dtype=bool)
+        for key, par in ste_par_dct.items():
+            if key not in key_idx_dct:
+                keep[:] = False
+            else:
+                idx = key_idx_dct[key]
+                keep &= asgs[:, idx] & (pars[:, idx] == par)
+        return self._subset(numpy.flatnonzero(keep))
+
+    def unique(self):
+        """ the set without duplicate stereomers
+        """
+        ste_codes = self._codes()
+        if len(self) > 1:
+            is_new = numpy.ones(len(self), dtype=bool)
+            is_new[1:] = numpy.any(ste_codes[1:] != ste_codes[:-1], axis=1)
+            idxs = numpy.flatnonzero(is_new)
+        else:
+            idxs = numpy.arange(len(self))
+        return self._subset(idxs)
+
+    def _unpacked(self, bits):
+        nkeys = len(self._atm_keys) + len(self._bnd_keys)
+        return numpy.unpackbits(bits, axis=1, count=nkeys).astype(bool)
+
+    def _codes(self):
+        return (self.assigned().astype(numpy.int8) +
+                self.parities().astype(numpy.int8))
+
+    def _subset(self, idxs):
+        ste_codes = self._codes()[idxs]
+        ste_pars = numpy.array([None, False, True], dtype=object)[ste_codes]
+        return StereomerSet(self._sgr, self._atm_keys, self._bnd_keys,
+                            ste_pars)
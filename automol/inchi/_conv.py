@@ -16,6 +16,7 @@ from ._rdkit import connectivity_graph as _rdm_to_connectivity_graph
 from ._pybel import from_inchi as _pbm_from_inchi
 from ._pybel import geometry as _pbm_to_geometry
 from ..geom import stereo_inchi as _stereo_inchi_from_geometry
+from ..graph import GraphBuilder as _GraphBuilder
 from ..graph import inchi as _inchi_from_graph
 from ..graph import stereo_inchi as _stereo_inchi_from_stereo_graph
 
@@ -65,20 +66,19 @@ def stereo_graph(ich):
         assert ich_ste_val in ('-', '+')
         return ich_ste_val == '+'
 
-    atms, cnns = connectivity_graph(ich)
+    cgr = connectivity_graph(ich)
     assert not _has_unknown_stereo_elements(ich)
     atm_ste_dct = {_atom_key(key): _value(val)
                    for key, val in _atom_stereo_elements(ich)}
-    bnd_ste_dct = {_bond_key(key): (1, _value(val))
+    bnd_ste_dct = {_bond_key(key): _value(val)
                    for key, val in _bond_stereo_elements(ich)}
-    assert set(atm_ste_dct.keys()) <= set(range(len(atms)))
-    assert set(bnd_ste_dct.keys()) <= set(cnns.keys())
-    atms = {atm_key: ((sym, hcnt, atm_ste_dct[atm_key])
-                      if atm_key in atm_ste_dct else (sym, hcnt, None))
-            for atm_key, (sym, hcnt, _) in atms.items()}
-    bnds = cnns.copy()
-    bnds.update(bnd_ste_dct)
-    sgr = (atms, bnds)
+    bld = _GraphBuilder(cgr)
+    assert set(atm_ste_dct.keys()) <= bld.atom_keys()
+    assert set(bnd_ste_dct.keys()) <= bld.bond_keys()
+    bld.set_atom_stereo_parities(atm_ste_dct)
+    bld.set_bond_orders(dict.fromkeys(bnd_ste_dct.keys(), 1))
+    bld.set_bond_stereo_parities(bnd_ste_dct)
+    sgr = bld.freeze()
     sgr_ich = _stereo_inchi_from_stereo_graph(sgr)
     assert _has_same_connectivity(ich, sgr_ich)
     assert _has_compatible_stereo(ich, sgr_ich)
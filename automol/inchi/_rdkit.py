@@ -3,7 +3,7 @@
 from rdkit import RDLogger
 import rdkit.Chem as _rd_chem
 import rdkit.Chem.AllChem as _rd_all_chem
-from .._cnst.graph import from_data as _graph_from_data
+from ..graph import GraphBuilder as _GraphBuilder
 from .._cnst.geom import from_data as _geom_from_data
 
 _LOGGER = RDLogger.logger()
@@ -74,8 +74,9 @@ def connectivity_graph(rdm):
     rdm = _rd_chem.AddHs(rdm)
     atms = rdm.GetAtoms()
     bnds = rdm.GetBonds()
-    syms = [rda.GetSymbol() for rda in atms]
     idx = {rda.GetIdx(): idx for idx, rda in enumerate(atms)}
-    bnds = [(idx[rdb.GetBeginAtomIdx()], idx[rdb.GetEndAtomIdx()])
-            for rdb in bnds]
-    return _graph_from_data(atom_symbols=syms, bond_keys=bnds)
+    bld = _GraphBuilder()
+    bld.add_atoms({idx[rda.GetIdx()]: rda.GetSymbol() for rda in atms})
+    bld.add_bonds([(idx[rdb.GetBeginAtomIdx()], idx[rdb.GetEndAtomIdx()])
+                   for rdb in bnds])
+    return bld.freeze()
@@ -73,12 +73,6 @@ C2H2CL2F2_CGR = (
     {frozenset({0, 1}): (1, None), frozenset({0, 2}): (1, None),
      frozenset({0, 3}): (1, None), frozenset({1, 4}): (1, None),
      frozenset({1, 5}): (1, None)})
-C2H2CL2F2_STE_ICHS = (
-    'InChI=1S/C2H2Cl2F2/c3-1(5)2(4)6/h1-2H/t1-,2-/m0/s1',
-    'InChI=1S/C2H2Cl2F2/c3-1(5)2(4)6/h1-2H/t1-,2+',
-    'InChI=1S/C2H2Cl2F2/c3-1(5)2(4)6/h1-2H/t1-,2+',
-    'InChI=1S/C2H2Cl2F2/c3-1(5)2(4)6/h1-2H/t1-,2-/m1/s1'
-)
 C2H2CL2F2_SGRS = (
     ({0: ('C', 1, False), 1: ('C', 1, False), 2: ('F', 0, None),
       3: ('Cl', 0, None), 4: ('F', 0, None), 5: ('Cl', 0, None)},
@@ -111,16 +105,6 @@ C3H3CL2F3_CGR = (
      frozenset({0, 5}): (1, None), frozenset({2, 4}): (1, None),
      frozenset({1, 3}): (1, None), frozenset({1, 6}): (1, None),
      frozenset({2, 7}): (1, None)})
-# these are incorrect -- currently we can't handle InChI generation for
-# higher-order stereo
-# C3H3CL2F3_STE_ICHS = (
-#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t2-,3-/m0/s1',
-#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t2-,3-/m1/s1',
-#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t1-,2-,3+',
-#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t1-,2+,3-',
-#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t1-,2-,3+',
-#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t1-,2+,3-',
-# )
 C3H3CL2F3_SGRS = (
     ({0: ('C', 1, None), 1: ('C', 1, False), 2: ('C', 1, False),
       3: ('Cl', 0, None), 4: ('Cl', 0, None), 5: ('F', 0, None),
@@ -173,16 +157,6 @@ C3H5N3_CGR = (
     {frozenset({1, 4}): (1, None), frozenset({1, 2}): (1, None),
      frozenset({0, 3}): (1, None), frozenset({0, 2}): (1, None),
      frozenset({2, 5}): (1, None)})
-# these are incorrect -- currently we can't handle InChI generation for
-# higher-order stereo
-# C3H5N3_STE_ICHS = (
-#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1+,5-2+',
-#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2+,6-3+',
-#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2+,6-3-',
-#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2+,6-3+',
-#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2+,6-3-',
-#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2-',
-# )
 C3H5N3_SGRS = (
     ({0: ('C', 1, None), 1: ('C', 1, None), 2: ('C', 0, None),
       3: ('N', 1, None), 4: ('N', 1, None), 5: ('N', 1, None)},
@@ -255,16 +229,6 @@ C8H13O_RGRS = (
       frozenset({6, 7}): (1, None), frozenset({8, 7}): (1, None),
       frozenset({3, 5}): (2, None), frozenset({5, 7}): (1, None)}),
 )
-C8H13O_STE_ICHS = (
-    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4-/t7-,8-/m0/s1',
-    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4+/t7-,8-/m0/s1',
-    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4-/t7-,8+/m0/s1',
-    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4+/t7-,8+/m0/s1',
-    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4-/t7-,8+/m1/s1',
-    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4+/t7-,8+/m1/s1',
-    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4-/t7-,8-/m1/s1',
-    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4+/t7-,8-/m1/s1'
-)
 C8H13O_SGRS = (
     ({0: ('C', 3, None), 1: ('C', 2, None), 2: ('C', 3, None),
       3: ('C', 1, None), 4: ('C', 1, None), 5: ('C', 1, None),
@@ -374,6 +338,46 @@ def test__from_dictionaries():
         ) == sgr
 
 
+def test__arrays():
+    """ test graph.arrays and graph.from_arrays
+    """
+    for xgr in (C_CGR, C2_RGRS[2], C3H3_RGRS[1], CH2FH2H_CGR_EXP,
+                C5H5N5O_CGR, C3H5N3_SGRS[1]) + C8H13O_SGRS:
+        assert graph.from_arrays(graph.arrays(xgr)) == xgr
+
+    agr = graph.arrays(C8H13O_CGR)
+    (atm_keys, _, _, _, bnd_atm_idxs, _, _,
+     adj_ptrs, adj_atm_idxs, _) = agr
+    assert len(adj_ptrs) == len(atm_keys) + 1
+    assert len(adj_atm_idxs) == 2 * len(bnd_atm_idxs)
+    atm_ngb_keys_dct = graph.atom_neighbor_keys(C8H13O_CGR)
+    for idx, atm_key in enumerate(atm_keys):
+        ngb_idxs = adj_atm_idxs[adj_ptrs[idx]:adj_ptrs[idx+1]]
+        assert set(atm_keys[ngb_idxs]) == atm_ngb_keys_dct[atm_key]
+
+
+def test__graph_builder():
+    """ test graph.GraphBuilder
+    """
+    bld = graph.GraphBuilder()
+    bld.add_atoms({0: 'F', 1: 'C', 2: 'H', 3: 'H'}, {1: 2, 2: 1})
+    bld.add_bonds([{0, 1}])
+    assert bld.freeze() == CH2FH2H_CGR
+
+    bld = graph.GraphBuilder(CH2FH2H_CGR)
+    bld.set_atom_implicit_hydrogen_valences({1: 0, 2: 0})
+    bld.add_explicit_hydrogens({1: 2, 2: 1})
+    assert bld.freeze() == CH2FH2H_CGR_EXP
+
+    bld = graph.GraphBuilder(C8H13O_CGR)
+    bld.set_atom_stereo_parities(graph.atom_stereo_parities(C8H13O_SGRS[0]))
+    bld.set_bond_stereo_parities(graph.bond_stereo_parities(C8H13O_SGRS[0]))
+    assert bld.freeze() == C8H13O_SGRS[0]
+
+    bld.delete_atoms({8})
+    assert bld.freeze() == graph.delete_atoms(C8H13O_SGRS[0], {8})
+
+
 # # transformations
 def test__graph__without_bond_orders():
     """ test graph.without_bond_orders
@@ -423,6 +427,55 @@ def test__atom_bond_keys():
     }
 
 
+def _n_alkane(ncarbs):
+    """ an n-alkane graph, with explicit hydrogens
+    """
+    return graph.explicit((
+        {key: ('C', 3 if key in (0, ncarbs - 1) else 2, None)
+         for key in range(ncarbs)},
+        {frozenset({key, key + 1}): (1, None) for key in range(ncarbs - 1)}))
+
+
+def test__atom_neighbor_keys__index():
+    """ test that a graph is indexed once, and again if it is changed in place
+    """
+    def _index_builds(xgr):
+        nmisses = graph.memo_info().caches['index'].misses
+        for _ in range(3):
+            graph.atom_neighbor_keys(xgr)
+            graph.atom_bond_keys(xgr)
+            graph.atom_bond_valences(xgr)
+            graph.atom_explicit_hydrogen_keys(xgr)
+        return graph.memo_info().caches['index'].misses - nmisses
+
+    # the number of indices built does not grow with the graph
+    nbuilds = _index_builds(_n_alkane(10))
+    assert 0 < nbuilds == _index_builds(_n_alkane(50))
+    assert not _index_builds(_n_alkane(50))
+
+    # a bond swapped in place
+    xgr = _n_alkane(4)
+    assert graph.atom_neighbor_keys(xgr)[0] == frozenset({1, 4, 5, 6})
+    xgr[1].pop(frozenset({0, 1}))
+    xgr[1][frozenset({0, 2})] = (1, None)
+    assert graph.atom_neighbor_keys(xgr)[0] == frozenset({2, 4, 5, 6})
+
+    # a bond order changed in place
+    assert graph.atom_bond_valences(xgr)[0] == 4
+    xgr[1][frozenset({0, 2})] = (2, None)
+    assert graph.atom_bond_valences(xgr)[0] == 5
+
+
+def test__atom_rings_bond_keys():
+    """ test graph.atom_rings_bond_keys
+    """
+    atm_rng_bnd_keys_dct = graph.atom_rings_bond_keys(C5H5N5O_CGR)
+    assert set(map(len, atm_rng_bnd_keys_dct.values())) == {0, 1, 2}
+    assert atm_rng_bnd_keys_dct[1] == graph.rings_bond_keys(C5H5N5O_CGR)
+    assert not atm_rng_bnd_keys_dct[5]
+    assert not any(graph.atom_rings_bond_keys(C8H13O_CGR).values())
+
+
 # # bond properties
 def test__bond_neighbor_keys():
     """ test graph.bond_neighbor_keys
@@ -442,6 +495,15 @@ def test__bond_neighbor_keys():
     }
 
 
+def test__bond_rings_bond_keys():
+    """ test graph.bond_rings_bond_keys
+    """
+    bnd_rng_bnd_keys_dct = graph.bond_rings_bond_keys(C5H5N5O_CGR)
+    assert (bnd_rng_bnd_keys_dct[frozenset({1, 3})] ==
+            graph.rings_bond_keys(C5H5N5O_CGR))
+    assert not bnd_rng_bnd_keys_dct[frozenset({2, 5})]
+
+
 # # other properties
 def test__branch():
     """ test graph.branch
@@ -452,6 +514,26 @@ def test__branch():
     )
 
 
+def test__branches_bond_keys():
+    """ test graph.branches_bond_keys
+    """
+    atm_key = 1
+    bnch_bnd_keys_dct = graph.branches_bond_keys(C5H5N5O_CGR, atm_key)
+    assert set(bnch_bnd_keys_dct) == graph.atom_bond_keys(C5H5N5O_CGR)[atm_key]
+    for bnd_key, bnch_bnd_keys in bnch_bnd_keys_dct.items():
+        assert bnch_bnd_keys == graph.branch_bond_keys(
+            C5H5N5O_CGR, atm_key, bnd_key)
+
+    assert graph.branches(C8H13O_CGR, 6)[frozenset({6, 4})] == (
+        {1: ('C', 2, None), 4: ('C', 1, None), 6: ('C', 1, None)},
+        {frozenset({1, 4}): (1, None), frozenset({4, 6}): (1, None)}
+    )
+    assert graph.branches_atom_keys(C8H13O_CGR, 6) == {
+        frozenset({6, 4}): frozenset({1, 4, 6}),
+        frozenset({6, 2}): frozenset({2, 6}),
+        frozenset({6, 7}): frozenset({0, 3, 5, 6, 7, 8})}
+
+
 def test__rings():
     """ test graph.rings
     """
@@ -587,6 +669,10 @@ def test__backbone_isomorphism():
         cgr_pmt = graph.relabel(cgr, pmt_dct)
         assert graph.backbone_isomorphism(cgr, cgr_pmt) == pmt_dct
 
+    # graphs that differ only in their stereo parities are not isomorphic
+    assert graph.backbone_isomorphism(C8H13O_SGRS[0], C8H13O_SGRS[1]) is None
+    assert graph.backbone_isomorphism(C8H13O_CGR, C3H5N3_CGR) is None
+
 
 def test__backbone_unique():
     """ test graph.backbone_unique
@@ -597,32 +683,62 @@ def test__backbone_unique():
     )
 
 
-# inchi conversion library
-def test__atom_inchi_numbers():
-    """ test graph.atom_inchi_numbers
-    """
-    cgr = C8H13O_CGR
-    natms = len(graph.atoms(cgr))
-    for _ in range(10):
-        pmt_dct = dict(enumerate(numpy.random.permutation(natms)))
-        cgr_pmt = graph.relabel(cgr, pmt_dct)
-        inv_pmt_dct = dict(map(reversed, pmt_dct.items()))
-        assert graph.atom_inchi_numbers(cgr_pmt) == inv_pmt_dct
-
-
-def test__inchi():
-    """ test graph.inchi
-    """
-    assert graph.inchi(C_CGR) == C_ICH
-    assert graph.inchi(C2_CGR) == C2_ICH
-    assert graph.inchi(C3H3_CGR) == C3H3_ICH
-    assert graph.inchi(CH2FH2H_CGR) == CH2FH2H_ICH
-    assert graph.inchi(CH2FH2H_CGR_EXP) == CH2FH2H_ICH
-    assert graph.inchi(C5H5N5O_CGR) == C5H5N5O_ICH
-    assert graph.inchi(C8H13O_CGR) == C8H13O_ICH
-    assert graph.inchi(C3H3CL2F3_CGR) == C3H3CL2F3_ICH
-    assert graph.inchi(C3H5N3_CGR) == C3H5N3_ICH
-    assert graph.inchi(C2H2CL2F2_CGR) == C2H2CL2F2_ICH
+# canonical labeling library
+def test__canonical():
+    """ test graph.canonical
+    """
+    for xgr in (C5H5N5O_CGR, C8H13O_CGR, C8H13O_SGRS[0], CH2FH2H_CGR_EXP):
+        can_xgr = graph.canonical(xgr)
+        assert graph.atom_keys(can_xgr) == frozenset(range(len(xgr[0])))
+
+        natms = len(graph.atoms(xgr))
+        for _ in range(10):
+            pmt_dct = dict(zip(sorted(graph.atom_keys(xgr)),
+                               numpy.random.permutation(natms)))
+            xgr_pmt = graph.relabel(xgr, pmt_dct)
+            assert graph.canonical(xgr_pmt) == can_xgr
+            assert graph.canonical_hash(xgr_pmt) == graph.canonical_hash(xgr)
+            assert graph.isomorphic(xgr_pmt, xgr)
+
+
+def test__canonical_hash():
+    """ test graph.canonical_hash
+    """
+    assert graph.canonical_hash(C_CGR) == (
+        '781995e46b52f5ef5a81d6c7e5ab5f0a588522743a0a0a988fdbbe3b4211c536')
+    assert len(set(map(graph.canonical_hash, C8H13O_SGRS))) == len(
+        C8H13O_SGRS)
+    assert len(set(map(graph.canonical_hash, C3H3_RGRS))) == 2
+
+    # six disjoint five-membered rings have 10^6 * 6! automorphisms, which the
+    # search must not run through one by one
+    rings_cgr = (
+        {atm_key: ('C', 2, None) for atm_key in range(30)},
+        {frozenset({atm_key, atm_key - atm_key % 5 + (atm_key + 1) % 5}):
+         (1, None) for atm_key in range(30)})
+    pmt_dct = dict(enumerate(numpy.random.permutation(30)))
+    assert graph.canonical_hash(graph.relabel(rings_cgr, pmt_dct)) == (
+        graph.canonical_hash(rings_cgr))
+    assert graph.atom_symmetry_classes(rings_cgr) == (frozenset(range(30)),)
+
+
+def test__atom_symmetry_classes():
+    """ test graph.atom_symmetry_classes
+    """
+    sym_clss = graph.atom_symmetry_classes(C2H2CL2F2_CGR)
+    assert set(sym_clss) == {
+        frozenset({0, 1}), frozenset({2, 4}), frozenset({3, 5})}
+    sym_rnk_dct = graph.atom_symmetry_ranks(C2H2CL2F2_CGR)
+    assert all(sym_rnk_dct[atm_key] == rank
+               for rank, sym_cls in enumerate(sym_clss)
+               for atm_key in sym_cls)
+
+    # stereo parities can only split the classes
+    for sgr in C2H2CL2F2_SGRS:
+        assert graph.atom_symmetry_classes(sgr) == sym_clss
+        assert all(any(ste_sym_cls <= sym_cls for sym_cls in sym_clss)
+                   for ste_sym_cls
+                   in graph.atom_symmetry_classes(sgr, stereo=True))
 
 
 # resonance library
@@ -675,6 +791,76 @@ def test__resonances():
     assert graph.resonances(C3H3_CGR) == C3H3_RGRS
     assert graph.resonances(C8H13O_CGR) == C8H13O_RGRS
 
+    # a C9H11 polyenyl radical has as many resonances as the path graph has
+    # matchings
+    cgr = graph.from_dictionaries(
+        dict(enumerate('CCCCCCCCC')),
+        [frozenset({idx, idx+1}) for idx in range(8)],
+        atm_imp_hyd_vlc_dct={0: 2, 1: 1, 2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 1,
+                             8: 2})
+    assert len(graph.resonances(cgr)) == 55
+
+    # a graph without bonds is its own resonance
+    cgr = ({0: ('C', 4, None)}, {})
+    assert graph.resonances(cgr) == (cgr,)
+
+
+def _assert_resonances(cgr, bnd_ords_lst, dom_idxs, dom_bnd_ords_lst):
+    """ check the resonances, by their bond orders in bond key order, and the
+    dominant ones, by their positions among the resonances
+    """
+    bnd_keys = sorted(graph.bond_keys(cgr), key=sorted)
+    rgrs = graph.resonances(cgr)
+    assert tuple(tuple(graph.bond_orders(rgr)[bnd_key] for bnd_key in bnd_keys)
+                 for rgr in rgrs) == bnd_ords_lst
+    assert graph.resonance_count(cgr) == len(bnd_ords_lst)
+    assert graph.dominant_resonances(cgr) == tuple(map(rgrs.__getitem__,
+                                                       dom_idxs))
+    assert graph.dominant_resonance(cgr) == rgrs[dom_idxs[0]]
+    assert graph.resonance_dominant_bond_orders(cgr) == dict(
+        zip(bnd_keys, map(frozenset, dom_bnd_ords_lst)))
+
+
+def test__resonances__pi_systems():
+    """ test graph.resonances on species with more than one pi system
+
+    (the reference values are the output of the exhaustive enumeration that
+    came before the per-pi-system search)
+    """
+    # a butadiene and an allyl radical, joined by a CH2
+    cgr = graph.from_dictionaries(
+        dict(enumerate('CCCCCCCC')),
+        [frozenset({idx, idx+1}) for idx in range(7)],
+        atm_imp_hyd_vlc_dct={0: 2, 1: 1, 2: 1, 3: 1, 4: 2, 5: 1, 6: 1, 7: 2})
+    bnd_ords_lst = (
+        (1, 1, 1, 1, 1, 1, 1), (1, 1, 1, 1, 1, 1, 2), (1, 1, 1, 1, 1, 2, 1),
+        (1, 1, 2, 1, 1, 1, 1), (1, 1, 2, 1, 1, 1, 2), (1, 1, 2, 1, 1, 2, 1),
+        (1, 2, 1, 1, 1, 1, 1), (1, 2, 1, 1, 1, 1, 2), (1, 2, 1, 1, 1, 2, 1),
+        (2, 1, 1, 1, 1, 1, 1), (2, 1, 1, 1, 1, 1, 2), (2, 1, 1, 1, 1, 2, 1),
+        (2, 1, 2, 1, 1, 1, 1), (2, 1, 2, 1, 1, 1, 2), (2, 1, 2, 1, 1, 2, 1))
+    dom_idxs = (13, 14)
+    dom_bnd_ords_lst = ({2}, {1}, {2}, {1}, {1}, {1, 2}, {1, 2})
+    _assert_resonances(cgr, bnd_ords_lst, dom_idxs, dom_bnd_ords_lst)
+
+    # a pentadienyl radical and an aldehyde, joined by a CH2CH2
+    cgr = graph.from_dictionaries(
+        dict(enumerate('CCCCCCCCO')),
+        [frozenset({idx, idx+1}) for idx in range(8)],
+        atm_imp_hyd_vlc_dct={0: 2, 1: 1, 2: 1, 3: 1, 4: 1, 5: 2, 6: 2, 7: 1,
+                             8: 0})
+    bnd_ords_lst = (
+        (1, 1, 1, 1, 1, 1, 1, 1), (1, 1, 1, 1, 1, 1, 1, 2),
+        (1, 1, 1, 2, 1, 1, 1, 1), (1, 1, 1, 2, 1, 1, 1, 2),
+        (1, 1, 2, 1, 1, 1, 1, 1), (1, 1, 2, 1, 1, 1, 1, 2),
+        (1, 2, 1, 1, 1, 1, 1, 1), (1, 2, 1, 1, 1, 1, 1, 2),
+        (1, 2, 1, 2, 1, 1, 1, 1), (1, 2, 1, 2, 1, 1, 1, 2),
+        (2, 1, 1, 1, 1, 1, 1, 1), (2, 1, 1, 1, 1, 1, 1, 2),
+        (2, 1, 1, 2, 1, 1, 1, 1), (2, 1, 1, 2, 1, 1, 1, 2),
+        (2, 1, 2, 1, 1, 1, 1, 1), (2, 1, 2, 1, 1, 1, 1, 2))
+    dom_idxs = (9, 13, 15)
+    dom_bnd_ords_lst = ({1, 2}, {1, 2}, {1, 2}, {1, 2}, {1}, {1}, {1}, {2})
+    _assert_resonances(cgr, bnd_ords_lst, dom_idxs, dom_bnd_ords_lst)
+
 
 def test__subresonances():
     """ test graph.subresonances
@@ -682,80 +868,105 @@ def test__subresonances():
     assert graph.subresonances(C2_RGRS[1]) == C2_RGRS[1:]
 
 
-def test__dominant_resonances():
-    """ test graph.dominant_resonances
+def test__iter_resonances():
+    """ test graph.iter_resonances
     """
-    assert graph.dominant_resonances(C3H3_CGR) == C3H3_RGRS[1:]
+    rgrs = tuple(graph.iter_resonances(C8H13O_CGR))
+    assert len(rgrs) == len(C8H13O_RGRS)
+    assert all(rgr in C8H13O_RGRS for rgr in rgrs)
 
 
-def test__dominant_resonance():
-    """ test graph.dominant_resonance
+def test__resonance_count():
+    """ test graph.resonance_count
     """
-    assert graph.dominant_resonance(C3H3_CGR) == C3H3_RGRS[1]
+    assert graph.resonance_count(C2_CGR) == len(C2_RGRS)
+    assert graph.resonance_count(C8H13O_CGR) == len(C8H13O_RGRS)
 
-
-# stereo library
-# # properties
-def test__stereo_inchi():
-    """ test graph.stereo_inchi
-    """
-    assert tuple(map(graph.stereo_inchi, C2H2CL2F2_SGRS)) == C2H2CL2F2_STE_ICHS
-    assert tuple(map(graph.stereo_inchi, C8H13O_SGRS)) == C8H13O_STE_ICHS
+    # two allyl radicals joined by a CH2 are separate pi systems, so the count
+    # is the product of theirs
+    cgr = graph.from_dictionaries(
+        dict(enumerate('CCCCCCC')),
+        [frozenset({idx, idx+1}) for idx in range(6)],
+        atm_imp_hyd_vlc_dct={0: 2, 1: 1, 2: 1, 3: 2, 4: 1, 5: 1, 6: 2})
+    assert graph.resonance_count(cgr) == 3 * 3 == len(graph.resonances(cgr))
 
 
-def test__is_chiral():
-    """ test graph.is_chiral
+def test__resonance_set():
+    """ test graph.resonance_set
     """
-    assert graph.is_chiral(C2H2CL2F2_SGRS[0]) is True
-    assert graph.is_chiral(C2H2CL2F2_SGRS[1]) is False
-    assert graph.is_chiral(C3H3CL2F3_SGRS[0]) is True
-    assert graph.is_chiral(C3H3CL2F3_SGRS[2]) is False
+    rset = graph.resonance_set(C8H13O_CGR)
+    assert len(rset) == len(C8H13O_RGRS)
+    assert rset.graphs() == C8H13O_RGRS
+    assert rset[0] == C8H13O_RGRS[0]
+    assert rset.bond_orders().shape == (len(C8H13O_RGRS),
+                                        len(graph.bond_keys(C8H13O_CGR)))
+    assert (tuple(rset.spin_multiplicities()) ==
+            tuple(map(graph.maximum_spin_multiplicity, C8H13O_RGRS)))
+    assert rset.lowest_spin().graphs() == graph.dominant_resonances(
+        C8H13O_CGR)
 
 
-def test__stereogenic_atom_keys():
-    """ test graph.stereogenic_atom_keys
+def test__dominant_resonances():
+    """ test graph.dominant_resonances
     """
-    assert graph.stereogenic_atom_keys(C8H13O_CGR) == frozenset({6, 7})
-    assert graph.stereogenic_atom_keys(C3H3CL2F3_CGR) == frozenset({1, 2})
+    assert graph.dominant_resonances(C3H3_CGR) == C3H3_RGRS[1:]
+
+    # the cyclopentadienyl radical is an odd ring, with the radical site on
+    # any of its five atoms
+    cgr = graph.from_dictionaries(
+        dict(enumerate('CCCCC')),
+        [frozenset({idx, (idx+1) % 5}) for idx in range(5)],
+        atm_imp_hyd_vlc_dct=dict.fromkeys(range(5), 1))
+    dom_rgrs = graph.dominant_resonances(cgr)
+    assert len(dom_rgrs) == 5
+    assert sorted(
+        next(key for key, rad_vlc in graph.atom_radical_valences(rgr).items()
+             if rad_vlc) for rgr in dom_rgrs) == list(range(5))
 
 
-def test__stereogenic_bond_keys():
-    """ test graph.stereogenic_bond_keys
+def test__dominant_resonance():
+    """ test graph.dominant_resonance
     """
-    assert graph.stereogenic_bond_keys(C8H13O_CGR) == frozenset(
-        {frozenset({3, 5})})
-    assert graph.stereogenic_bond_keys(C3H5N3_CGR) == frozenset(
-        {frozenset({1, 4}), frozenset({0, 3})})
+    assert graph.dominant_resonance(C3H3_CGR) == C3H3_RGRS[1]
+    assert graph.dominant_resonance(C8H13O_CGR) == (
+        graph.dominant_resonances(C8H13O_CGR)[0])
 
 
-# # transformations
-def test__stereomers():
-    """ test graph.stereomers
+def test__iter_dominant_resonances():
+    """ test graph.iter_dominant_resonances
     """
-    assert graph.stereomers(C2H2CL2F2_CGR) == C2H2CL2F2_SGRS
-    assert graph.stereomers(C3H3CL2F3_CGR) == C3H3CL2F3_SGRS
-    assert graph.stereomers(C3H5N3_CGR) == C3H5N3_SGRS
-    assert graph.stereomers(C8H13O_CGR) == C8H13O_SGRS
+    rgr_itr = graph.iter_dominant_resonances(C3H3_CGR)
+    assert next(rgr_itr) == C3H3_RGRS[1]
+    assert tuple(rgr_itr) == C3H3_RGRS[2:]
 
 
-def test__substereomers():
-    """ test graph.substereomers
+# memoization of derived properties
+def test__memoization():
+    """ test graph.memoization
     """
-    partial_sgr = graph.set_atom_stereo_parities(C8H13O_CGR, {6: True})
-    assert graph.substereomers(partial_sgr) == C8H13O_SGRS[4:]
+    ste_atm_keys = graph.stereogenic_atom_keys(C8H13O_CGR)
+    atm_rad_vlc_dct = graph.atom_radical_valences(C8H13O_CGR)
+    with graph.memoization(maxsize=2):
+        cgr = (dict(C8H13O_CGR[0]), dict(C8H13O_CGR[1]))
+        assert graph.stereogenic_atom_keys(cgr) == ste_atm_keys
+        nhits = graph.memo_info().hits
+        assert graph.stereogenic_atom_keys(C8H13O_CGR) == ste_atm_keys
+        assert graph.memo_info().hits == nhits + 1
 
-    partial_sgr = graph.set_bond_stereo_parities(
-        C8H13O_CGR, {frozenset({3, 5}): False})
-    assert graph.substereomers(partial_sgr) == C8H13O_SGRS[0::2]
+        # returned dictionaries are copies
+        graph.atom_radical_valences(C8H13O_CGR).clear()
+        assert graph.atom_radical_valences(cgr) == atm_rad_vlc_dct
+        assert graph.memo_info().currsize == 2
+    assert not graph.memo_info().currsize
 
-
-# # comparisons
-def test__enantiomerically_unique():
-    """ test graph.enantiomerically_unique
-    """
-    assert graph.enantiomerically_unique(C3H3CL2F3_SGRS) == (
-        C3H3CL2F3_SGRS[0], C3H3CL2F3_SGRS[2], C3H3CL2F3_SGRS[4]
-    )
+    # the always-on caches are reported, and cleared along with the memo
+    graph.stereo_inchis(graph.stereomers(C8H13O_CGR))
+    caches = graph.memo_info().caches
+    assert caches['index'].currsize > 0
+    assert caches['stencil_numbering'].currsize > 0
+    graph.clear_memo()
+    caches = graph.memo_info().caches
+    assert not any(cache.currsize for cache in caches.values())
 
 
 if __name__ == '__main__':
@@ -775,7 +986,6 @@ if __name__ == '__main__':
     # test__explicit_hydrogen_keys()
     # test__add_explicit_hydrogens()
     # test__implicit()
-    # test__inchi()
     # test__atom_bond_valences()
     # test__atom_radical_valences()
     # test__maximum_spin_multiplicity()
@@ -783,14 +993,4 @@ if __name__ == '__main__':
     # test__resonances()
     # test__subresonances()
     # test__dominant_resonances()
-    # test__stereo_inchi()
-    # test__stereomers()
-    # test__is_chiral()
-    # test__stereogenic_atom_keys()
-    # test__stereogenic_bond_keys()
-    # test__stereomers()
-    # test__substereomers()
-    test__stereomers()
     test__backbone_unique()
-    test__enantiomerically_unique()
-    test__stereo_inchi()
@@ -0,0 +1,158 @@
+""" test the automol.graph InChI conversion functions
+"""
+import os
+import tempfile
+from unittest import mock
+import numpy
+from automol import graph
+from automol.graph._inchi import rdkit_molecule_with_atom_key_mapping
+from automol.graph._inchi import molfile_with_atom_key_mapping
+from automol.graph._inchi import _rdkit
+from automol.tests.test_graph import C_ICH
+from automol.tests.test_graph import C_CGR
+from automol.tests.test_graph import C2_ICH
+from automol.tests.test_graph import C2_CGR
+from automol.tests.test_graph import C3H3_ICH
+from automol.tests.test_graph import C3H3_CGR
+from automol.tests.test_graph import CH2FH2H_ICH
+from automol.tests.test_graph import CH2FH2H_CGR
+from automol.tests.test_graph import CH2FH2H_CGR_EXP
+from automol.tests.test_graph import C5H5N5O_ICH
+from automol.tests.test_graph import C5H5N5O_CGR
+from automol.tests.test_graph import C2H2CL2F2_ICH
+from automol.tests.test_graph import C2H2CL2F2_CGR
+from automol.tests.test_graph import C2H2CL2F2_SGRS
+from automol.tests.test_graph import C3H3CL2F3_ICH
+from automol.tests.test_graph import C3H3CL2F3_CGR
+from automol.tests.test_graph import C3H5N3_ICH
+from automol.tests.test_graph import C3H5N3_CGR
+from automol.tests.test_graph import C3H5N3_SGRS
+from automol.tests.test_graph import C8H13O_ICH
+from automol.tests.test_graph import C8H13O_CGR
+from automol.tests.test_graph import C8H13O_SGRS
+
+
+# inchi conversion library
+def test__atom_inchi_numbers():
+    """ test graph.atom_inchi_numbers
+    """
+    natms = len(graph.atoms(C8H13O_CGR))
+    for _ in range(10):
+        pmt_dct = dict(enumerate(numpy.random.permutation(natms)))
+        cgr_pmt = graph.relabel(C8H13O_CGR, pmt_dct)
+        inv_pmt_dct = dict(map(reversed, pmt_dct.items()))
+        assert graph.atom_inchi_numbers(cgr_pmt) == inv_pmt_dct
+
+
+def test__register_hardcoded_inchi():
+    """ test graph.register_hardcoded_inchi
+    """
+    # the atom keys of the reference graph are its InChI numbers
+    ref_xgr = ({0: ('F', 0, None), 1: ('N', 0, None)},
+               {frozenset({0, 1}): (1, None)})
+    graph.register_hardcoded_inchi('InChI=1S/FN/c1-2', ref_xgr)
+
+    xgr = ({5: ('N', 0, None), 7: ('F', 0, None)},
+           {frozenset({5, 7}): (1, None)})
+    assert graph.inchi(xgr) == 'InChI=1S/FN/c1-2'
+    assert graph.atom_inchi_numbers(xgr) == {7: 0, 5: 1}
+
+
+def test__inchi_caching():
+    """ test graph.inchi_caching
+    """
+    cgr = C8H13O_CGR
+    natms = len(graph.atoms(cgr))
+    with graph.inchi_caching(maxsize=2):
+        assert graph.inchi(cgr) == C8H13O_ICH
+        assert graph.inchi_cache_info().misses == 1
+
+        # relabeled graphs are hits, with the numbering carried over
+        for _ in range(5):
+            pmt_dct = dict(enumerate(numpy.random.permutation(natms)))
+            cgr_pmt = graph.relabel(cgr, pmt_dct)
+            inv_pmt_dct = dict(map(reversed, pmt_dct.items()))
+            assert graph.inchi(cgr_pmt) == C8H13O_ICH
+            assert graph.atom_inchi_numbers(cgr_pmt) == inv_pmt_dct
+        assert graph.inchi_cache_info().misses == 1
+
+        assert graph.inchi(C2H2CL2F2_CGR) == C2H2CL2F2_ICH
+        assert graph.inchi(C3H5N3_CGR) == C3H5N3_ICH
+        assert graph.inchi_cache_info().currsize == 2
+    assert not graph.inchi_cache_info().currsize
+
+    # results stored on disk are found again in a later session
+    path = os.path.join(tempfile.mkdtemp(), 'inchi_cache.sqlite')
+    with graph.inchi_caching(path=path):
+        assert graph.inchi(cgr) == C8H13O_ICH
+    with graph.inchi_caching(path=path):
+        assert graph.inchi(cgr) == C8H13O_ICH
+        assert graph.inchi_cache_info()[:2] == (1, 0)
+
+
+def test__inchi():
+    """ test graph.inchi
+    """
+    assert graph.inchi(C_CGR) == C_ICH
+    assert graph.inchi(C2_CGR) == C2_ICH
+    assert graph.inchi(C3H3_CGR) == C3H3_ICH
+    assert graph.inchi(CH2FH2H_CGR) == CH2FH2H_ICH
+    assert graph.inchi(CH2FH2H_CGR_EXP) == CH2FH2H_ICH
+    assert graph.inchi(C5H5N5O_CGR) == C5H5N5O_ICH
+    assert graph.inchi(C8H13O_CGR) == C8H13O_ICH
+    assert graph.inchi(C3H3CL2F3_CGR) == C3H3CL2F3_ICH
+    assert graph.inchi(C3H5N3_CGR) == C3H5N3_ICH
+    assert graph.inchi(C2H2CL2F2_CGR) == C2H2CL2F2_ICH
+
+
+def _molfile_inchi_with_atom_key_mapping(xgr, atm_xyz_dct=None):
+    """ InChI and AuxInfo strings from a MOLFile round trip, along with the
+    MOLFile atom key mapping
+    """
+    mlf, mlf_atm_key_dct = molfile_with_atom_key_mapping(xgr, atm_xyz_dct)
+    rdm = _rdkit.from_molfile(mlf)
+    return _rdkit.to_inchi_with_aux_info(rdm), mlf_atm_key_dct
+
+
+def test__inchi__rdkit_molecule():
+    """ test that rdkit molecules built directly match the MOLFile round trip
+    """
+    rng = numpy.random.default_rng(0)
+    for xgr in (C3H3_CGR, CH2FH2H_CGR_EXP, C5H5N5O_CGR, C8H13O_CGR,
+                C8H13O_SGRS[0], C3H5N3_SGRS[1], C2H2CL2F2_SGRS[0],
+                ({0: ('X', 0, None), 1: ('C', 4, None)}, {})):
+        atm_keys = sorted(graph.atom_keys(xgr))
+        xyzs = numpy.round(3 * rng.random((len(atm_keys), 3)), 3)
+        for atm_xyz_dct in (None,
+                            dict(zip(atm_keys, xyzs * [1, 1, 0])),
+                            dict(zip(atm_keys, xyzs))):
+            rdm, atm_key_dct = rdkit_molecule_with_atom_key_mapping(
+                xgr, atm_xyz_dct)
+            assert (
+                (_rdkit.to_inchi_with_aux_info(rdm), atm_key_dct) ==
+                _molfile_inchi_with_atom_key_mapping(xgr, atm_xyz_dct))
+
+
+def test__inchi__rdkit_molecule_fallback():
+    """ test the MOLFile round trip for molecules that rdkit rejects
+    """
+    # rdkit's sanitization rejects a pentavalent carbon with a ValueError
+    try:
+        _rdkit.from_data(([0], ['C'], [5], [0]), ([], []))
+    except ValueError:
+        pass
+    else:
+        assert False
+
+    # if the direct build fails, the MOLFile is read in instead
+    with mock.patch('automol.graph._inchi._inchi_._rdm_from_data',
+                    side_effect=ValueError):
+        rdm, atm_key_dct = rdkit_molecule_with_atom_key_mapping(C8H13O_CGR)
+
+    assert ((_rdkit.to_inchi_with_aux_info(rdm), atm_key_dct) ==
+            _molfile_inchi_with_atom_key_mapping(C8H13O_CGR))
+    assert _rdkit.to_inchi_with_aux_info(rdm)[0] == C8H13O_ICH
+
+
+if __name__ == '__main__':
+    test__inchi()
@@ -0,0 +1,313 @@
+""" test the automol.graph stereo functions
+"""
+import os
+import numpy
+import automol
+from automol import graph
+from automol.tests.test_graph import C2H2CL2F2_CGR
+from automol.tests.test_graph import C2H2CL2F2_SGRS
+from automol.tests.test_graph import C3H3CL2F3_CGR
+from automol.tests.test_graph import C3H3CL2F3_SGRS
+from automol.tests.test_graph import C3H5N3_CGR
+from automol.tests.test_graph import C3H5N3_SGRS
+from automol.tests.test_graph import C8H13O_CGR
+from automol.tests.test_graph import C8H13O_SGRS
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+DATA_PATH = os.path.join(PATH, 'data')
+
+# stereogenic atom and bond keys of each connectivity graph (- for none)
+HEPTANE_STE_GEN_KEYS = numpy.loadtxt(
+    os.path.join(DATA_PATH, 'heptane_stereogenic_keys.txt'), dtype=str)
+
+C2H2CL2F2_STE_ICHS = (
+    'InChI=1S/C2H2Cl2F2/c3-1(5)2(4)6/h1-2H/t1-,2-/m0/s1',
+    'InChI=1S/C2H2Cl2F2/c3-1(5)2(4)6/h1-2H/t1-,2+',
+    'InChI=1S/C2H2Cl2F2/c3-1(5)2(4)6/h1-2H/t1-,2+',
+    'InChI=1S/C2H2Cl2F2/c3-1(5)2(4)6/h1-2H/t1-,2-/m1/s1'
+)
+# these are incorrect -- currently we can't handle InChI generation for
+# higher-order stereo
+# C3H3CL2F3_STE_ICHS = (
+#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t2-,3-/m0/s1',
+#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t2-,3-/m1/s1',
+#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t1-,2-,3+',
+#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t1-,2+,3-',
+#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t1-,2-,3+',
+#     'InChI=1S/C3H3Cl2F3/c4-2(7)1(6)3(5)8/h1-3H/t1-,2+,3-',
+# )
+# these are incorrect -- currently we can't handle InChI generation for
+# higher-order stereo
+# C3H5N3_STE_ICHS = (
+#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1+,5-2+',
+#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2+,6-3+',
+#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2+,6-3-',
+#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2+,6-3+',
+#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2+,6-3-',
+#     'InChI=1S/C3H5N3/c4-1-3(6)2-5/h1-2,4-6H/b4-1-,5-2-',
+# )
+C8H13O_STE_ICHS = (
+    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4-/t7-,8-/m0/s1',
+    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4+/t7-,8-/m0/s1',
+    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4-/t7-,8+/m0/s1',
+    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4+/t7-,8+/m0/s1',
+    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4-/t7-,8+/m1/s1',
+    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4+/t7-,8+/m1/s1',
+    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4-/t7-,8-/m1/s1',
+    'InChI=1S/C8H13O/c1-4-6-8(9)7(3)5-2/h4-8H,2H2,1,3H3/b6-4+/t7-,8-/m1/s1'
+)
+
+
+# stereo library
+# # properties
+def test__stereo_inchi():
+    """ test graph.stereo_inchi
+    """
+    assert tuple(map(graph.stereo_inchi, C2H2CL2F2_SGRS)) == C2H2CL2F2_STE_ICHS
+    assert tuple(map(graph.stereo_inchi, C8H13O_SGRS)) == C8H13O_STE_ICHS
+
+    # relabelings reuse the numbering from above
+    natms = len(graph.atoms(C8H13O_CGR))
+    for sgr, ste_ich in zip(C8H13O_SGRS, C8H13O_STE_ICHS):
+        pmt_dct = dict(enumerate(numpy.random.permutation(natms)))
+        assert graph.stereo_inchi(graph.relabel(sgr, pmt_dct)) == ste_ich
+
+
+def test__stereo_inchis():
+    """ test graph.stereo_inchis
+    """
+    sgrs = C8H13O_SGRS + C2H2CL2F2_SGRS + C8H13O_SGRS[::-1]
+    ste_ichs = C8H13O_STE_ICHS + C2H2CL2F2_STE_ICHS + C8H13O_STE_ICHS[::-1]
+    assert graph.stereo_inchis(sgrs) == ste_ichs
+    assert graph.stereo_inchis(sgrs, nprocs=2) == ste_ichs
+    assert not graph.stereo_inchis(())
+
+
+def test__is_chiral():
+    """ test graph.is_chiral
+    """
+    assert graph.is_chiral(C2H2CL2F2_SGRS[0]) is True
+    assert graph.is_chiral(C2H2CL2F2_SGRS[1]) is False
+    assert graph.is_chiral(C3H3CL2F3_SGRS[0]) is True
+    assert graph.is_chiral(C3H3CL2F3_SGRS[2]) is False
+
+    # 2,3-dichlorobutane has a meso form and a pair of enantiomers
+    cgr = ({0: ('C', 3, None), 1: ('C', 1, None), 2: ('C', 1, None),
+            3: ('C', 3, None), 4: ('Cl', 0, None), 5: ('Cl', 0, None)},
+           {frozenset({0, 1}): (1, None), frozenset({1, 2}): (1, None),
+            frozenset({2, 3}): (1, None), frozenset({1, 4}): (1, None),
+            frozenset({2, 5}): (1, None)})
+    sgrs = graph.stereomers(cgr)
+    meso_sgr1, meso_sgr2 = (sgr for sgr in sgrs if not graph.is_chiral(sgr))
+    assert graph.isomorphic(meso_sgr1, meso_sgr2)
+    assert graph.isomorphic(graph.reflection(meso_sgr1), meso_sgr1)
+    sgr1, sgr2 = (sgr for sgr in sgrs if graph.is_chiral(sgr))
+    assert not graph.isomorphic(graph.reflection(sgr1), sgr1)
+    assert graph.isomorphic(graph.reflection(sgr1), sgr2)
+
+
+def test__stereogenic_atom_keys():
+    """ test graph.stereogenic_atom_keys
+    """
+    assert graph.stereogenic_atom_keys(C8H13O_CGR) == frozenset({6, 7})
+    assert graph.stereogenic_atom_keys(C3H3CL2F3_CGR) == frozenset({1, 2})
+
+    # explicit and implicit hydrogens on the methyls don't set them apart
+    cgr = ({0: ('C', 3, None), 1: ('C', 1, None), 2: ('C', 3, None),
+            3: ('F', 0, None)},
+           {frozenset({0, 1}): (1, None), frozenset({1, 2}): (1, None),
+            frozenset({1, 3}): (1, None)})
+    cgr = graph.explicit(cgr, atm_keys={0})
+    assert graph.stereogenic_atom_keys(cgr) == frozenset()
+    assert len(graph.stereomers(cgr)) == 1
+
+    # ring atoms, whose branches overlap: the ring neighbors of C2 in this
+    # epoxide are different atoms, while those of C1 in methylcyclopropane
+    # are swapped by a reflection
+    cgr = ({0: ('C', 3, None), 1: ('C', 2, None), 2: ('C', 0, None),
+            3: ('C', 2, None), 4: ('O', 0, None), 5: ('O', 0, None)},
+           {frozenset({0, 2}): (1, None), frozenset({1, 2}): (1, None),
+            frozenset({2, 3}): (1, None), frozenset({3, 5}): (1, None),
+            frozenset({2, 5}): (1, None), frozenset({1, 4}): (1, None)})
+    assert graph.stereogenic_atom_keys(cgr) == frozenset({2})
+    cgr = ({0: ('C', 3, None), 1: ('C', 1, None), 2: ('C', 2, None),
+            3: ('C', 2, None)},
+           {frozenset({0, 1}): (1, None), frozenset({1, 2}): (1, None),
+            frozenset({1, 3}): (1, None), frozenset({2, 3}): (1, None)})
+    assert graph.stereogenic_atom_keys(cgr) == frozenset()
+
+    # branches with rings, which are the same for two of the neighbors of C1
+    # in dicyclopropylmethanol, but not in cyclopropylcyclobutylmethanol
+    cgr = ({0: ('O', 1, None), 1: ('C', 1, None), 2: ('C', 1, None),
+            3: ('C', 2, None), 4: ('C', 2, None), 5: ('C', 1, None),
+            6: ('C', 2, None), 7: ('C', 2, None)},
+           {frozenset({0, 1}): (1, None), frozenset({1, 2}): (1, None),
+            frozenset({2, 3}): (1, None), frozenset({3, 4}): (1, None),
+            frozenset({2, 4}): (1, None), frozenset({1, 5}): (1, None),
+            frozenset({5, 6}): (1, None), frozenset({6, 7}): (1, None),
+            frozenset({5, 7}): (1, None)})
+    assert graph.stereogenic_atom_keys(cgr) == frozenset()
+    cgr[0][8] = ('C', 2, None)
+    cgr[1].pop(frozenset({5, 7}))
+    cgr[1].update({frozenset({7, 8}): (1, None), frozenset({5, 8}): (1, None)})
+    assert graph.stereogenic_atom_keys(cgr) == frozenset({1})
+
+
+def test__stereogenic_bond_keys():
+    """ test graph.stereogenic_bond_keys
+    """
+    assert graph.stereogenic_bond_keys(C8H13O_CGR) == frozenset(
+        {frozenset({3, 5})})
+    assert graph.stereogenic_bond_keys(C3H5N3_CGR) == frozenset(
+        {frozenset({1, 4}), frozenset({0, 3})})
+
+    # explicit and implicit hydrogens on the methyls don't set them apart
+    cgr = ({0: ('C', 3, None), 1: ('C', 1, None), 2: ('C', 0, None),
+            3: ('C', 3, None), 4: ('C', 3, None)},
+           {frozenset({0, 1}): (1, None), frozenset({1, 2}): (1, None),
+            frozenset({2, 3}): (1, None), frozenset({2, 4}): (1, None)})
+    cgr = graph.explicit(cgr, atm_keys={3})
+    assert graph.stereogenic_bond_keys(cgr) == frozenset()
+
+
+def test__stereogenic_keys__heptane():
+    """ test graph.stereogenic_atom_keys and graph.stereogenic_bond_keys
+
+    over the heptane corpus (with and without some of the hydrogens made
+    explicit), against stored keys
+    """
+    for ich, atm_keys_str, bnd_keys_str in HEPTANE_STE_GEN_KEYS:
+        ste_gen_atm_keys = frozenset(
+            int(key_str) for key_str in atm_keys_str.split(',')
+            if key_str != '-')
+        ste_gen_bnd_keys = frozenset(
+            frozenset(map(int, key_str.split('-')))
+            for key_str in bnd_keys_str.split(',') if key_str != '-')
+
+        cgr = automol.inchi.connectivity_graph(ich)
+        bbn_keys = sorted(graph.backbone_keys(cgr))
+        for xgr in (cgr, graph.explicit(cgr, atm_keys=bbn_keys[::2])):
+            assert graph.stereogenic_atom_keys(xgr) == ste_gen_atm_keys
+            assert graph.stereogenic_bond_keys(xgr) == ste_gen_bnd_keys
+
+
+def test__stereomer_count():
+    """ test graph.stereomer_count
+    """
+    assert graph.stereomer_count(C2H2CL2F2_CGR) == (3, True)
+    assert graph.stereomer_count(C8H13O_CGR) == (8, True)
+
+    # InChI=1S/C5H5O/c1-2-3-4-5-6/h1-5H/b4-3+ has two stereo InChIs, since the
+    # bond to the radical site at the end is not a stereo bond for InChI
+    cgr = graph.from_dictionaries(
+        dict(enumerate('CCCCCO')),
+        [frozenset({idx, idx+1}) for idx in range(5)],
+        atm_imp_hyd_vlc_dct={0: 1, 1: 1, 2: 1, 3: 1, 4: 1, 5: 0})
+    assert graph.stereomer_count(cgr) == (4, False)
+
+    # the middle atom is only stereogenic once its neighbors are assigned
+    cnt, is_exact = graph.stereomer_count(C3H3CL2F3_CGR)
+    assert not is_exact
+    assert cnt >= len(tuple(graph.iter_stereomers(C3H3CL2F3_CGR)))
+
+
+# # transformations
+def test__stereomers():
+    """ test graph.stereomers
+    """
+    assert graph.stereomers(C2H2CL2F2_CGR) == C2H2CL2F2_SGRS
+    assert graph.stereomers(C3H3CL2F3_CGR) == C3H3CL2F3_SGRS
+    assert graph.stereomers(C3H5N3_CGR) == C3H5N3_SGRS
+    assert graph.stereomers(C8H13O_CGR) == C8H13O_SGRS
+
+
+def test__stereomer_set():
+    """ test graph.stereomer_set
+    """
+    sset = graph.stereomer_set(C3H5N3_CGR)
+    assert len(sset) == len(C3H5N3_SGRS)
+    assert sset.graphs() == C3H5N3_SGRS
+    assert sset[0] == C3H5N3_SGRS[0]
+    assert sset.assigned().shape == (len(C3H5N3_SGRS), len(sset.keys()))
+
+    bnd_key = frozenset({3, 5})
+    partial_sgr = graph.set_bond_stereo_parities(C8H13O_CGR, {bnd_key: False})
+    sset = graph.stereomer_set(C8H13O_CGR)
+    assert (sset.compatible({bnd_key: False}).graphs() ==
+            graph.substereomer_set(partial_sgr).graphs())
+
+    pars = numpy.where(sset.assigned(), sset.parities(), None)
+    sset2 = graph.StereomerSet(
+        C8H13O_CGR, sset.atom_keys(), sset.bond_keys(),
+        numpy.vstack([pars] * 2))
+    assert len(sset2) == 2 * len(sset)
+    assert sset2.unique().graphs() == C8H13O_SGRS
+
+
+def test__iter_stereomers():
+    """ test graph.iter_stereomers
+    """
+    # the two labelings of the meso form are related by symmetry
+    assert tuple(graph.iter_stereomers(C2H2CL2F2_CGR)) == (
+        C2H2CL2F2_SGRS[0], C2H2CL2F2_SGRS[1], C2H2CL2F2_SGRS[3])
+    assert tuple(graph.iter_stereomers(C8H13O_CGR)) == C8H13O_SGRS
+
+    assert len(tuple(graph.iter_stereomers(C8H13O_CGR, max_count=3))) == 3
+    assert not tuple(graph.iter_stereomers(C8H13O_CGR, time_budget=0.))
+
+
+def test__substereomers():
+    """ test graph.substereomers
+    """
+    partial_sgr = graph.set_atom_stereo_parities(C8H13O_CGR, {6: True})
+    assert graph.substereomers(partial_sgr) == C8H13O_SGRS[4:]
+
+    partial_sgr = graph.set_bond_stereo_parities(
+        C8H13O_CGR, {frozenset({3, 5}): False})
+    assert graph.substereomers(partial_sgr) == C8H13O_SGRS[0::2]
+
+    # with several sites fixed, exactly the compatible stereomers are left
+    for cgr, sgr, atm_keys, bnd_keys, nsubs in (
+            (C8H13O_CGR, C8H13O_SGRS[1], {6, 7}, {frozenset({3, 5})}, 1),
+            (C8H13O_CGR, C8H13O_SGRS[1], {6, 7}, set(), 2),
+            (C3H3CL2F3_CGR, C3H3CL2F3_SGRS[2], {1, 2}, set(), 2),
+            (C3H5N3_CGR, C3H5N3_SGRS[1], set(),
+             {frozenset({0, 3}), frozenset({1, 4})}, 2)):
+        atm_par_dct = {atm_key: par for atm_key, par
+                       in graph.atom_stereo_parities(sgr).items()
+                       if atm_key in atm_keys}
+        bnd_par_dct = {bnd_key: par for bnd_key, par
+                       in graph.bond_stereo_parities(sgr).items()
+                       if bnd_key in bnd_keys}
+        partial_sgr = graph.set_bond_stereo_parities(
+            graph.set_atom_stereo_parities(cgr, atm_par_dct), bnd_par_dct)
+        sub_sgrs = graph.substereomers(partial_sgr)
+        assert len(sub_sgrs) == nsubs
+        assgns = set(atm_par_dct.items()) | set(bnd_par_dct.items())
+        assert sub_sgrs == tuple(
+            sgr_ for sgr_ in graph.stereomers(cgr)
+            if assgns <= (set(graph.atom_stereo_parities(sgr_).items()) |
+                          set(graph.bond_stereo_parities(sgr_).items())))
+
+
+# # comparisons
+def test__enantiomerically_unique():
+    """ test graph.enantiomerically_unique
+    """
+    assert graph.enantiomerically_unique(C3H3CL2F3_SGRS) == (
+        C3H3CL2F3_SGRS[0], C3H3CL2F3_SGRS[2], C3H3CL2F3_SGRS[4]
+    )
+    assert graph.enantiomerically_unique(C2H2CL2F2_SGRS) == (
+        C2H2CL2F2_SGRS[0], C2H2CL2F2_SGRS[1]
+    )
+
+
+if __name__ == '__main__':
+    # test__stereomers()
+    # test__is_chiral()
+    # test__stereogenic_atom_keys()
+    # test__stereogenic_bond_keys()
+    # test__substereomers()
+    test__stereomers()
+    test__enantiomerically_unique()
+    test__stereo_inchi()